@@ -0,0 +1,194 @@
+"""
+Free time of a day as sorted, disjoint intervals
+
+Times are minutes since midnight; intervals are half-open [start, end).
+Lookups use binary search over the interval starts, so clipping a gap or
+finding the next free slot costs O(log n) plus the number of intervals returned.
+"""
+from bisect import bisect_right
+
+from SchedulerEngine import to_minutes
+
+
+def _minutes(time):
+    """Minutes since midnight of an int or a "hh:mm" string"""
+    return to_minutes(time) if isinstance(time, str) else time
+
+
+class Availability:
+    """
+    Calendar of free time
+
+    Attributes
+    ----------
+    starts: list
+        Sorted start minutes of the free intervals
+    ends: list
+        End minutes of the free intervals (ends[i] belongs to starts[i])
+    """
+    def __init__(self, intervals=()):
+        merged = []
+        for start, end in sorted((_minutes(s), _minutes(e)) for s, e in intervals):
+            if end <= start:
+                continue
+            if merged and start <= merged[-1][1]:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = [start for start, _ in merged]
+        self.ends = [end for _, end in merged]
+
+    @classmethod
+    def window(cls, start, end, blocked=()):
+        """
+        One free window with some intervals blocked, e.g.
+        Availability.window("07:00", "23:00", blocked=[("08:00", "08:45")])
+        """
+        return cls([(start, end)]).block(blocked)
+
+    def __iter__(self):
+        return iter(zip(self.starts, self.ends))
+
+    def __len__(self):
+        return len(self.starts)
+
+    def __repr__(self):
+        return f"Availability({list(self)})"
+
+    def block(self, intervals):
+        """
+        Availability with the given intervals removed
+
+        Parameters
+        ----------
+        intervals: iterable
+          (start, end) pairs in minutes or "hh:mm"
+
+        Returns
+        ----------
+        Availability
+        """
+        blocked = Availability(intervals)
+        free = []
+        j = 0
+        for start, end in self:
+            # skip blocked intervals that end before this free interval
+            while j < len(blocked) and blocked.ends[j] <= start:
+                j += 1
+            k = j
+            while k < len(blocked) and blocked.starts[k] < end:
+                if blocked.starts[k] > start:
+                    free.append((start, blocked.starts[k]))
+                start = max(start, blocked.ends[k])
+                k += 1
+            if start < end:
+                free.append((start, end))
+        return Availability(free)
+
+    def clip(self, start, end):
+        """
+        The free parts of [start, end)
+
+        Parameters
+        ----------
+        start: int or str
+          minutes since midnight or "hh:mm"
+        end: int or str
+          minutes since midnight or "hh:mm"
+
+        Returns
+        ----------
+        list of (start, end) tuples in minutes
+        """
+        start, end = _minutes(start), _minutes(end)
+        i = bisect_right(self.ends, start)  # first interval that ends after start
+        pieces = []
+        while i < len(self.starts) and self.starts[i] < end:
+            piece_start = max(start, self.starts[i])
+            piece_end = min(end, self.ends[i])
+            if piece_start < piece_end:
+                pieces.append((piece_start, piece_end))
+            i += 1
+        return pieces
+
+    def free_minutes(self, start=None, end=None):
+        """Total free minutes, optionally only between start and end"""
+        if start is None and end is None:
+            return sum(e - s for s, e in self)
+        start = self.starts[0] if start is None and self.starts else start
+        end = self.ends[-1] if end is None and self.ends else end
+        return sum(e - s for s, e in self.clip(start, end))
+
+    def is_free(self, start, end):
+        """Whether all of [start, end) is free"""
+        start, end = _minutes(start), _minutes(end)
+        i = bisect_right(self.starts, start) - 1
+        return i >= 0 and self.ends[i] >= end
+
+    def next_fit(self, start, duration):
+        """
+        Earliest minute at or after start where duration free minutes in a row begin
+
+        Returns
+        ----------
+        int or None if nothing fits
+        """
+        start = _minutes(start)
+        i = bisect_right(self.ends, start)
+        while i < len(self.starts):
+            begin = max(start, self.starts[i])
+            if begin + duration <= self.ends[i]:
+                return begin
+            i += 1
+        return None
+
+
+def test_availability():
+    """
+    Tests a blocked interval splitting a gap: the free pieces, the next slot a
+    task fits in, and the schedules of the strategies that take availability
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+    from SchedulerEngine import run_strategy
+
+    print("Running test cases...")
+    day = Availability.window("08:00", "12:00", blocked=[("09:00", "09:30")])
+
+    print("Test 1: the blocked interval splits the window")
+    assert list(day) == [(480, 540), (570, 720)]
+    assert day.clip("08:30", "10:00") == [(510, 540), (570, 600)]
+    assert day.clip("09:05", "09:25") == []
+    assert day.free_minutes() == 210 and day.free_minutes("08:30", "10:00") == 60
+    assert day.is_free("08:00", "09:00") and not day.is_free("08:30", "09:10")
+    assert list(day.block([("07:00", "08:10"), ("11:50", "13:00")])) == [(490, 540), (570, 710)]
+    assert list(Availability([("10:00", "11:00"), (540, 600), ("10:30", "10:45")])) == [(540, 660)]
+
+    print("Test 2: a task waits for the next piece it fits in")
+    assert day.next_fit("08:30", 20) == 510
+    assert day.next_fit("08:30", 45) == 570  # 30 free minutes before the block are not enough
+    assert day.next_fit("11:30", 45) is None
+
+    print("Test 3: nothing is scheduled in the blocked interval")
+    for name in ("ImprovedGreedy", "DP"):
+        tasks = [Task(id=1, description="Emails", duration=50), Task(id=2, description="Walk", duration=30),
+                 Task(id=3, description="Call", duration=40, dependencies=[1]),
+                 Task(id=4, description="Meeting", duration=60, scheduled="10:00")]
+        result = run_strategy(name, tasks, "08:00", "12:00", day)
+        starts = [(task.id, to_minutes(start)) for task, start in result.schedule]
+        # the walk does not fit in the 10 minutes left before the block, so it waits until 09:30
+        assert starts == [(1, 480), (2, 570), (4, 600), (3, 660)], (name, starts)
+        for task, start in result.schedule:
+            assert day.is_free(to_minutes(start), to_minutes(start) + task.duration), (name, task.id)
+
+    print("All tests passed!")
+
+
+#test_availability()
@@ -0,0 +1,251 @@
+import os
+import sys
+from itertools import islice
+
+from SchedulerEngine import DEFAULT_END_TIME, run_strategy, strategy_names
+
+# Algorithm names accepted by the batch engine (the same names as in figures.py)
+ALGORITHMS = strategy_names()
+
+DEFAULT_CHUNKSIZE = 16
+
+
+class _NullWriter:
+    """File-like sink for the schedulers' progress output"""
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def schedule_one(algorithm, tasks, starting_time, end_time=DEFAULT_END_TIME, availability=None,
+                 category_value=None, quiet=True):
+    """
+    Run one scheduler on one task list without printing anything
+
+    The schedulers print their progress, so quiet=True swaps the process-wide
+    sys.stdout for the time of the run. That is only safe when nothing else in the
+    process uses stdout meanwhile: code that schedules from several threads must not
+    rely on it and should run the solves in worker processes set up with init_worker
+    (which silences them once) and pass quiet=False.
+
+    Parameters
+    ----------
+    algorithm: str
+      "TaskScheduler", "ImprovedGreedy" or "DP"
+    tasks: list
+      Task objects to schedule (they are modified by the scheduler)
+    starting_time: str
+      "hh:mm" when the day starts
+    end_time: str
+      "hh:mm" when the day ends (used by the DP and the improved greedy scheduler)
+    availability: Availability or list
+      free intervals of the day (used by the DP and the improved greedy scheduler)
+    category_value: dict
+      the user's {category: value} importance of the categories (default: CATEGORY_VALUE)
+    quiet: bool
+      silence the scheduler's output by swapping sys.stdout during the run
+
+    Returns
+    ----------
+    dict with the schedule entries, the efficiency, the validation diagnostics and
+    the tasks left out by the filter ({"id": ..., "reason": ...}, see TaskFilter.DROP_REASONS)
+    """
+    if not quiet:
+        return run_strategy(algorithm, tasks, starting_time, end_time, availability,
+                            category_value=category_value).to_dict()
+    old_stdout = sys.stdout
+    sys.stdout = _NullWriter()
+    try:
+        result = run_strategy(algorithm, tasks, starting_time, end_time, availability,
+                              category_value=category_value)
+    finally:
+        sys.stdout = old_stdout
+    return result.to_dict()
+
+
+def _job_user_id(job):
+    """The user id of a job, or None if the job is too malformed to have one"""
+    return job[0] if isinstance(job, (tuple, list)) and job else None
+
+
+def _error_result(user_id, error):
+    return {"schedule": [], "efficiency": None, "diagnostics": [], "dropped": [],
+            "error": f"{type(error).__name__}: {error}", "user_id": user_id}
+
+
+def _schedule_job(algorithm, job, end_time, quiet=True):
+    """
+    Schedule one (user_id, tasks, starting_time) or (user_id, tasks, starting_time, category_value)
+    job, turning failures (a malformed job included) into an error result
+    """
+    try:
+        user_id, tasks, starting_time, *profile = job
+        result = schedule_one(algorithm, tasks, starting_time, end_time,
+                              category_value=profile[0] if profile else None, quiet=quiet)
+    except Exception as e:
+        return _error_result(_job_user_id(job), e)
+    result["error"] = None
+    result["user_id"] = user_id
+    return result
+
+
+def _schedule_chunk(algorithm, chunk, end_time):
+    """Worker entry point: schedule a chunk of jobs (the worker is silenced by init_worker)"""
+    return [_schedule_job(algorithm, job, end_time, quiet=False) for job in chunk]
+
+
+def init_worker():
+    """
+    Process pool initializer: silences the schedulers' progress output once per worker
+
+    This is the only per-worker setup. The scheduler modules are already imported when
+    it runs and a scheduler is created per job, so there is no scheduler state to warm.
+    """
+    sys.stdout = _NullWriter()
+
+
+def schedule_batch(jobs, algorithm="DP", end_time=DEFAULT_END_TIME, processes=None,
+                   chunksize=DEFAULT_CHUNKSIZE, max_pending=None):
+    """
+    Schedule many independent task lists and yield the results in completion order
+
+    Jobs are read lazily from the iterable and grouped into chunks; at most
+    `max_pending` chunks are in flight at any time, so a huge (or endless) input
+    keeps memory bounded. A job that fails, or a chunk lost with its worker
+    (e.g. a worker that crashed), is answered with error results; the other
+    jobs are still scheduled, in a new pool if the old one broke.
+
+    Parameters
+    ----------
+    jobs: iterable
+      (user_id, tasks, starting_time) tuples, or (user_id, tasks, starting_time, category_value)
+      with the user's category importance
+    algorithm: str
+      "TaskScheduler", "ImprovedGreedy" or "DP"
+    end_time: str
+      "hh:mm" when the day ends (used by the DP and the improved greedy scheduler)
+    processes: int
+      number of worker processes (default: number of CPUs), 0 schedules in this process
+    chunksize: int
+      number of jobs sent to a worker at once
+    max_pending: int
+      maximum number of chunks submitted but not yet collected (default: 2 per worker)
+
+    Yields
+    ----------
+    dict with user_id, schedule entries, efficiency, diagnostics and error (None on success)
+    """
+    if algorithm not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    jobs = iter(jobs)
+    if processes == 0:
+        for job in jobs:
+            yield _schedule_job(algorithm, job, end_time)
+        return
+
+    # the process pool machinery is only imported when a pool is actually used
+    from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+    from concurrent.futures.process import BrokenProcessPool
+
+    processes = processes or os.cpu_count() or 1
+    max_pending = max_pending or 2 * processes
+    executor = None
+    try:
+        pending = {}  # future -> user ids of its chunk
+        exhausted = False
+        while pending or not exhausted:
+            # top up the pipeline until the back-pressure limit is reached
+            while not exhausted and len(pending) < max_pending:
+                chunk = list(islice(jobs, chunksize))
+                if not chunk:
+                    exhausted = True
+                    break
+                if executor is None:
+                    executor = ProcessPoolExecutor(max_workers=processes, initializer=init_worker)
+                future = executor.submit(_schedule_chunk, algorithm, chunk, end_time)
+                pending[future] = [_job_user_id(job) for job in chunk]
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                user_ids = pending.pop(future)
+                try:
+                    results = future.result()
+                except Exception as e:
+                    # the chunk never came back (e.g. a job that cannot be pickled, or a dead worker)
+                    if isinstance(e, BrokenProcessPool) and executor is not None:
+                        # the chunks still pending fail with it; later ones go to a new pool
+                        executor.shutdown(wait=False)
+                        executor = None
+                    results = [_error_result(user_id, e) for user_id in user_ids]
+                yield from results
+    finally:
+        if executor is not None:
+            executor.shutdown()
+
+
+def test_schedule_batch():
+    """
+    Tests chunking, back-pressure and the isolation of failing jobs, in this
+    process and over a process pool (including a worker that dies)
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    class _KillWorker:
+        """Unpickling this ends the process that does it"""
+        def __reduce__(self):
+            return os._exit, (1,)
+
+    def day(user_id):
+        return (user_id, [Task(id=1, description="Gym", duration=60),
+                          Task(id=2, description="Call", duration=15, dependencies=[1])], "09:00")
+
+    print("Running test cases...")
+    jobs = [day("a"), ("b",), day("c"), 42, ("e", [Task(id=1, description="x", duration=10)], "9am"), day("f")]
+    failing = {"b", None, "e"}
+
+    for processes in (0, 2):
+        print(f"Test processes={processes}: every job gets a result, failures only for the bad ones")
+        results = list(schedule_batch(jobs, "TaskScheduler", processes=processes, chunksize=2))
+        assert sorted(map(str, (r["user_id"] for r in results))) == sorted(map(str, ("a", "b", "c", None, "e", "f")))
+        for result in results:
+            assert (result["error"] is not None) == (result["user_id"] in failing), result
+            if result["error"] is None:
+                assert [entry["id"] for entry in result["schedule"]] == [1, 2]
+
+    print("Test back-pressure: the input is read only as far as the pending chunks")
+    pulled = []
+
+    def endless():
+        while True:
+            pulled.append(len(pulled))
+            yield day(len(pulled))
+
+    batch = schedule_batch(endless(), "TaskScheduler", processes=1, chunksize=3, max_pending=2)
+    first = next(batch)
+    assert first["error"] is None and len(pulled) <= 3 * 2, len(pulled)
+    batch.close()
+
+    print("Test a dead worker: its chunk fails, the later ones run in a new pool")
+    jobs = [day("a"), ("b", _KillWorker(), "09:00"), day("c"), day("d")]
+    results = list(schedule_batch(jobs, "TaskScheduler", processes=1, chunksize=1, max_pending=1))
+    assert [r["user_id"] for r in results] == ["a", "b", "c", "d"]
+    assert [r["error"] is None for r in results] == [True, False, True, True], results
+    assert results[1]["error"].startswith("BrokenProcessPool")
+
+    print("All tests passed!")
+
+
+#test_schedule_batch()
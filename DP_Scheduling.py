@@ -1,8 +1,14 @@
+import warnings
+
 from TaskClass import Task
 from KnapSack import knapsack_01
-import random
+from TaskGraph import DependencyGraph
+from TaskFilter import partition_tasks, DROP_REASONS
+from Availability import Availability
+from SchedulerEngine import SchedulerCore, PriorityModel, register_strategy, FLEXIBLE, to_minutes, to_time, add_minutes
 
-class DP_Scheduler:
+@register_strategy("DP")
+class DP_Scheduler(SchedulerCore):
     """
     A Dynamic Programming-based Task Scheduler
     
@@ -16,12 +22,20 @@ class DP_Scheduler:
         scheduled_tasks: List of tasks with fixed scheduled times
         flexible_tasks: List of tasks without fixed scheduled times
         schedule: Final schedule with task assignments
+        graph: DependencyGraph with the critical-path data used for filtering
+        dropped_tasks: (task, reason) tuples of the tasks left out by the filter
+        diagnostics: Problems found in the tasks before scheduling (see TaskValidation)
+        stats: Per-phase wall time and operation counters (filled only with instrument=True)
+    
+    Slot selection: fixed-time tasks keep their times and every gap between them
+    is filled with the best set of flexible tasks (0/1 knapsack).
     """
     
-    # Category priority values - can be customized
-    category_value = {"Routine": 20, "Family": 15, "Growth": 15, "Friends": 10, "Hobby": 5, "Other": 0}
+    # Priorities are reset every run, measured in minutes, and a task that others
+    # depend on gets +100 (category values are inherited from SchedulerCore and can be customized)
+    priority_model = PriorityModel(time_unit=1, staged=True, prerequisite_bonus=100)
     
-    def __init__(self, tasks):
+    def __init__(self, tasks, instrument=False, category_value=None, heap=None, lazy_removal=None):
         """
         Initialize the DP Scheduler
         
@@ -29,68 +43,37 @@ class DP_Scheduler:
         ----------
         tasks: list
             List of Task objects to schedule
+        instrument: bool
+            Record per-phase wall time and counters in self.stats (default: False)
+        category_value: dict
+            The user's {category: value} importance of the categories (default: the class category_value)
+        heap: str or type
+            Not supported: the staged pipeline keeps no heap, so it must be None
+        lazy_removal: bool
+            Not supported: the staged pipeline keeps no ready set, so it must be None
+
+        Raises
+        ----------
+        ValueError if heap or lazy_removal is given
         """
-        self.tasks = tasks.copy()
+        if heap is not None or lazy_removal is not None:
+            raise ValueError("DP does not keep a priority queue; heap and lazy_removal have no effect on it")
+        super().__init__(tasks, instrument, category_value)
         self.scheduled_tasks = []
         self.flexible_tasks = []
-        self.schedule = []  # List of (task, start_time) tuples
         self.completed_tasks = []  # Track completed task IDs
+        self._completed_ids = set()  # the same ids, for lookups
     
-    def time_to_minutes(self, time_str):
+    def run(self, starting_time, end_time=None, availability=None):
         """
-        Convert time string "hh:mm" to minutes since midnight
+        Run the scheduler
         
-        Parameters:
-        ----------
-        time_str: str
-            Time in format "hh:mm"
-            
         Returns:
         ----------
-        int: Minutes since midnight
+        ScheduleResult
         """
-        if time_str == "25:25":
-            return None
-        parts = time_str.split(":")
-        return int(parts[0]) * 60 + int(parts[1])
-    
-    def minutes_to_time(self, minutes):
-        """
-        Convert minutes since midnight to "hh:mm" format
-        
-        Parameters:
-        ----------
-        minutes: int
-            Minutes since midnight
-            
-        Returns:
-        ----------
-        str: Time in format "hh:mm"
-        """
-        h = minutes // 60
-        m = minutes % 60
-        return f"{h:02d}:{m:02d}"
-    
-    def time_difference(self, start_time, end_time):
-        """
-        Calculate time difference in minutes between two times
-        
-        Parameters:
-        ----------
-        start_time: str
-            Start time in "hh:mm" format
-        end_time: str
-            End time in "hh:mm" format
-            
-        Returns:
-        ----------
-        int: Difference in minutes
-        """
-        start_min = self.time_to_minutes(start_time)
-        end_min = self.time_to_minutes(end_time)
-        if start_min is None or end_min is None:
-            return None
-        return end_min - start_min
+        self.schedule_tasks(starting_time, end_time or "24:00", availability)
+        return self.result(self.get_efficiency())
     
     #also filter those which prerequisitues were unrealistic
     def filter_unrealistic_tasks(self, starting_time, end_time="24:00"):
@@ -110,75 +93,19 @@ class DP_Scheduler:
         end_time: str
             End time in "hh:mm" format (default: "24:00")
             
-        Returns:
-        ----------
-        None
-        """
-        start_min = self.time_to_minutes(starting_time)
-        end_min = self.time_to_minutes(end_time)
-        
-        filtered_tasks = []
-        
-        for task in self.tasks:
-            # Filter tasks with invalid duration
-            if task.duration < 1:
-                continue
-            
-            # Check if task has a fixed schedule
-            if task.scheduled != "25:25":
-                task_start = self.time_to_minutes(task.scheduled)
-                task_end = task_start + task.duration
-                
-                # Filter if scheduled outside time window
-                if task_start < start_min or task_end > end_min:
-                    continue
-                
-                # Check if dependencies can be completed in time
-                dep_time = self._calculate_dependency_time(task, start_min)
-                if dep_time > (task_start - start_min):
-                    continue
-            
-            filtered_tasks.append(task)
-        
-        self.tasks = filtered_tasks
-    
-    def _calculate_dependency_time(self, task, start_min):
-        """
-        Calculate total time needed for all dependencies of a task
+        The tasks that are left out are kept in self.dropped_tasks
+        as (task, reason) tuples (see TaskFilter.DROP_REASONS).
         
-        Parameters:
-        ----------
-        task: Task
-            Task object
-        start_min: int
-            Start time in minutes
-            
         Returns:
         ----------
-        int: Total minutes needed for dependencies
+        None
         """
-        if not task.dependencies:
-            return 0
-        
-        total_time = 0
-        visited = set()
-        
-        def dfs_deps(dep_ids):
-            nonlocal total_time
-            for dep_id in dep_ids:
-                if dep_id in visited:
-                    continue
-                visited.add(dep_id)
-                
-                for t in self.tasks:
-                    if t.id == dep_id:
-                        total_time += t.duration
-                        if t.dependencies:
-                            dfs_deps(t.dependencies)
-                        break
-        
-        dfs_deps(task.dependencies)
-        return total_time
+        start_min = to_minutes(starting_time)
+        end_min = to_minutes(end_time)
+        self.graph = DependencyGraph(self.tasks)
+        self.tasks, self.dropped_tasks = partition_tasks(self.tasks, start_min, end_min, self.graph)
+        for task, reason in self.dropped_tasks:
+            print(f"❌ '{task.description}' left out: {DROP_REASONS[reason]}")
     
     def set_priorities(self):
         """
@@ -193,76 +120,7 @@ class DP_Scheduler:
         ----------
         None
         """
-        # Reset priorities
-        for task in self.tasks:
-            task.priority = 0
-        
-        # Set priority based on scheduled time
-        for task in self.tasks:
-            if task.scheduled != "25:25":
-                scheduled_min = self.time_to_minutes(task.scheduled)
-                # Earlier tasks get higher priority (inverse of time)
-                task.priority = 24 * 60 - scheduled_min
-        
-        # Add category-based priority
-        for task in self.tasks:
-            task.priority += self.category_value.get(task.category, 0)
-        
-        # Boost priority for tasks that others depend on
-        for task in self.tasks:
-            # Check if any other task depends on this one
-            for other_task in self.tasks:
-                if task.id in other_task.dependencies:
-                    task.priority += 100
-                    break
-        
-        # Recursively update dependency priorities
-        for task in self.tasks:
-            if task.dependencies:
-                self._update_dependency_priorities(task.dependencies, task.priority + 100)
-        
-        self.priority_randomization()
-    
-    def priority_randomization(self):
-        
-        """
-        In order to have only unique values of priorities, add random float in the range [0;1) 
-        & check uniqueness of priority
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        unique_values = []
-        for task in self.tasks:
-            add = random.random()
-            while task.priority + add in unique_values:
-                add = random.random()
-            task.priority += add
-            unique_values.append(task.priority)
-    
-    def _update_dependency_priorities(self, dependencies, value):
-        """
-        Recursively update priorities of dependent tasks
-        
-        Parameters:
-        ----------
-        dependencies: list
-            List of task IDs that are dependencies
-        value: float
-            Priority value to assign
-        """
-        for dep_id in dependencies:
-            for task in self.tasks:
-                if task.id == dep_id:
-                    task.priority = max(task.priority, value)
-                    if task.dependencies:
-                        self._update_dependency_priorities(task.dependencies, value + 100)
-                    break
+        self.priority_calculation()
     
     def identify_scheduled_tasks(self):
         """
@@ -282,9 +140,9 @@ class DP_Scheduler:
                 self.flexible_tasks.append(task)
         
         # Sort scheduled tasks by their scheduled time
-        self.scheduled_tasks.sort(key=lambda t: self.time_to_minutes(t.scheduled))
+        self.scheduled_tasks.sort(key=lambda t: to_minutes(t.scheduled))
     
-    def find_gaps(self, starting_time, end_time="24:00"):
+    def find_gaps(self, starting_time, end_time="24:00", availability=None):
         """
         Find time gaps between scheduled tasks
         
@@ -294,14 +152,34 @@ class DP_Scheduler:
             Start time in "hh:mm" format
         end_time: str
             End time in "hh:mm" format
+        availability: Availability
+            Free time of the day; gaps are clipped to it (default: everything is free)
             
+        Returns:
+        ----------
+        list: List of tuples (gap_start, gap_end, gap_duration_minutes)
+        """
+        gaps = self._find_raw_gaps(starting_time, end_time)
+        if availability is None:
+            return gaps
+        clipped = []
+        for gap_start, gap_end, _ in gaps:
+            for piece_start, piece_end in availability.clip(gap_start, gap_end):
+                clipped.append((to_time(piece_start), to_time(piece_end),
+                                piece_end - piece_start))
+        return clipped
+    
+    def _find_raw_gaps(self, starting_time, end_time):
+        """
+        Gaps between the scheduled tasks inside [starting_time, end_time]
+        
         Returns:
         ----------
         list: List of tuples (gap_start, gap_end, gap_duration_minutes)
         """
         gaps = []
-        start_min = self.time_to_minutes(starting_time)
-        end_min = self.time_to_minutes(end_time)
+        start_min = to_minutes(starting_time)
+        end_min = to_minutes(end_time)
         
         if not self.scheduled_tasks:
             # No scheduled tasks, one big gap
@@ -311,7 +189,7 @@ class DP_Scheduler:
             return gaps
         
         # Gap before first scheduled task
-        first_task_start = self.time_to_minutes(self.scheduled_tasks[0].scheduled)
+        first_task_start = to_minutes(self.scheduled_tasks[0].scheduled)
         if first_task_start > start_min:
             gap_duration = first_task_start - start_min
             gaps.append((starting_time, self.scheduled_tasks[0].scheduled, gap_duration))
@@ -320,11 +198,11 @@ class DP_Scheduler:
         current_end = first_task_start + self.scheduled_tasks[0].duration
         
         for i in range(1, len(self.scheduled_tasks)):
-            next_task_start = self.time_to_minutes(self.scheduled_tasks[i].scheduled)
+            next_task_start = to_minutes(self.scheduled_tasks[i].scheduled)
             
             if current_end < next_task_start:
                 gap_duration = next_task_start - current_end
-                gap_start = self.minutes_to_time(current_end)
+                gap_start = to_time(current_end)
                 gap_end = self.scheduled_tasks[i].scheduled
                 gaps.append((gap_start, gap_end, gap_duration))
             
@@ -335,7 +213,7 @@ class DP_Scheduler:
         # Gap after last scheduled task
         if current_end < end_min:
             gap_duration = end_min - current_end
-            gap_start = self.minutes_to_time(current_end)
+            gap_start = to_time(current_end)
             gaps.append((gap_start, end_time, gap_duration))
         
         return gaps
@@ -382,7 +260,10 @@ class DP_Scheduler:
         
         
         # Solve knapsack problem
-        max_value, selected_indices = knapsack_01(weights, values, gap_duration)
+        self.stats.count("knapsack_calls")
+        self.stats.count("knapsack_cells", len(weights) * gap_duration)
+        with self.stats.phase("knapsack"):
+            max_value, selected_indices = knapsack_01(weights, values, gap_duration)
         
         # Get selected tasks
         selected_tasks = [candidate_tasks[i] for i in selected_indices]
@@ -408,15 +289,17 @@ class DP_Scheduler:
         if not task.dependencies:
             return True
         for dep_id in task.dependencies:
-            if dep_id not in self.completed_tasks:
+            self.stats.count("dependency_lookups")
+            if dep_id not in self._completed_ids:
                 return False
         return True
     
-    def schedule_tasks(self, starting_time, end_time="24:00"):
+    def schedule_tasks(self, starting_time, end_time="24:00", availability=None):
         """
         Main scheduling function using DP approach
         
         Steps:
+        0. Validate the tasks (drop cycles and duplicate ids, strip missing dependencies)
         1. Filter unrealistic tasks
         2. Set priorities
         3. Identify scheduled tasks
@@ -429,103 +312,127 @@ class DP_Scheduler:
             Start time in "hh:mm" format
         end_time: str
             End time in "hh:mm" format (default: "24:00")
+        availability: Availability or list
+            Free intervals of the day, as an Availability or (start, end) pairs
+            in minutes or "hh:mm"; flexible tasks are only placed in free time
+            (default: the whole window is free)
             
         Returns:
         ----------
         list: List of tuples (task, start_time) representing the schedule
         """
+        stats = self.stats
+        
+        # Step 0: Validate the task graph
+        with stats.phase("validate"):
+            self.validate()
+        
         # Step 1: Filter unrealistic tasks
-        self.filter_unrealistic_tasks(starting_time, end_time)
+        with stats.phase("filter_unrealistic_tasks"):
+            self.filter_unrealistic_tasks(starting_time, end_time)
         
         # Step 2: Set priorities
-        self.set_priorities()
+        with stats.phase("set_priorities"):
+            self.set_priorities()
         
         # Step 3: Identify scheduled and flexible tasks
-        self.identify_scheduled_tasks()
+        with stats.phase("identify_scheduled_tasks"):
+            self.identify_scheduled_tasks()
         
         # Step 4: Find gaps
-        gaps = self.find_gaps(starting_time, end_time)
+        if availability is not None and not isinstance(availability, Availability):
+            availability = Availability(availability)
+        with stats.phase("find_gaps"):
+            gaps = self.find_gaps(starting_time, end_time, availability)
         
         # Step 5: Build schedule
-        self.schedule = []
-        self.completed_tasks = []
-        available_flexible = self.flexible_tasks.copy()
-        
-        # Create a mapping of gaps to the scheduled task that comes after them
-        # This helps us know which scheduled task to mark as completed after filling a gap
-        gap_to_scheduled_task = {}
-        scheduled_task_index = 0
-        
-        for gap_start, gap_end, gap_duration in gaps:
-            # Find the scheduled task that starts at gap_end (if any)
-            scheduled_task_after_gap = None
-            for task in self.scheduled_tasks:
-                if task.scheduled == gap_end:
-                    scheduled_task_after_gap = task
-                    break
-            gap_to_scheduled_task[(gap_start, gap_end, gap_duration)] = scheduled_task_after_gap
-        
-        # Fill gaps with flexible tasks using knapsack
-        for gap_start, gap_end, gap_duration in gaps:
-            # Get tasks available for this gap
-            gap_tasks = [t for t in available_flexible if t.id not in self.completed_tasks]
+        if self.flexible_fast_path and not self.scheduled_tasks:
+            with stats.phase("flexible_fast_path"):
+                self._fill_flexible(gaps)
+            return self.schedule
+        with stats.phase("fill_gaps"):
+            self.schedule = []
+            self.completed_tasks = []
+            self._completed_ids = set()
+            available_flexible = self.flexible_tasks.copy()
+        
+            # Scheduled tasks are added (and count as completed) once a gap after their start is reached
+            next_scheduled = 0
+        
+            # Fill gaps with flexible tasks using knapsack
+            for gap_start, gap_end, gap_duration in gaps:
+                while (next_scheduled < len(self.scheduled_tasks)
+                       and self.time_difference(self.scheduled_tasks[next_scheduled].scheduled, gap_start) >= 0):
+                    task = self.scheduled_tasks[next_scheduled]
+                    next_scheduled += 1
+                    if task.id not in self._completed_ids:
+                        self.schedule.append((task, task.scheduled))
+                        self.completed_tasks.append(task.id)
+                        self._completed_ids.add(task.id)
+                        available_flexible = [t for t in available_flexible if t.id != task.id]
+                
+                # Get tasks available for this gap
+                gap_tasks = [t for t in available_flexible if t.id not in self._completed_ids]
             
-            # Fill gap using knapsack
-            selected_tasks = self.fill_gap_with_knapsack(gap_start, gap_duration, gap_tasks)
+                # Fill gap using knapsack
+                selected_tasks = self.fill_gap_with_knapsack(gap_start, gap_duration, gap_tasks)
             
-            # Schedule selected tasks sequentially
-            current_gap_time = gap_start
-            while self.time_difference(current_gap_time,  gap_end) > 0 and len(selected_tasks) > 0:
-                for task in selected_tasks: 
-                    self.schedule.append((task, current_gap_time))
+                # Schedule selected tasks sequentially
+                current_gap_time = gap_start
+                while self.time_difference(current_gap_time,  gap_end) > 0 and len(selected_tasks) > 0:
+                    for task in selected_tasks: 
+                        self.schedule.append((task, current_gap_time))
+                        self.completed_tasks.append(task.id)
+                        self._completed_ids.add(task.id)
+                        current_gap_time = add_minutes(current_gap_time, task.duration)
+                        # Remove from available flexible tasks
+                        available_flexible = [t for t in available_flexible if t.id != task.id]
+                    gap_tasks = [t for t in available_flexible if t.id not in self._completed_ids]
+                    selected_tasks = self.fill_gap_with_knapsack(current_gap_time, self.time_difference(current_gap_time, gap_end), gap_tasks)
+        
+            # Handle scheduled tasks that start after the last gap
+            for task in self.scheduled_tasks:
+                if task.id not in self._completed_ids:
+                    self.schedule.append((task, task.scheduled))
                     self.completed_tasks.append(task.id)
-                    current_gap_time = self._add_minutes(current_gap_time, task.duration)
-                    # Remove from available flexible tasks
+                    self._completed_ids.add(task.id)
                     available_flexible = [t for t in available_flexible if t.id != task.id]
-                gap_tasks = [t for t in available_flexible if t.id not in self.completed_tasks]
-                selected_tasks = self.fill_gap_with_knapsack(current_gap_time, self.time_difference(current_gap_time, gap_end), gap_tasks)
-            
-            # After filling the gap, mark the scheduled task that comes after this gap as completed
-            scheduled_task_after_gap = gap_to_scheduled_task[(gap_start, gap_end, gap_duration)]
-            if scheduled_task_after_gap:
-                # Add the scheduled task to the schedule
-                self.schedule.append((scheduled_task_after_gap, scheduled_task_after_gap.scheduled))
-                self.completed_tasks.append(scheduled_task_after_gap.id)
-                # Remove from available flexible tasks if it was there
-                available_flexible = [t for t in available_flexible if t.id != scheduled_task_after_gap.id]
-        
-        # Handle scheduled tasks that don't have a gap before them
-        # (e.g., if a scheduled task starts immediately after another)
-        for task in self.scheduled_tasks:
-            if task.id not in self.completed_tasks:
-                # This scheduled task doesn't have a gap before it, so add it now
-                self.schedule.append((task, task.scheduled))
-                self.completed_tasks.append(task.id)
-                available_flexible = [t for t in available_flexible if t.id != task.id]
         
         # Sort schedule by start time
-        self.schedule.sort(key=lambda x: self.time_to_minutes(x[1]))
+        self.schedule.sort(key=lambda x: to_minutes(x[1]))
         
         return self.schedule
     
-    def _add_minutes(self, time_str, minutes):
+    def _fill_flexible(self, gaps):
         """
-        Add minutes to a time string
+        Fast path of step 5 when no task has a fixed time: there are no scheduled
+        tasks to place between the gaps, so each free window is filled directly by
+        knapsack rounds (a new round only schedules tasks whose prerequisites were
+        done in the previous one)
         
         Parameters:
         ----------
-        time_str: str
-            Time in "hh:mm" format
-        minutes: int
-            Minutes to add
-            
-        Returns:
-        ----------
-        str: New time in "hh:mm" format
+        gaps: list
+            (gap_start, gap_end, gap_duration) free windows from find_gaps
         """
-        time_min = self.time_to_minutes(time_str)
-        new_min = time_min + minutes
-        return self.minutes_to_time(new_min)
+        self.schedule = []
+        self.completed_tasks = []
+        self._completed_ids = set()
+        available = self.flexible_tasks
+        for gap_start, gap_end, gap_duration in gaps:
+            current_time = gap_start
+            remaining = gap_duration
+            while remaining > 0 and available:
+                selected_tasks = self.fill_gap_with_knapsack(current_time, remaining, available)
+                if not selected_tasks:
+                    break
+                for task in selected_tasks:
+                    self.schedule.append((task, current_time))
+                    self.completed_tasks.append(task.id)
+                    self._completed_ids.add(task.id)
+                    current_time = add_minutes(current_time, task.duration)
+                remaining = self.time_difference(current_time, gap_end)
+                available = [t for t in available if t.id not in self._completed_ids]
     
     def print_schedule(self):
         """
@@ -545,7 +452,7 @@ class DP_Scheduler:
         
         total_duration = 0
         for task, start_time in self.schedule:
-            end_time = self._add_minutes(start_time, task.duration)
+            end_time = add_minutes(start_time, task.duration)
             total_duration += task.duration
             print(f"🕰 {start_time} - {end_time} ({task.duration} min)")
             print(f"   📋 {task.description} [ID: {task.id}]")
@@ -556,7 +463,7 @@ class DP_Scheduler:
         
         if self.schedule:
             first_start = self.schedule[0][1]
-            last_end = self._add_minutes(self.schedule[-1][1], self.schedule[-1][0].duration)
+            last_end = add_minutes(self.schedule[-1][1], self.schedule[-1][0].duration)
             total_time = self.time_difference(first_start, last_end)
             efficiency = (total_duration / total_time * 100) if total_time > 0 else 0
             
@@ -568,6 +475,21 @@ class DP_Scheduler:
             print(f"   Efficiency: {efficiency:.2f}%")
             print("="*60)
     
+    def get_efficiency(self):
+        """
+        Share of the scheduled time span that is spent on tasks
+        
+        Returns:
+        ----------
+        float: Efficiency in percent rounded to 2 decimals (0 if nothing is scheduled)
+        """
+        if not self.schedule:
+            return 0
+        total_duration = sum(task.duration for task, _ in self.schedule)
+        last_end = add_minutes(self.schedule[-1][1], self.schedule[-1][0].duration)
+        total_time = self.time_difference(self.schedule[0][1], last_end)
+        return round((total_duration / total_time * 100), 2) if total_time > 0 else 0
+    
     def get_schedule(self):
         """
         Get the current schedule
@@ -578,6 +500,23 @@ class DP_Scheduler:
         """
         return self.schedule
 
+    def time_to_minutes(self, time_str):
+        """
+        Deprecated: minutes since midnight of a "hh:mm" time (None for a flexible
+        task), use SchedulerEngine.to_minutes
+        """
+        warnings.warn("DP_Scheduler.time_to_minutes is deprecated, use SchedulerEngine.to_minutes",
+                      DeprecationWarning, stacklevel=2)
+        return None if time_str == FLEXIBLE else to_minutes(time_str)
+
+    def minutes_to_time(self, minutes):
+        """
+        Deprecated: "hh:mm" of minutes since midnight, use SchedulerEngine.to_time
+        """
+        warnings.warn("DP_Scheduler.minutes_to_time is deprecated, use SchedulerEngine.to_time",
+                      DeprecationWarning, stacklevel=2)
+        return to_time(minutes)
+
 
 # Example usage
 if __name__ == "__main__":
@@ -0,0 +1,164 @@
+"""
+Ready flexible tasks indexed by duration
+
+Answers "the highest key among the entries that take at most `limit` minutes"
+without scanning: the distinct durations are the leaves of a segment tree,
+every leaf keeps a max-heap of the keys of that duration, and every tree node
+holds the highest key below it. Adding, removing and querying cost O(log n).
+"""
+import heapq
+from bisect import bisect_right
+
+_EMPTY = -float("inf")
+
+
+class DurationIndex:
+    """
+    Max-keys over duration buckets
+
+    Keys must be unique (the schedulers use the task priorities).
+
+    Attributes
+    ----------
+    durations: list
+        Sorted distinct durations an entry can have (fixed when the index is created)
+    """
+    def __init__(self, durations=()):
+        self.durations = sorted(set(durations))
+        self._slot = {duration: i for i, duration in enumerate(self.durations)}
+        size = 1
+        while size < len(self.durations):
+            size *= 2
+        self._size = size
+        self._tree = [_EMPTY] * (2 * size)
+        self._buckets = [[] for _ in self.durations]  # negated keys, heapq order
+        self._live = set()
+
+    def __len__(self):
+        return len(self._live)
+
+    def __contains__(self, key):
+        return key in self._live
+
+    def add(self, duration, key):
+        """
+        Add a key with the given duration (one of self.durations)
+
+        Raises
+        ----------
+        KeyError if the duration was not given when the index was created
+        """
+        slot = self._slot[duration]
+        heapq.heappush(self._buckets[slot], -key)
+        self._live.add(key)
+        if key > self._tree[self._size + slot]:
+            self._update(slot)
+
+    def discard(self, duration, key):
+        """Remove a key (nothing happens if it is not in the index)"""
+        if key not in self._live:
+            return
+        self._live.discard(key)
+        slot = self._slot[duration]
+        # keys below the top of their bucket are dropped lazily when they reach it
+        if key == self._tree[self._size + slot]:
+            self._update(slot)
+
+    def best(self, limit):
+        """
+        Highest key with a duration of at most limit
+
+        Parameters
+        ----------
+        limit: int
+            Available minutes
+
+        Returns
+        ----------
+        the key, or None if no entry fits
+        """
+        tree = self._tree
+        low = self._size
+        high = self._size + bisect_right(self.durations, limit)
+        best = _EMPTY
+        while low < high:
+            if low & 1:
+                best = max(best, tree[low])
+                low += 1
+            if high & 1:
+                high -= 1
+                best = max(best, tree[high])
+            low //= 2
+            high //= 2
+        return None if best == _EMPTY else best
+
+    def _update(self, slot):
+        """Drop removed keys off the top of a bucket and refresh the maxima above it"""
+        bucket = self._buckets[slot]
+        while bucket and -bucket[0] not in self._live:
+            heapq.heappop(bucket)
+        tree = self._tree
+        i = self._size + slot
+        tree[i] = -bucket[0] if bucket else _EMPTY
+        i //= 2
+        while i:
+            tree[i] = max(tree[2 * i], tree[2 * i + 1])
+            i //= 2
+
+
+def test_duration_index_best():
+    """
+    Tests DurationIndex.best at and around the duration limits
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    print("Running test cases...")
+    index = DurationIndex([30, 10, 60, 30])
+    assert index.durations == [10, 30, 60]
+    assert index.best(1000) is None  # empty
+
+    index.add(10, 5)
+    index.add(30, 40)
+    index.add(30, 20)
+    index.add(60, 90)
+    assert len(index) == 4 and 40 in index
+
+    print("Test 1: limits below, at and between the durations")
+    assert index.best(9) is None
+    assert index.best(10) == 5   # a duration equal to the limit fits
+    assert index.best(29) == 5
+    assert index.best(30) == 40
+    assert index.best(59) == 40
+    assert index.best(60) == 90
+    assert index.best(10 ** 6) == 90
+    assert index.best(0) is None and index.best(-5) is None
+
+    print("Test 2: discarding keys")
+    index.discard(30, 20)  # below the top of its bucket
+    assert index.best(30) == 40
+    index.discard(30, 40)
+    assert index.best(30) == 5 and index.best(59) == 5
+    index.discard(30, 40)  # already gone: nothing happens
+    index.discard(60, 90)
+    assert index.best(10 ** 6) == 5
+    index.add(30, 20)  # added back after being discarded
+    assert index.best(30) == 20 and len(index) == 2
+
+    print("Test 3: unknown durations")
+    try:
+        index.add(45, 7)
+        raise AssertionError("added a duration the index was not created with")
+    except KeyError:
+        pass
+    assert index.best(45) == 20
+
+    print("All tests passed!")
+
+
+#test_duration_index_best()
@@ -0,0 +1,271 @@
+"""
+Scheduling over several days
+
+Every day is planned on its own window with one of the single-day schedulers.
+Flexible tasks that do not fit are carried forward to the next day, fixed-time
+tasks that cannot be done on their day are reported as missed, and the tasks
+completed so far count as done dependencies. A day is computed only from the
+state left by the previous one, so adding another day never re-solves the
+days before it.
+"""
+from TaskClass import Task
+from SchedulerEngine import DEFAULT_END_TIME, FLEXIBLE, to_minutes
+from BatchScheduler import schedule_one
+
+# Why a task will not be done
+BLOCKED = "blocked"                  # a prerequisite was missed
+WAITING = "waiting"                  # a prerequisite is not in the plan (yet)
+INVALID = "invalid"                  # left out by validation (cycle or duplicate id)
+NOT_SCHEDULED = "not_scheduled"      # fixed-time task that did not fit its day
+
+
+class HorizonScheduler:
+    """
+    Rolling multi-day scheduler
+
+    Attributes
+    ----------
+    algorithm: str
+        Single-day scheduler used for every day ("TaskScheduler", "ImprovedGreedy" or "DP")
+    pending: list
+        Task objects that still have to be scheduled (carried into the next day)
+    completed: set
+        Ids of the tasks done so far (or done before the first day)
+    missed: dict
+        {task id: reason} of the tasks that will not be done
+    days: list
+        Results of the planned days, see plan_day
+    """
+    def __init__(self, tasks=(), algorithm="DP", completed_ids=()):
+        self.algorithm = algorithm
+        self.pending = list(tasks)
+        self.completed = set(completed_ids)
+        self.missed = {}
+        self.days = []
+
+    def _excluded(self, day_tasks):
+        """
+        Tasks that cannot be scheduled today because of their prerequisites
+
+        Returns
+        ----------
+        dict {task id: BLOCKED or WAITING}
+        """
+        known = {task.id for task in day_tasks}
+        dependants = {}
+        blocked, waiting = [], []
+        for task in day_tasks:
+            for dep in task.dependencies:
+                if dep in self.completed:
+                    continue
+                if dep in self.missed:
+                    blocked.append(task.id)
+                elif dep not in known:
+                    waiting.append(task.id)
+                else:
+                    dependants.setdefault(dep, []).append(task.id)
+        excluded = {}
+        # a missed prerequisite blocks every dependant, a missing one only delays them
+        for reason, frontier in ((BLOCKED, blocked), (WAITING, waiting)):
+            frontier = [task_id for task_id in frontier if task_id not in excluded]
+            for task_id in frontier:
+                excluded[task_id] = reason
+            while frontier:
+                for dependant in dependants.get(frontier.pop(), ()):
+                    if dependant not in excluded:
+                        excluded[dependant] = reason
+                        frontier.append(dependant)
+        return excluded
+
+    def plan_day(self, starting_time, end_time=DEFAULT_END_TIME, tasks=(), availability=None):
+        """
+        Plan the next day from the pending tasks and the tasks added for this day
+
+        Parameters
+        ----------
+        starting_time: str
+          "hh:mm" when the day starts
+        end_time: str
+          "hh:mm" when the day ends, nothing is scheduled to end after it
+        tasks: list
+          new Task objects for this day (fixed-time tasks are for this day)
+        availability: Availability or list
+          free intervals of this day, e.g. without the commute (default: the whole window)
+
+        Returns
+        ----------
+        dict with the day index, the window, the schedule entries, the efficiency
+        (None if the scheduler's plan had to be cut at end_time), the utilization of the window (%), the validation diagnostics, the ids
+        carried to the next day and the missed tasks ({"id": ..., "reason": ...})
+        """
+        # an id can only be used once over the whole horizon
+        day_tasks, duplicates = [], []
+        ids = set()
+        for task in self.pending + list(tasks):
+            if task.id in ids or task.id in self.completed or task.id in self.missed:
+                duplicates.append(task)
+            else:
+                ids.add(task.id)
+                day_tasks.append(task)
+        excluded = self._excluded(day_tasks)
+        inputs = []
+        for task in day_tasks:
+            if task.id in excluded:
+                continue
+            data = task.to_dict()
+            data["dependencies"] = [dep for dep in task.dependencies if dep not in self.completed]
+            inputs.append(Task.from_dict(data))
+
+        result = schedule_one(self.algorithm, inputs, starting_time, end_time, availability)
+        # keep the window: drop everything from the first task that would end after end_time
+        end_minutes = to_minutes(end_time)
+        schedule = []
+        for entry in result["schedule"]:
+            if to_minutes(entry["end"]) > end_minutes:
+                break
+            schedule.append(entry)
+        done = {entry["id"] for entry in schedule}
+        self.completed |= done
+
+        invalid = set()
+        for diagnostic in result["diagnostics"]:
+            if diagnostic["kind"] in ("cycle", "blocked_by_cycle"):
+                invalid.update(diagnostic["task_ids"])
+        dropped = {item["id"]: item["reason"] for item in result["dropped"]}
+
+        carried = []
+        missed = [{"id": task.id, "reason": INVALID} for task in duplicates]
+        for task in day_tasks:
+            if task.id in done:
+                continue
+            flexible = task.scheduled == FLEXIBLE
+            if task.id in invalid:
+                reason = INVALID
+            elif excluded.get(task.id) == BLOCKED:
+                reason = BLOCKED
+            elif task.id in dropped and not (flexible and task.duration >= 1):
+                reason = dropped[task.id]
+            elif flexible:
+                carried.append(task)
+                continue
+            else:
+                reason = excluded.get(task.id, NOT_SCHEDULED)
+            self.missed[task.id] = reason
+            missed.append({"id": task.id, "reason": reason})
+        self.pending = carried
+
+        busy = sum(entry["duration"] for entry in schedule)
+        window = end_minutes - to_minutes(starting_time)
+        day = {
+            "day": len(self.days),
+            "starting_time": starting_time,
+            "end_time": end_time,
+            "schedule": schedule,
+            "efficiency": result["efficiency"] if len(schedule) == len(result["schedule"]) else None,
+            "utilization": round(busy / window * 100, 2) if window > 0 else 0,
+            "diagnostics": result["diagnostics"],
+            "carried": [task.id for task in carried],
+            "missed": missed,
+        }
+        self.days.append(day)
+        return day
+
+    def plan(self, days):
+        """
+        Plan several days in a row
+
+        Parameters
+        ----------
+        days: iterable
+          one (starting_time, end_time), (starting_time, end_time, tasks) or
+          (starting_time, end_time, tasks, availability) tuple per day
+
+        Returns
+        ----------
+        list of the day results (see plan_day)
+        """
+        return [self.plan_day(*day) for day in days]
+
+
+def plan_horizon(tasks, n_days, starting_time, end_time=DEFAULT_END_TIME, algorithm="DP"):
+    """
+    Plan a backlog of tasks over n_days days with the same window every day
+
+    Parameters
+    ----------
+    tasks: list
+      Task objects (fixed-time tasks are for the first day)
+    n_days: int
+      number of days
+    starting_time: str
+      "hh:mm" when every day starts
+    end_time: str
+      "hh:mm" when every day ends
+    algorithm: str
+      single-day scheduler to use
+
+    Returns
+    ----------
+    HorizonScheduler with the planned days in .days and the leftovers in .pending
+    """
+    horizon = HorizonScheduler(tasks, algorithm)
+    horizon.plan([(starting_time, end_time)] * n_days)
+    return horizon
+
+
+def test_horizon():
+    """
+    Tests planning over several days: flexible tasks carried to the next day,
+    fixed-time tasks that are missed on their day, dependants of missed tasks,
+    duplicate ids and every day starting again at its own starting time
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskFilter import OUTSIDE_WINDOW
+
+    print("Running test cases...")
+    tasks = [
+        Task(id=1, description="Report", duration=120),
+        Task(id=2, description="Slides", duration=90, dependencies=[1]),
+        Task(id=3, description="Standup", duration=30, scheduled="09:30"),
+        Task(id=4, description="Early call", duration=15, scheduled="08:00"),  # before the day starts
+        Task(id=5, description="Follow-up", duration=20, dependencies=[4]),
+        Task(id=6, description="Email", duration=15),
+    ]
+    horizon = HorizonScheduler(tasks, "DP")
+    days = horizon.plan([
+        ("09:00", "11:00"),
+        ("09:00", "11:00", [Task(id=7, description="Dentist", duration=30, scheduled="10:30"),
+                            Task(id=6, description="Email again", duration=5)]),
+        ("09:00", "11:00"),
+        ("09:00", "11:00"),
+    ])
+    slots = [[(entry["id"], entry["start"], entry["end"]) for entry in day["schedule"]] for day in days]
+
+    print("Test 1: day 0, the report does not fit and a fixed-time task is missed")
+    assert slots[0] == [(6, "09:00", "09:15"), (3, "09:30", "10:00")], slots[0]
+    assert days[0]["carried"] == [1, 2, 5]
+    assert days[0]["missed"] == [{"id": 4, "reason": OUTSIDE_WINDOW}]
+
+    print("Test 2: day 1, the new fixed-time task leaves no room, the missed task blocks its dependant")
+    assert slots[1] == [(7, "10:30", "11:00")], slots[1]
+    assert days[1]["carried"] == [1, 2]
+    assert days[1]["missed"] == [{"id": 6, "reason": INVALID}, {"id": 5, "reason": BLOCKED}]
+
+    print("Test 3: days 2 and 3 start at 09:00 again, a done prerequisite counts on the next day")
+    assert slots[2] == [(1, "09:00", "11:00")], slots[2]
+    assert slots[3] == [(2, "09:00", "10:30")], slots[3]
+    assert horizon.pending == [] and horizon.completed == {1, 2, 3, 6, 7}
+    assert horizon.missed == {4: OUTSIDE_WINDOW, 5: BLOCKED}
+    assert tasks[1].dependencies == [1] and tasks[4].dependencies == [4]  # the given tasks are unchanged
+
+    print("All tests passed!")
+
+
+#test_horizon()
@@ -1,318 +1,109 @@
-from MaxHeap import MaxHeapq 
 from KnapSack import knapsack_01
-#from MaxHeap import MaxHeapq 
-import random
+from TaskGraph import DependencyGraph
+from TaskFilter import partition_tasks, DROP_REASONS, OUTSIDE_WINDOW
+from Availability import Availability
+from SchedulerEngine import SchedulerCore, PriorityModel, register_strategy
 
-class ImprovedGreedy_Scheduler:
+@register_strategy("ImprovedGreedy")
+class ImprovedGreedy_Scheduler(SchedulerCore):
     """
     A Simple Daily Task Scheduler Using Priority Queues
 
     tasks - the list of the Task() objects, that we want to schedule
-    priority_queue - MaxHeapq() of the priority value for each of the tasks
+    priority_queue - ReadySet() of the priority value for each of the tasks
+    schedule - list of (task, start_time) tuples in the order the tasks were done
+    diagnostics - problems found in the tasks before scheduling (see TaskValidation);
+            tasks in dependency cycles or with duplicate ids are left out
+    graph - DependencyGraph of the tasks, built by filter_tasks
+    day_minutes - length of the day from the starting to the end time, set by filter_tasks
+    dropped_tasks - (task, reason) tuples of the tasks left out by filter_tasks
+    stats - dict with per-phase wall time and operation counters, filled only when
+            the scheduler is created with instrument=True
+
+    Slot selection: the highest-priority task goes next; the free time before a
+    fixed-time task is filled with the best set of flexible tasks (0/1 knapsack).
     """
-    # Each Task has a category. Each of the categories has a value that 
-    # represents how strongly we should prioritize tasks from this category
-    category_value = {"Routine" : 20, "Family" : 15, "Growth" : 15, "Friends" : 10, "Hobby" : 5, "Other" : 0}
-    
-    def __init__(self, tasks):
-        self.tasks = tasks
-        self.priority_queue = [] 
-
-    def priority_calculation(self):
-        """
-        Calculates the priority of each task based on the dependencies,  
-        scheduling and the category of the task
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        for task in self.tasks:
-            #set priority based on the time, the sooner it is scheduled, the higher priority 
-            if task.scheduled != "25:25":
-                task.priority = max(task.priority, 24 * 3600 - int(task.scheduled.split(":")[0]) * 3600 - int(task.scheduled.split(":")[1]) * 60)
-            # increase the priority depending on the importance of the category
-            task.priority += self.category_value[task.category]
-            # updates the priority of all dependencies of the current task
-            self.update_dependencies_priority(task.dependencies, task.priority + 100)
-        self.priority_randomization()
-    
-    def update_dependencies_priority(self, dependencies, value):
-        
-        """
-        Updates the priority of the dependent task, choosing the biggest between its 
-        current priority and the priority of the following task (dependant) increased by 100
-
-        Parameters
-        ----------
-        dependencies: list
-          list of id's of dependencies
-        value: int
-          the increased by 100 priority of the dependant task
-
-        Returns
-        ----------
-        None
-        """
-        if len(dependencies) > 0:
-            for dependency in dependencies:
-                found = False
-                for t in self.tasks:
-                    if t.id == dependency:
-                        found = True
-                        t.priority = max(t.priority, value)
-                        self.update_dependencies_priority(t.dependencies, value + 100)
-                if not found:
-                    dependencies.remove(dependency)
-
-    def priority_randomization(self):
-        
-        """
-        In order to have only unique values of priorities, add random float in the range [0;1) 
-        & check uniqueness of priority
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        unique_values = []
-        for task in self.tasks:
-            add = random.random()
-            while task.priority + add in unique_values:
-                add = random.random()
-            task.priority += add
-            unique_values.append(task.priority)
-
-    def create_queue(self):
-        
-        """
-        Create MaxHeap based on the tasks' priority
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        self.priority_queue = MaxHeapq()
-        for task in self.tasks:
-            self.priority_queue.heappush(task.priority)
-    
-    def find_priority(self, id):
-        
-        """
-        Find the value of the Task priority based on the given id
-
-        Parameters
-        ----------
-        id: int
-          the id of the task
-
-        Returns
-        ----------
-        int
-          the priority the  task
-        """
-        for task in self.tasks:
-            if task.id == id:
-                return task.priority
-        return None
-        
-    def print_self(self):
-        
-        """
-        Print the all the Tasks added to the Scheduler 
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        print("Tasks added to the simple scheduler:")
-        print("--------------------------------------")
-        for t in self.tasks:
-            print(f"➡️'{t.description}', duration = {t.duration} mins.")   
-            if len(t.dependencies)>0:
-                print(f"\t ⚠️ This task depends on others!")     
-
-    def find_task(self, priority_value):
-        
-        """
-        Find the instant of the class Task, that has indicated priority 
-
-        Parameters
-        ----------
-        priority_value: int
-          the value of the priority of the task
+    # priority of a fixed-time task is measured in seconds until midnight
+    priority_model = PriorityModel(time_unit=60)
 
-        Returns
-        ----------
-        Object of the Task():
-            the instant of the class Task, that has indicated priority 
-        """
-        for task in self.tasks:
-            if task.priority == priority_value:
-                return task
-        return None
-
-    def new_time(self, old_time, time_passed):
-        
-        """
-        Calculate new current time
-
-        Parameters
-        ----------
-        old_time: string
-          "hh:mm" that represents when the task has been started
-        time_passed: int
-          how many minutes is duration of the task
-        
-        Returns
-        ----------
-        str:  time when the task ends in the format "hh:mm"
-        """
-        h = int(old_time.split(":")[0])
-        m = int(old_time.split(":")[1])
-        h += time_passed // 60
-        m += time_passed % 60
-        if m >= 60:
-            h += 1
-            m -= 60
-        if m < 10:
-            return str(h)+":0"+str(m)
-        return str(h)+":"+str(m)
-    
-    def time_difference(self, now, ordered):
-        
-        """
-        Find the time_difference in minutus between current time and 
-        when the next priority task is scheduled
-
-        Parameters
-        ----------
-        now: string
-          "hh:mm" that represents when current time
-        ordered: string
-          "hh:mm" when the next priority task should start
+    def __init__(self, tasks, instrument=False, category_value=None, heap=None, lazy_removal=None):
+        super().__init__(tasks, instrument, category_value, heap, lazy_removal)
+        self.day_minutes = None # set by filter_tasks
 
-        Returns
-        ----------
-        int:
-          minutes between the current time and the beginning of the next in the priority queue
-        """
-        return (int(ordered.split(":")[0]) * 60 + int(ordered.split(":")[1])) - (int(now.split(":")[0]) * 60 + int(now.split(":")[1]))
-        
-    def printing(self, current_task, current_time):
+    def run(self, starting_time, end_time=None, availability=None):
         """
-        Prints the information about current task and updates time afer its completion
-
-        Parameters
-        ----------
-        current_task: Task
-          Task that is currently getting done
-        current_time: string
-          "hh:mm" that represents the time when current task starts
+        Run the scheduler
 
         Returns
         ----------
-        string :
-          "hh:mm" that represents the time after current task completion
+        ScheduleResult
         """
-        print(f"🕰t={current_time}")
-        print(f"\tstarted '{current_task.description}' for {current_task.duration} mins...")
-        current_time = self.new_time(current_time, current_task.duration )
-        print(f"\t✅ t={(current_time)}, task completed!")
-        return current_time
-
-    def total_time(self, dependencies, time):
-        
-        """
-        Calculate the total time of the dependencies
-        
-        Parameters
-        """
-        if len(dependencies) == 0:
-            return 0
-        for dependency in dependencies:
-            for task in self.tasks:
-                if task.id == dependency:
-                    time += task.duration
-                    time += self.total_time(task.dependencies, time)
-        return time
+        return self.result(self.run_task_scheduler(starting_time, end_time, availability))
     
-    def combined_total_time(self, dependencies, time, ids, queue):
+    def combined_total_time(self, dependencies, time, ids, queue, limit=None):
         
         """
         Calculate the total time of the dependencies
         
         Parameters
+        ----------
+        limit: int
+          minutes the task and its dependencies have to fit in; the sum stops growing
+          once it is above the limit (default: the length of the day, see filter_tasks)
         """
-        if len(dependencies) == 0 or time > 16 * 60:
+        if limit is None:
+            limit = self.day_minutes
+        if len(dependencies) == 0 or (limit is not None and time > limit):
             return time, ids
         for dependency in dependencies:
             ids.append(dependency)
-            for task in self.tasks:
-                if task.id == dependency and task.priority in queue:
-                    if task.scheduled != "25:25":
-                        return 10000, ids
-                    else:
-                        time += task.duration
-                    time, ids = self.combined_total_time(task.dependencies, time, ids, queue)
+            self.stats.count("dependency_lookups")
+            task = self._by_id.get(dependency)
+            if task is not None and task.priority in queue:
+                if task.scheduled != "25:25":
+                    return 10000, ids
+                else:
+                    time += task.duration
+                time, ids = self.combined_total_time(task.dependencies, time, ids, queue, limit)
         return time, ids
 
 
-    def filter_tasks(self, starting_time):
+    def filter_tasks(self, starting_time, end_time=None):
         """
         Filter out the tasks that are not possible to do in the given time period
         by the next rules:
         - the task is not possible to do if it is scheduled before the starting time
         - the task is not possible to do if it is scheduled after the end of the time period
         - the task is not possible to do if it has duration less than 1 minute
+        - the task is not possible to do if its prerequisites cannot be done before it
+          (checked on the precomputed dependency graph, see TaskGraph)
+        The tasks that are left out are kept in self.dropped_tasks as (task, reason) tuples.
 
         Parameters
         ----------
         starting_time: string
           "hh:mm" that represents when we start the first tasks
+        end_time: string
+          "hh:mm" that represents the end of the time period (default: 16 hours after starting_time)
 
         Returns
         ----------
         None
         """
-        i = 0
         start_minutes = self.time_difference("00:00", starting_time)
-        end_minutes = start_minutes + 16 * 60
-        while i < len(self.tasks) - 1:
-            if self.tasks[i].duration < 1: #exluding tasks that have duration less than a minute
-                self.tasks.remove(self.tasks[i])
-            elif self.tasks[i].scheduled != "25:25":
-                scheduled_minutes = self.time_difference("00:00", self.tasks[i].scheduled)
-                # exluding tasks that start or finish outside of time awake
-                if scheduled_minutes < start_minutes or scheduled_minutes + self.tasks[i].duration > end_minutes:
-                    self.tasks.remove(self.tasks[i])
-                # exluding tasks that has prerequisites completion time larger than time available at this moment
-                elif self.total_time(self.tasks[i].dependencies, 0) > self.time_difference(starting_time, self.tasks[i].scheduled):
-                    self.tasks.remove(self.tasks[i])
-                else:
-                    i += 1
-            else:
-                i += 1
+        if end_time is None:
+            end_minutes = start_minutes + 16 * 60
+        else:
+            end_minutes = self.time_difference("00:00", end_time)
+        self.day_minutes = end_minutes - start_minutes
+        self.graph = DependencyGraph(self.tasks)
+        self.tasks, self.dropped_tasks = partition_tasks(self.tasks, start_minutes, end_minutes, self.graph)
+        for task, reason in self.dropped_tasks:
+            print(f"❌ '{task.description}' left out: {DROP_REASONS[reason]}")
         
     #def multi_tasking()
     
-    def run_task_scheduler(self, starting_time):
+    def run_task_scheduler(self, starting_time, end_time=None, availability=None):
         
         """
         Runs the scheduler that calculates priorities of the given task 
@@ -322,61 +113,106 @@ class ImprovedGreedy_Scheduler:
         ----------
         starting_time: string
           "hh:mm" that represents when we start the first tasks
+        end_time: string
+          "hh:mm" when the day ends (default: 16 hours after starting_time,
+          flexible tasks are then not limited by it)
+        availability: Availability or list
+          free intervals of the day, as an Availability or (start, end) pairs in
+          minutes or "hh:mm"; flexible tasks are only done in free time
 
         Returns
         ----------
         None
         """
         current_time = starting_time
+        self.schedule = []
         durations_sum = 0 # how many minutes were spent in action
         tasks_done = []
+        stats = self.stats
         print("Running a simple scheduler:\n")
-        self.filter_tasks(starting_time) # filter out the tasks that are not possible to do in the given time period
-        self.priority_calculation() # calculate the priorities of the tasks
-        self.create_queue() # create the priority queue
-        while self.priority_queue.heap_size>0:
-            current_task = self.find_task(self.priority_queue.heappop()) #get all the information about the task
-            tasks_done.append(current_task.id)
-            # Accomodating the case if there is a schedule
-            if self.time_difference(current_time, current_task.scheduled) < 0:
-                print(f"Schedule overlap happened with task {current_task.description}")
-                continue
-            #if the current task is scheduled for specific time, let's check if we still can do smth before the time comes
-            if current_task.scheduled != "25:25":
-                option = 1 #We have option to do smth in between now and time when current task is scheduled
-                diff = self.time_difference(current_time, current_task.scheduled) #how many minutes we have btw now and time of the current task
-                #Do as much tasks as possible in time diff, based on the priority
-                print("There is ", diff, "minutes to the next task")
-                #while diff > 0 and option:
-                if diff > 0 and option:
-                    minutes, priorities = [], []
-                    items = 0
-                    correspondence_to_id = {}
-                    for task in self.tasks:
-                        if (task.scheduled == "25:25" and task.duration <= diff and task.priority in self.priority_queue.heap):
-                            if len(task.dependencies) == 0  or self.combined_total_time(task.dependencies, task.duration, [task.id], self.priority_queue.heap)[0] <= diff:
-                                i = 0
-                                while i < len(priorities) and priorities[i] > task.priority:
-                                    i+=1
-                                minutes.append(task.duration)
-                                priorities.append(task.priority)
-                                if i != len(priorities) - 1:
-                                    minutes = minutes[:i] + [task.duration] + minutes[i:-1]
-                                    priorities = priorities[:i] + [task.priority] + priorities[i:-1]
-                                correspondence_to_id[items] = task.id
-                                items += 1
-                    if len(minutes) > 0:
-                        utility, selected_items = knapsack_01(minutes, priorities, diff)
-                        for item in selected_items: 
-                            if priorities[item] in self.priority_queue.heap:
-                                self.priority_queue.remove(priorities[item]) # remove it from the main priority queue
-                                durations_sum += minutes[item]
-                            current_time = self.printing(self.find_task(priorities[item]), current_time) #Print ant update current time
-
-                current_time = current_task.scheduled #after no more tasks can be done in between, we move on the previously scheduled task
-            
-            durations_sum += current_task.duration
-            current_time = self.printing(current_task, current_time)         
+        with stats.phase("validate"):
+            self.validate()
+        if availability is not None and not isinstance(availability, Availability):
+            availability = Availability(availability)
+        if end_time is not None:
+            # nothing can be done after the end of the day
+            window = Availability([(starting_time, end_time)])
+            availability = window if availability is None else Availability(availability.clip(starting_time, end_time))
+        with stats.phase("filter_tasks"):
+            self.filter_tasks(starting_time, end_time) # filter out the tasks that are not possible to do in the given time period
+        with stats.phase("priority_calculation"):
+            self.priority_calculation() # calculate the priorities of the tasks
+        if self.flexible_fast_path and all(task.scheduled == "25:25" for task in self.tasks):
+            # no fixed-time tasks: no gaps to fill, priority order is the whole schedule
+            with stats.phase("flexible_fast_path"):
+                current_time, durations_sum = self.run_flexible(current_time, availability)
+        else:
+            with stats.phase("create_queue"):
+                self.create_queue() # create the priority queue
+        with stats.phase("scheduling"):
+            while self.priority_queue.heap_size>0:
+                current_task = self.find_task(self.priority_queue.heappop()) #get all the information about the task
+                tasks_done.append(current_task.id)
+                # Accomodating the case if there is a schedule
+                if self.time_difference(current_time, current_task.scheduled) < 0:
+                    print(f"Schedule overlap happened with task {current_task.description}")
+                    continue
+                #if the current task is scheduled for specific time, let's check if we still can do smth before the time comes
+                if current_task.scheduled != "25:25":
+                    option = 1 #We have option to do smth in between now and time when current task is scheduled
+                    diff = self.time_difference(current_time, current_task.scheduled) #how many minutes we have btw now and time of the current task
+                    #Do as much tasks as possible in time diff, based on the priority
+                    print("There is ", diff, "minutes to the next task")
+                    #while diff > 0 and option:
+                    if diff > 0 and option:
+                        # the free parts of the time until the scheduled task
+                        if availability is None:
+                            pieces = [(current_time, current_task.scheduled)]
+                        else:
+                            pieces = [(self.new_time("00:00", start), self.new_time("00:00", end))
+                                      for start, end in availability.clip(current_time, current_task.scheduled)]
+                        for piece_start, piece_end in pieces:
+                            current_time = piece_start
+                            diff = self.time_difference(current_time, piece_end)
+                            minutes, priorities = [], []
+                            items = 0
+                            correspondence_to_id = {}
+                            for task in self.tasks:
+                                if (task.scheduled == "25:25" and task.duration <= diff and task.priority in self.priority_queue):
+                                    if len(task.dependencies) == 0  or self.combined_total_time(task.dependencies, task.duration, [task.id], self.priority_queue, diff)[0] <= diff:
+                                        i = 0
+                                        while i < len(priorities) and priorities[i] > task.priority:
+                                            i+=1
+                                        minutes.append(task.duration)
+                                        priorities.append(task.priority)
+                                        if i != len(priorities) - 1:
+                                            minutes = minutes[:i] + [task.duration] + minutes[i:-1]
+                                            priorities = priorities[:i] + [task.priority] + priorities[i:-1]
+                                        correspondence_to_id[items] = task.id
+                                        items += 1
+                            if len(minutes) > 0:
+                                stats.count("knapsack_calls")
+                                stats.count("knapsack_cells", len(minutes) * diff)
+                                with stats.phase("knapsack"):
+                                    utility, selected_items = knapsack_01(minutes, priorities, diff)
+                                for item in selected_items: 
+                                    if priorities[item] in self.priority_queue:
+                                        self.priority_queue.remove(priorities[item]) # remove it from the main priority queue
+                                        durations_sum += minutes[item]
+                                    current_time = self.printing(self.find_task(priorities[item]), current_time) #Print ant update current time
+
+                    current_time = current_task.scheduled #after no more tasks can be done in between, we move on the previously scheduled task
+                elif availability is not None:
+                    # a flexible task waits for the next free time it fits in
+                    start = availability.next_fit(self.time_difference("00:00", current_time), current_task.duration)
+                    if start is None:
+                        print(f"No free time left for task {current_task.description}")
+                        continue
+                    current_time = self.new_time("00:00", start)
+                
+                durations_sum += current_task.duration
+                current_time = self.printing(current_task, current_time)         
+        stats.record_heap("main_queue", self.priority_queue)
         min_passed = self.time_difference(starting_time, current_time)           
         print(f"\n🏁 Completed all planned tasks in period from {starting_time} to {current_time}! It's {min_passed} minutes passed.")
         print(f"Sum of the task durations - {durations_sum} mins")
@@ -387,4 +223,40 @@ class ImprovedGreedy_Scheduler:
         print("Scheduler efficiency is ", efficiency)
         return efficiency
 
-    
\ No newline at end of file
+    
+
+def test_dropped_prerequisite_priorities():
+    """
+    Pins the priorities when the first dependency of a task is left out by the filter
+
+    Before the shared PriorityModel, the priority update removed unknown dependency
+    ids from the list it was iterating over, which skipped the next dependency: task 2
+    kept its category value (15) instead of getting task 3's priority + 100.
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    tasks = [
+        Task(id=1, description="Early run", duration=10, scheduled="05:30", category="Family"),  # before the day starts
+        Task(id=2, description="Shopping list", duration=30, category="Family"),
+        Task(id=3, description="Groceries", duration=20, dependencies=[1, 2], category="Routine"),
+    ]
+    scheduler = ImprovedGreedy_Scheduler(tasks)
+    scheduler.validate()
+    scheduler.filter_tasks("06:00", "22:00")
+    scheduler.priority_calculation()
+    priorities = {task.id: int(task.priority) for task in scheduler.tasks}  # without the random tie-break
+    assert priorities == {2: 120, 3: 20}, priorities
+    assert [(task.id, reason) for task, reason in scheduler.dropped_tasks] == [(1, OUTSIDE_WINDOW)]
+    print("All tests passed!")
+
+
+#test_dropped_prerequisite_priorities()
@@ -0,0 +1,145 @@
+import time
+
+
+class _PhaseTimer:
+    """
+    Context manager that adds the wall time of the block to one phase of a PhaseStats
+    """
+    __slots__ = ("stats", "name", "start")
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.start
+        phase = self.stats["phases"].get(self.name)
+        if phase is None:
+            self.stats["phases"][self.name] = {"seconds": elapsed, "calls": 1}
+        else:
+            phase["seconds"] += elapsed
+            phase["calls"] += 1
+        return False
+
+
+class _NullTimer:
+    """Context manager that does nothing, shared by every disabled phase"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_TIMER = _NullTimer()
+
+
+class PhaseStats(dict):
+    """
+    Opt-in instrumentation of a scheduler run
+
+    The collected data lives in the dict itself:
+        phases   - {phase name: {"seconds": total wall time, "calls": how many times it ran}}
+        counters - {counter name: value}, e.g. knapsack calls or dependency lookups
+
+    Usage:
+        with stats.phase("find_gaps"):
+            ...
+        stats.count("knapsack_calls")
+    """
+    enabled = True
+
+    def __init__(self):
+        super().__init__(phases={}, counters={})
+
+    def phase(self, name):
+        """
+        Time a block of code under the given phase name
+
+        Parameters
+        ----------
+        name: str
+          name of the phase
+
+        Returns
+        ----------
+        context manager
+        """
+        return _PhaseTimer(self, name)
+
+    def count(self, name, amount=1):
+        """
+        Increase a counter
+
+        Parameters
+        ----------
+        name: str
+          name of the counter
+        amount: int
+          value to add
+
+        Returns
+        ----------
+        None
+        """
+        counters = self["counters"]
+        counters[name] = counters.get(name, 0) + amount
+
+    def record_heap(self, name, heap):
+        """
+        Add the operation counters of a MaxHeapq to the stats under the given prefix
+
+        Parameters
+        ----------
+        name: str
+          prefix of the counters, e.g. "main_queue"
+        heap: MaxHeapq
+          the heap whose pushes, pops and removals are recorded
+
+        Returns
+        ----------
+        None
+        """
+        self.count(name + "_push", heap.pushes)
+        self.count(name + "_pop", heap.pops)
+        self.count(name + "_remove", heap.removals)
+
+
+class NullStats(dict):
+    """
+    Disabled instrumentation: an empty dict whose methods do nothing,
+    so the hooks in the schedulers cost next to nothing
+    """
+    enabled = False
+
+    def phase(self, name):
+        return _NULL_TIMER
+
+    def count(self, name, amount=1):
+        pass
+
+    def record_heap(self, name, heap):
+        pass
+
+
+def make_stats(instrument):
+    """
+    Create the instrumentation object of a scheduler
+
+    Parameters
+    ----------
+    instrument: bool
+      whether the scheduler should record phase timings and counters
+
+    Returns
+    ----------
+    PhaseStats if instrument is true, otherwise NullStats
+    """
+    return PhaseStats() if instrument else NullStats()
@@ -7,6 +7,9 @@ def heappush(self, key):
 def heapify(self, i):
 def heappop(self):
 '''
+import heapq
+
+
 class MaxHeapq:
     """ 
     A class that implements properties and methods 
@@ -18,6 +21,8 @@ class MaxHeapq:
 	      A Python list where key values in the max heap are stored
 	  heap_size: int
 	      An integer counter of the number of keys present in the max heap
+	  pushes, pops, removals: int
+	      Counters of the operations performed on the heap (used by instrumentation)
 	  """  
 
     def __init__(self):    
@@ -28,7 +33,75 @@ class MaxHeapq:
         """    
         self.heap       = []
         self.heap_size  = 0
+        self.pushes     = 0
+        self.pops       = 0
+        self.removals   = 0
         
+    @classmethod
+    def from_iterable(cls, keys):
+        """
+        Creates a max heap holding the given keys (see build_heap)
+
+        Parameters
+        ----------
+        keys: iterable
+            The key values to be inserted
+
+        Returns
+        ----------
+        MaxHeapq
+        """
+        heap = cls()
+        heap.build_heap(keys)
+        return heap
+
+    def build_heap(self, keys):
+        """
+        Replaces the content of the heap with the given keys, built
+        bottom-up: every parent node is sifted down, from the last one
+        to the root, which is O(n) instead of O(n log n) for n pushes
+
+        Parameters
+        ----------
+        keys: iterable
+            The key values of the heap
+
+        Returns
+        ----------
+        None
+        """
+        self.heap = []
+        self.heap_size = 0
+        self.push_many(keys)
+
+    def push_many(self, keys):
+        """
+        Inserts several keys into the priority queue
+
+        When there are at least as many new keys as keys in the heap, they
+        are appended and the whole heap is rebuilt bottom-up (O(n + k));
+        otherwise every key is pushed (O(k log n)).
+
+        Parameters
+        ----------
+        keys: iterable
+            The key values to be inserted
+
+        Returns
+        ----------
+        None
+        """
+        keys = list(keys)
+        if len(keys) < self.heap_size:
+            for key in keys:
+                self.heappush(key)
+            return
+        self.heap.extend(keys)
+        self.heap_size = len(self.heap)
+        self.pushes += len(keys)
+        for i in range(self.heap_size // 2 - 1, -1, -1):
+            self.heapify(i)
+
     def left(self, i):
         """
         Takes the index of the parent node
@@ -109,12 +182,20 @@ class MaxHeapq:
         ----------
         None
         """
-        # insert -inf, as it is guaranteed to be smaller than all other 
-        # elements -> should be located in the end
-        # to not break the max-heap property
-        self.heap.append(-float("inf")) 
-        self.increase_key(self.heap_size,key)
+        # append at the end and move the key up while its parent is smaller,
+        # so the max-heap property holds again
+        heap = self.heap
+        heap.append(key)
+        i = self.heap_size
+        while i > 0:
+            j = (i - 1) // 2
+            if heap[j] >= key:
+                break
+            heap[i] = heap[j]
+            i = j
+        heap[i] = key
         self.heap_size+=1
+        self.pushes+=1
         
     def increase_key(self, i, key): 
         """
@@ -157,21 +238,23 @@ class MaxHeapq:
         ----------
         None
         """
-        l = self.left(i)
-        r = self.right(i)
         heap = self.heap
-        #looking for the largest value among 
-        # parent, right & left children 
-        # to make the largest a parent
-        if l <= (self.heap_size-1) and heap[l]>heap[i]:
-            largest = l
-        else:
-            largest = i
-        if r <= (self.heap_size-1) and heap[r] > heap[largest]:
-            largest = r
-        if largest != i:
-            heap[i], heap[largest] = heap[largest], heap[i]
-            self.heapify(largest)
+        size = self.heap_size
+        if i >= size:
+            return
+        key = heap[i]
+        # move the key down, one level per step, while one of its children
+        # is larger (the larger child goes up to take its place)
+        child = 2 * i + 1
+        while child < size:
+            if child + 1 < size and heap[child + 1] > heap[child]:
+                child += 1
+            if heap[child] <= key:
+                break
+            heap[i] = heap[child]
+            i = child
+            child = 2 * i + 1
+        heap[i] = key
 
     def heappop(self):
         """
@@ -193,6 +276,7 @@ class MaxHeapq:
         self.heap[0] = self.heap[-1]
         self.heap.pop()
         self.heap_size-=1
+        self.pops+=1
         self.heapify(0)
         return maxk
 
@@ -218,6 +302,7 @@ class MaxHeapq:
         self.heap[index] = self.heap[-1]
         self.heap.pop()
         self.heap_size -= 1
+        self.removals += 1
 
         # Restore heap property
         if index < self.heap_size:
@@ -227,6 +312,168 @@ class MaxHeapq:
             else:
                 self.heapify(index)
 
+class HeapqMaxHeap:
+    """
+    Max priority queue over the standard library heapq module (implemented in C),
+    with the interface of MaxHeapq
+
+    heapq keeps a min-heap, so the keys are stored negated.
+
+		Attributes
+	  ----------
+	  heap_size: int
+	      An integer counter of the number of keys present in the max heap
+	  pushes, pops, removals: int
+	      Counters of the operations performed on the heap (used by instrumentation)
+	  """
+
+    def __init__(self):
+        self.entries    = []  # negated keys, in heapq order
+        self.heap_size  = 0
+        self.pushes     = 0
+        self.pops       = 0
+        self.removals   = 0
+
+    @classmethod
+    def from_iterable(cls, keys):
+        """
+        Creates a max heap holding the given keys (heapq.heapify, O(n))
+        """
+        heap = cls()
+        heap.build_heap(keys)
+        return heap
+
+    def build_heap(self, keys):
+        """
+        Replaces the content of the heap with the given keys
+        """
+        self.entries = []
+        self.heap_size = 0
+        self.push_many(keys)
+
+    def push_many(self, keys):
+        """
+        Inserts several keys into the priority queue, rebuilding the heap
+        when there are at least as many new keys as keys in the heap
+        """
+        entries = [-key for key in keys]
+        if len(entries) < self.heap_size:
+            for entry in entries:
+                heapq.heappush(self.entries, entry)
+        else:
+            self.entries.extend(entries)
+            heapq.heapify(self.entries)
+        self.heap_size += len(entries)
+        self.pushes += len(entries)
+
+    @property
+    def heap(self):
+        """
+        The keys in heap order, heap[0] being the highest
+        (a new list on every access: use maxk() to look at the top)
+        """
+        return [-entry for entry in self.entries]
+
+    def maxk(self):
+        """
+        Returns the highest key in the priority queue.
+        """
+        return -self.entries[0]
+
+    def heappush(self, key):
+        """
+        Insert a key into a priority queue
+        """
+        heapq.heappush(self.entries, -key)
+        self.heap_size+=1
+        self.pushes+=1
+
+    def heappop(self):
+        """
+        returns the largest key in the max priority queue
+        and remove it from the max priority queue
+        """
+        if self.heap_size < 1:
+            raise ValueError('Heap underflow: There are no keys in the priority queue ')
+        self.heap_size-=1
+        self.pops+=1
+        return -heapq.heappop(self.entries)
+
+    def remove(self, key):
+        """
+        Removes the specified key from the max heap
+
+        O(n): finding the key scans the entries; restoring the heap order
+        afterwards takes O(log n)
+        """
+        entries = self.entries
+        try:
+            index = entries.index(-key)
+        except ValueError:
+            raise ValueError("Key not found in heap")
+        last = entries.pop()
+        if index < len(entries):
+            # the last entry takes the place of the removed one and moves
+            # down to where it belongs, or up if it is larger than its parent
+            entries[index] = last
+            self._sift_down(index)
+            self._sift_up(index)
+        self.heap_size -= 1
+        self.removals += 1
+
+    def _sift_up(self, i):
+        """
+        Moves the entry at index i up while its key is larger than its parent's
+        """
+        entries = self.entries
+        entry = entries[i]
+        while i > 0:
+            parent = (i - 1) // 2
+            if entries[parent] <= entry:
+                break
+            entries[i] = entries[parent]
+            i = parent
+        entries[i] = entry
+
+    def _sift_down(self, i):
+        """
+        Moves the entry at index i down while a child has a larger key
+        """
+        entries = self.entries
+        size = len(entries)
+        entry = entries[i]
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and entries[child + 1] < entries[child]:
+                child += 1
+            if entry <= entries[child]:
+                break
+            entries[i] = entries[child]
+            i = child
+        entries[i] = entry
+
+
+# Heap implementations a scheduler can be created with (see SchedulerEngine.SchedulerCore)
+HEAP_CLASSES = {"maxheapq": MaxHeapq, "heapq": HeapqMaxHeap}
+
+
+def get_heap_class(heap):
+    """
+    The heap class selected by name ("maxheapq" or "heapq"); a class is returned as is
+
+    Raises
+    ----------
+    ValueError if the name is unknown
+    """
+    if isinstance(heap, type):
+        return heap
+    try:
+        return HEAP_CLASSES[heap]
+    except KeyError:
+        raise ValueError(f"Unknown heap '{heap}', expected one of {', '.join(HEAP_CLASSES)}") from None
+
 def test_maxheapq():
 
     """
@@ -266,8 +513,72 @@ def test_maxheapq():
     print("All tests passed!")
 
 
+def test_heap_drain():
+
+    """
+        Tests that every heap class, however it is filled, pops its keys
+        from the highest to the lowest
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        ----------
+        None
+    """
+    import random
+
+    print("Running test cases...")
+    rng = random.Random(0)
+    keys = [rng.randint(0, 50) for _ in range(200)]  # with repeated keys
+    expected = sorted(keys, reverse=True)
+
+    def drain(h):
+        assert h.heap_size == len(keys), h.heap_size
+        return [h.heappop() for _ in range(h.heap_size)]
+
+    for name, heap_class in HEAP_CLASSES.items():
+        print(f"Test {name}: heappush, from_iterable, build_heap and push_many")
+        h = heap_class()
+        for key in keys:
+            h.heappush(key)
+        assert drain(h) == expected, name
+
+        assert drain(heap_class.from_iterable(keys)) == expected, name
+
+        h = heap_class.from_iterable([99, 98])
+        h.build_heap(keys)  # replaces the old keys
+        assert drain(h) == expected, name
+
+        h = heap_class.from_iterable(keys[:150])
+        h.push_many(keys[150:])  # fewer new keys than in the heap: pushed one by one
+        assert drain(h) == expected, name
+        h = heap_class.from_iterable(keys[:50])
+        h.push_many(keys[50:])  # more new keys: the heap is rebuilt
+        assert drain(h) == expected, name
+
+        print(f"Test {name}: remove, then drain")
+        h = heap_class.from_iterable(keys)
+        removed = rng.sample(keys, 60)
+        for key in removed:
+            h.remove(key)
+        left = list(keys)
+        for key in removed:
+            left.remove(key)
+        assert [h.heappop() for _ in range(h.heap_size)] == sorted(left, reverse=True), name
+        try:
+            h.heappop()
+            raise AssertionError("popped an empty heap")
+        except ValueError:
+            pass
+
+    print("All tests passed!")
+
+
 
 
 #test_maxheapq()
+#test_heap_drain()
 
     
\ No newline at end of file
@@ -0,0 +1,116 @@
+"""
+Export of generated schedules
+
+All functions take schedule entries as produced by SchedulerEngine.schedule_entries:
+dicts with id, description, category, duration, start and end ("hh:mm").
+"""
+
+import csv
+import io
+import json
+from datetime import date, datetime, timedelta, timezone
+
+CSV_FIELDS = ("id", "description", "category", "duration", "start", "end")
+
+
+def schedule_to_csv(entries):
+    """
+    Schedule as CSV text with a header row
+
+    Parameters
+    ----------
+    entries: list
+      schedule entries
+
+    Returns
+    ----------
+    str
+    """
+    output = io.StringIO()
+    writer = csv.DictWriter(output, fieldnames=CSV_FIELDS, extrasaction="ignore", lineterminator="\n")
+    writer.writeheader()
+    writer.writerows(entries)
+    return output.getvalue()
+
+
+def schedule_to_json(entries, **metadata):
+    """
+    Schedule as a JSON document {"schedule": [...], **metadata}
+
+    Parameters
+    ----------
+    entries: list
+      schedule entries
+    metadata:
+      extra top-level fields, e.g. algorithm="DP", efficiency=87.5
+
+    Returns
+    ----------
+    str
+    """
+    return json.dumps({**metadata, "schedule": list(entries)}, indent=2, ensure_ascii=False)
+
+
+def _ical_text(text):
+    """Escape a value for an iCalendar TEXT property"""
+    return (str(text).replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+            .replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _fold(line):
+    """Fold an iCalendar content line to at most 75 octets per physical line"""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts = []
+    while data:
+        limit = 75 if not parts else 74
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:  # do not split a utf-8 character
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+    return "\r\n ".join(parts)
+
+
+def schedule_to_ical(entries, day=None, calendar_name="Task Scheduler"):
+    """
+    Schedule as an iCalendar (.ics) document with one event per task
+
+    Times are written as floating local times; tasks ending after midnight
+    roll over to the next day.
+
+    Parameters
+    ----------
+    entries: list
+      schedule entries
+    day: datetime.date
+      the day the schedule is for (default: today)
+    calendar_name: str
+      name shown by calendar applications
+
+    Returns
+    ----------
+    str
+    """
+    day = day or date.today()
+    midnight = datetime(day.year, day.month, day.day)
+    stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", "PRODID:-//Task Scheduler//EN",
+             f"X-WR-CALNAME:{_ical_text(calendar_name)}"]
+    for entry in entries:
+        h, m = entry["start"].split(":")
+        start = midnight + timedelta(hours=int(h), minutes=int(m))
+        end = start + timedelta(minutes=entry["duration"])
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:task-{entry['id']}-{start:%Y%m%dT%H%M}@task-scheduler",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{start:%Y%m%dT%H%M%S}",
+            f"DTEND:{end:%Y%m%dT%H%M%S}",
+            f"SUMMARY:{_ical_text(entry['description'])}",
+            f"CATEGORIES:{_ical_text(entry.get('category', 'Other'))}",
+            "END:VEVENT",
+        ]
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
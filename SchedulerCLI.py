@@ -0,0 +1,187 @@
+"""
+Schedule tasks from the command line
+
+One day:
+
+    python -m SchedulerCLI tasks.ndjson --start 09:00 --end 22:00 --algorithm DP
+
+The task file holds Task.to_dict() objects, one per line (NDJSON) or as a JSON
+array; the result is printed as JSON.
+
+Many users (--batch):
+
+    cat users.jsonl | python -m SchedulerCLI --batch --jobs 4 > schedules.jsonl
+
+Every input line is one user's day, {"user_id": ..., "starting_time": "hh:mm",
+"category_value": {...}, "tasks": [{...}, ...]} (user_id defaults to
+"<input>:<line number>", starting_time to --start and category_value, the
+user's importance of the categories, to the default weights); --jobs N schedules in N worker processes. One JSON result per user is written as soon as it is ready, in
+completion order, so the output can be piped on while the input is still
+being read. Lines that cannot be read give a result with an error instead of
+stopping the run.
+
+Only the standard library and the scheduler engine are imported, so a run
+costs little more than the interpreter start-up (`python benchmark.py startup`
+checks this against a budget).
+"""
+import argparse
+import json
+import os
+import sys
+
+from TaskClass import Task
+from SchedulerEngine import strategy_names
+from BatchScheduler import DEFAULT_CHUNKSIZE, DEFAULT_END_TIME, schedule_batch, schedule_one
+
+
+def read_tasks(stream):
+    """
+    Task objects from a JSON array or from newline-delimited JSON
+
+    Parameters
+    ----------
+    stream: file
+      text file with the task records
+
+    Returns
+    ----------
+    list of Task objects
+    """
+    text = stream.read()
+    if text.lstrip().startswith("["):
+        records = json.loads(text)
+    else:
+        records = []
+        for line_number, line in enumerate(text.splitlines(), 1):
+            if line.strip():
+                try:
+                    records.append(json.loads(line))
+                except ValueError as e:
+                    raise ValueError(f"line {line_number}: {e}") from None
+    return [Task.from_dict(record) for record in records]
+
+
+def _open_inputs(paths):
+    """Yield (name, text file) for every input path, "-" (or no path at all) being stdin"""
+    for path in paths or ["-"]:
+        if path == "-":
+            yield "<stdin>", sys.stdin
+        else:
+            with open(path, encoding="utf-8") as f:
+                yield path, f
+
+
+def iter_jobs(paths, starting_time, on_error):
+    """
+    Read users' days lazily from JSONL inputs
+
+    Parameters
+    ----------
+    paths: list
+      input files, "-" for stdin
+    starting_time: str
+      "hh:mm" used for the lines without a starting_time
+    on_error: callable
+      called with an error result for every line that cannot be read, as soon as it is read
+
+    Yields
+    ----------
+    (user_id, tasks, starting_time, category_value) jobs for BatchScheduler.schedule_batch
+    """
+    for name, stream in _open_inputs(paths):
+        for line_number, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            user_id = f"{name}:{line_number}"
+            try:
+                record = json.loads(line)
+                user_id = record.get("user_id", user_id)
+                tasks = [Task.from_dict(data) for data in record["tasks"]]
+                yield user_id, tasks, record.get("starting_time", starting_time), record.get("category_value")
+            except (ValueError, KeyError, TypeError, AttributeError) as e:
+                on_error({"schedule": [], "efficiency": None, "diagnostics": [], "dropped": [],
+                          "error": f"{name}:{line_number}: {type(e).__name__}: {e}",
+                          "user_id": user_id})
+
+
+def _write(result, indent=None):
+    json.dump(result, sys.stdout, ensure_ascii=False, indent=indent)
+    sys.stdout.write("\n")
+    sys.stdout.flush()
+
+
+def run_batch(args):
+    """Schedule every input line and stream the results; returns the process exit code"""
+    failed = 0
+
+    def write_result(result):
+        nonlocal failed
+        _write(result, args.indent)
+        failed += result["error"] is not None
+
+    # unreadable lines are written as soon as they are read, in the same format as the results
+    jobs = iter_jobs(args.inputs, args.start, write_result)
+    # --jobs 1 schedules in this process, without starting a pool
+    processes = 0 if args.jobs == 1 else args.jobs or None
+    for result in schedule_batch(jobs, args.algorithm, args.end, processes, args.chunksize):
+        write_result(result)
+    return 1 if failed else 0
+
+
+def run_day(args):
+    """Schedule one day of tasks; returns the process exit code"""
+    if len(args.inputs) > 1:
+        print("one task file is expected without --batch", file=sys.stderr)
+        return 2
+    label = args.inputs[0] if args.inputs else "<stdin>"
+    try:
+        for _, stream in _open_inputs(args.inputs):
+            tasks = read_tasks(stream)
+    except OSError as e:
+        print(f"{label}: {e}", file=sys.stderr)
+        return 2
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        print(f"{label}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    try:
+        result = schedule_one(args.algorithm, tasks, args.start, args.end)
+    except (ValueError, KeyError, TypeError, AttributeError) as e:
+        # malformed task fields or a bad --start/--end
+        print(f"{label}: {type(e).__name__}: {e}", file=sys.stderr)
+        return 2
+    _write(result, args.indent)
+    return 0
+
+
+def build_parser():
+    """Command line interface of the scheduler"""
+    parser = argparse.ArgumentParser(prog="python -m SchedulerCLI", description="Schedule tasks from files or stdin")
+    parser.add_argument("inputs", nargs="*", help="input files, '-' or nothing for stdin")
+    parser.add_argument("--batch", action="store_true",
+                        help="every input line is one user's day (JSONL), one result line per user")
+    parser.add_argument("--algorithm", choices=strategy_names(), default="DP")
+    parser.add_argument("--start", default="09:00", help="when the day starts, hh:mm (default %(default)s)")
+    parser.add_argument("--end", default=DEFAULT_END_TIME, help="when the day ends, hh:mm (default %(default)s)")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="worker processes with --batch, 0 for one per CPU (default %(default)s)")
+    parser.add_argument("--chunksize", type=int, default=DEFAULT_CHUNKSIZE,
+                        help="users sent to a worker at once (default %(default)s)")
+    parser.add_argument("--indent", type=int, default=None, help="pretty-print the JSON output")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.jobs < 0:
+        print("--jobs must not be negative", file=sys.stderr)
+        return 2
+    try:
+        return run_batch(args) if args.batch else run_day(args)
+    except BrokenPipeError:
+        # the reader went away (e.g. `| head`): stop quietly, also at interpreter exit
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
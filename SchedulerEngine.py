@@ -0,0 +1,898 @@
+"""
+Shared core of the schedulers
+
+Everything the scheduling algorithms have in common lives here:
+    time model      - "hh:mm" strings <-> minutes since midnight
+    priorities      - PriorityModel, the category/time/dependency priority rules
+    ready set       - ReadySet, the max-heap of the tasks still to be done with O(1) membership
+    engine          - SchedulerCore, validation, indexes, priority assignment and output
+    results         - ScheduleResult, what every strategy returns from run()
+    registry        - register_strategy / get_strategy / run_strategy
+
+An algorithm is a SchedulerCore subclass registered under a name; it only
+implements how the tasks are placed in time (its slot-selection policy).
+"""
+import math
+import random
+from functools import lru_cache
+
+from TaskClass import CATEGORIES, CATEGORY_CODES
+from MaxHeap import MaxHeapq, get_heap_class
+from Instrumentation import make_stats
+
+# Scheduled time of a task that can be done at any time
+FLEXIBLE = "25:25"
+# When a day ends if no end time is given
+DEFAULT_END_TIME = "24:00"
+
+# Each Task has a category. Each of the categories has a value that
+# represents how strongly we should prioritize tasks from this category
+CATEGORY_VALUE = {"Routine": 20, "Family": 15, "Growth": 15, "Friends": 10, "Hobby": 5, "Other": 0}
+
+# Staged priorities of at least this many tasks are computed with NumPy (VectorPriorities)
+# when it is installed; below it building the arrays costs more than it saves
+VECTOR_MIN_TASKS = 2000
+
+# A lazy ReadySet rebuilds its heap once the removed keys still in it are more
+# than this fraction of the heap
+TOMBSTONE_FRACTION = 0.5
+
+
+@lru_cache(maxsize=1024)
+def _weight_vector(profile):
+    weights = [0] * (len(CATEGORIES) + 1)  # the last slot is UNKNOWN_CATEGORY, always 0
+    for name, value in CATEGORY_VALUE.items():
+        weights[CATEGORY_CODES[name]] = value
+    for name, value in profile:
+        if name not in CATEGORY_CODES:
+            raise ValueError(f"unknown category '{name}', expected one of {', '.join(CATEGORIES)}")
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            raise ValueError(f"the value of category '{name}' must be a number")
+        if value < 0:
+            # prerequisites are only ever raised to a dependant's priority, which assumes weights >= 0
+            raise ValueError(f"the value of category '{name}' must not be negative")
+        weights[CATEGORY_CODES[name]] = value
+    return tuple(weights)
+
+
+def category_weights(category_value=None):
+    """
+    Category weight vector, indexed by Task.category_code
+
+    Vectors are cached per profile, so repeated schedules for the same user
+    do not rebuild them.
+
+    Parameters
+    ----------
+    category_value: dict
+      {category: value} personal importance of the categories; categories that
+      are left out keep their CATEGORY_VALUE (default: CATEGORY_VALUE)
+
+    Returns
+    ----------
+    tuple of len(CATEGORIES) + 1 values, 0 for unknown categories
+
+    Raises
+    ----------
+    ValueError for categories that are not in CATEGORIES and values that are not
+    finite numbers >= 0
+    """
+    return _weight_vector(tuple(sorted((category_value or {}).items())))
+
+
+def to_minutes(time_str):
+    """Minutes since midnight of a "hh:mm" (or "h:mm") time"""
+    h, m = time_str.split(":")
+    return int(h) * 60 + int(m)
+
+
+def to_time(minutes):
+    """ "hh:mm" representation of minutes since midnight"""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+def add_minutes(time_str, minutes):
+    """ "hh:mm" time the given number of minutes after time_str"""
+    return to_time(to_minutes(time_str) + minutes)
+
+
+def schedule_entries(schedule):
+    """
+    Convert a scheduler's list of (task, start_time) tuples into plain dicts
+
+    Parameters
+    ----------
+    schedule: list
+      (Task, "hh:mm") tuples as stored in scheduler.schedule
+
+    Returns
+    ----------
+    list of dicts with id, description, category, duration, start and end
+    """
+    entries = []
+    for task, start in schedule:
+        start_minutes = to_minutes(start)
+        entries.append({
+            "id": task.id,
+            "description": task.description,
+            "category": task.category,
+            "duration": task.duration,
+            "start": to_time(start_minutes),
+            "end": to_time(start_minutes + task.duration),
+        })
+    return entries
+
+
+class PriorityModel:
+    """
+    How task priorities are computed
+
+    A fixed-time task gets (24:00 - its time) in the given time unit, every task
+    gets the value of its category, and the prerequisites of a task get at
+    least its priority + step, their own prerequisites + 2 * step and so on.
+
+    Attributes
+    ----------
+    time_unit: int
+        Multiplier of the minutes until midnight (60 = seconds, 1 = minutes)
+    staged: bool
+        False - tasks are processed one by one (time, category, then propagation
+                to the prerequisites) and priorities add up over runs
+        True  - priorities are reset and every rule is applied to all tasks
+                before the next one
+    prerequisite_bonus: int
+        Extra priority of a task that other tasks depend on (staged only)
+    step: int
+        Priority added per dependency level
+    vector_min_tasks: int
+        Staged priorities of at least this many tasks are computed with NumPy
+        when it is installed (None: always in Python)
+    """
+    def __init__(self, time_unit=60, staged=False, prerequisite_bonus=0, step=100,
+                 vector_min_tasks=VECTOR_MIN_TASKS):
+        self.time_unit = time_unit
+        self.staged = staged
+        self.prerequisite_bonus = prerequisite_bonus
+        self.step = step
+        self.vector_min_tasks = vector_min_tasks
+
+    def time_priority(self, task):
+        return (24 * 60 - to_minutes(task.scheduled)) * self.time_unit
+
+    def assign(self, tasks, by_id, stats, weights=None):
+        """
+        Set the priority of every task
+
+        Parameters
+        ----------
+        tasks: list
+          Task objects (ids unique, dependencies acyclic)
+        by_id: dict
+          {task id: Task} of the tasks; propagation stops at dependency ids that are not in it
+        stats: PhaseStats
+          where the dependency lookups are counted
+        weights: tuple
+          category weight vector (see category_weights, default: CATEGORY_VALUE)
+        """
+        if weights is None:
+            weights = category_weights()
+        if self.staged and self.vector_min_tasks is not None and len(tasks) >= self.vector_min_tasks:
+            try:
+                from VectorPriorities import task_priorities
+            except ImportError:
+                pass
+            else:
+                priorities = task_priorities(tasks, weights, self.time_unit, self.prerequisite_bonus, self.step)
+                for task, priority in zip(tasks, priorities.tolist()):
+                    task.priority = priority
+                return
+        # highest value already propagated into each task: propagating a smaller one changes nothing
+        propagated = {}
+        if not self.staged:
+            for task in tasks:
+                if task.scheduled != FLEXIBLE:
+                    task.priority = max(task.priority, self.time_priority(task))
+                task.priority += weights[task.category_code]
+                self._propagate(task.dependencies, task.priority + self.step, by_id, propagated, stats)
+            return
+        for task in tasks:
+            task.priority = weights[task.category_code]
+            if task.scheduled != FLEXIBLE:
+                task.priority += self.time_priority(task)
+        if self.prerequisite_bonus:
+            prerequisites = {dep for task in tasks for dep in task.dependencies}
+            for task in tasks:
+                if task.id in prerequisites:
+                    task.priority += self.prerequisite_bonus
+        for task in tasks:
+            if task.dependencies:
+                self._propagate(task.dependencies, task.priority + self.step, by_id, propagated, stats)
+
+    def table_priorities(self, table, weights=None):
+        """
+        Priorities of every row of a TaskStore.TaskTable, computed with NumPy
+        over the columns (staged rules only, without the random tie-break)
+
+        Returns
+        ----------
+        numpy array, one priority per row
+        """
+        if not self.staged:
+            raise ValueError("only the staged priority rules can be computed over a task table")
+        from VectorPriorities import table_priorities
+        return table_priorities(table, category_weights() if weights is None else weights,
+                                self.time_unit, self.prerequisite_bonus, self.step)
+
+    def _propagate(self, dependencies, value, by_id, propagated, stats):
+        """Raise the prerequisites (transitively) to at least value, value + step, ..."""
+        stack = [(dep, value) for dep in reversed(dependencies)]
+        while stack:
+            dep, value = stack.pop()
+            stats.count("dependency_lookups")
+            task = by_id.get(dep)
+            if task is None or propagated.get(dep, -float("inf")) >= value:
+                continue
+            propagated[dep] = value
+            task.priority = max(task.priority, value)
+            stack.extend((d, value + self.step) for d in reversed(task.dependencies))
+
+    @staticmethod
+    def randomize(tasks):
+        """
+        In order to have only unique values of priorities, add random float in the range [0;1)
+        & check uniqueness of priority
+        """
+        unique_values = set()
+        for task in tasks:
+            add = random.random()
+            while task.priority + add in unique_values:
+                add = random.random()
+            task.priority += add
+            unique_values.add(task.priority)
+
+
+class ReadySet:
+    """
+    Max-heap of the priorities of the tasks that are still to be done,
+    with a set next to it so membership tests do not scan the heap
+
+    Supports the MaxHeapq interface used by the schedulers (heappush, push_many,
+    heappop, remove, maxk, heap, heap_size and the operation counters) plus `in`
+    and len().
+    The heap itself is a MaxHeapq unless another heap class with that interface
+    (e.g. MaxHeap.HeapqMaxHeap) is given.
+
+    With lazy=True a removal only marks the key as a tombstone (O(1)); pops and
+    maxk drop tombstones when they reach the top, and the heap is rebuilt from
+    the live keys once the tombstones exceed compact_fraction of it. heap then
+    may still hold removed keys, while heap_size, len() and `in` count only the
+    live ones.
+    """
+    def __init__(self, priorities=(), heap_class=MaxHeapq, lazy=False, compact_fraction=TOMBSTONE_FRACTION):
+        priorities = list(priorities)
+        self.queue = heap_class.from_iterable(priorities)
+        self.members = set(priorities)
+        self.lazy = lazy
+        self.compact_fraction = compact_fraction
+        self.tombstones = set()
+        self.compactions = 0
+        self._lazy_removals = 0  # removals done by tombstoning
+        self._dropped = 0        # tombstones popped off the heap (not pops of the ready set)
+
+    def heappush(self, key):
+        if key in self.tombstones:
+            # still in the heap: bring it back to life
+            self.tombstones.discard(key)
+        else:
+            self.queue.heappush(key)
+        self.members.add(key)
+
+    def push_many(self, keys):
+        keys = list(keys)
+        revived = self.tombstones.intersection(keys)
+        self.tombstones -= revived
+        self.queue.push_many([key for key in keys if key not in revived] if revived else keys)
+        self.members.update(keys)
+
+    def heappop(self):
+        if self.lazy:
+            if not self.members:
+                raise ValueError('Heap underflow: There are no keys in the priority queue ')
+            self._drop_tombstones()
+        key = self.queue.heappop()
+        self.members.discard(key)
+        return key
+
+    def maxk(self):
+        if self.lazy:
+            self._drop_tombstones()
+        return self.queue.maxk()
+
+    def remove(self, key):
+        if not self.lazy:
+            self.queue.remove(key)
+            self.members.discard(key)
+            return
+        if key not in self.members:
+            raise ValueError("Key not found in heap")
+        self.members.discard(key)
+        self.tombstones.add(key)
+        self._lazy_removals += 1
+        if len(self.tombstones) > self.compact_fraction * self.queue.heap_size:
+            self.compact()
+
+    def compact(self):
+        """Rebuild the heap from the live keys only, forgetting the tombstones (O(n))"""
+        pushes = self.queue.pushes
+        self.queue.build_heap(self.members)
+        self.queue.pushes = pushes  # a rebuild is not a push
+        self.tombstones.clear()
+        self.compactions += 1
+
+    def _drop_tombstones(self):
+        """Pop the removed keys off the top of the heap"""
+        queue = self.queue
+        tombstones = self.tombstones
+        while tombstones and queue.heap_size and queue.maxk() in tombstones:
+            tombstones.discard(queue.heappop())
+            self._dropped += 1
+
+    def __contains__(self, key):
+        return key in self.members
+
+    def __len__(self):
+        return self.heap_size
+
+    @property
+    def heap(self):
+        return self.queue.heap
+
+    @property
+    def heap_size(self):
+        return len(self.members) if self.lazy else self.queue.heap_size
+
+    @property
+    def pushes(self):
+        return self.queue.pushes
+
+    @property
+    def pops(self):
+        return self.queue.pops - self._dropped
+
+    @property
+    def removals(self):
+        return self.queue.removals + self._lazy_removals
+
+
+class ScheduleResult:
+    """
+    Outcome of one scheduler run
+
+    Attributes
+    ----------
+    algorithm: str
+        Registered name of the strategy
+    schedule: list
+        (task, start_time) tuples in the order the tasks are done
+    efficiency: float
+        Efficiency reported by the strategy (%)
+    diagnostics: list
+        Validation findings (see TaskValidation)
+    dropped: list
+        (task, reason) tuples of the tasks left out by the filter (see TaskFilter)
+    stats: dict
+        Phase timings and counters (empty unless instrumented)
+    """
+    def __init__(self, algorithm, schedule, efficiency, diagnostics=(), dropped=(), stats=None):
+        self.algorithm = algorithm
+        self.schedule = list(schedule)
+        self.efficiency = efficiency
+        self.diagnostics = list(diagnostics)
+        self.dropped = list(dropped)
+        self.stats = stats if stats is not None else {}
+
+    def entries(self):
+        """Schedule as plain dicts (see schedule_entries)"""
+        return schedule_entries(self.schedule)
+
+    def to_dict(self):
+        """JSON-serializable form used by the batch engine and the service"""
+        return {
+            "schedule": self.entries(),
+            "efficiency": self.efficiency,
+            "diagnostics": self.diagnostics,
+            "dropped": [{"id": task.id, "reason": reason} for task, reason in self.dropped],
+        }
+
+
+class SchedulerCore:
+    """
+    Base class of the schedulers
+
+    Attributes
+    ----------
+    tasks: list
+        Task objects to schedule
+    priority_queue: ReadySet
+        Priorities of the tasks that are not done yet (created by create_queue)
+    schedule: list
+        (task, start_time) tuples in the order the tasks are done
+    diagnostics: list
+        Problems found in the tasks before scheduling (see TaskValidation);
+        tasks in dependency cycles or with duplicate ids are left out
+    dropped_tasks: list
+        (task, reason) tuples of the tasks left out by the filter
+    graph: DependencyGraph
+        Dependency graph built by the filter
+    stats: dict
+        Per-phase wall time and operation counters, filled only with instrument=True
+    category_value: dict
+        {category: value} importance of the categories (the user's profile or
+        the class default CATEGORY_VALUE)
+    weights: tuple
+        category_value as a vector indexed by Task.category_code
+    heap_class: type
+        Heap behind the ready set and the strategies' own queues, MaxHeapq or
+        any class with its interface (see MaxHeap.HEAP_CLASSES)
+    lazy_removal: bool
+        Whether the ready set removes tasks by tombstoning them (see ReadySet)
+    flexible_fast_path: bool
+        Whether a task set without fixed-time tasks skips the general loop
+        (see run_flexible); the schedule is the same either way
+    """
+    category_value = CATEGORY_VALUE
+    priority_model = PriorityModel()
+    heap_class = MaxHeapq
+    lazy_removal = False
+    flexible_fast_path = True
+    strategy_name = None
+
+    def __init__(self, tasks, instrument=False, category_value=None, heap=None, lazy_removal=None):
+        if category_value is not None:
+            self.category_value = category_value
+        if heap is not None:
+            self.heap_class = get_heap_class(heap)
+        if lazy_removal is not None:
+            self.lazy_removal = lazy_removal
+        self.weights = category_weights(self.category_value)
+        self.tasks = list(tasks)
+        self.priority_queue = []
+        self.schedule = []
+        self.diagnostics = []
+        self.dropped_tasks = []
+        self.graph = None
+        self.stats = make_stats(instrument)
+        self._by_id = {}
+        self._by_priority = {}
+
+    def run(self, starting_time, end_time=None, availability=None):
+        """
+        Schedule the tasks (implemented by every strategy)
+
+        Returns
+        ----------
+        ScheduleResult
+        """
+        raise NotImplementedError
+
+    def result(self, efficiency):
+        """ScheduleResult of the last run"""
+        return ScheduleResult(self.strategy_name, self.schedule, efficiency,
+                              self.diagnostics, self.dropped_tasks, self.stats)
+
+    def validate(self):
+        """Drop the tasks that cannot be scheduled and report what was found"""
+        # imported here: TaskValidation uses the time model of this module
+        from TaskValidation import validate_tasks, ERROR
+
+        self.tasks, self.diagnostics = validate_tasks(self.tasks, prune=True)
+        self._by_id = {task.id: task for task in self.tasks}
+        for diagnostic in self.diagnostics:
+            if diagnostic["severity"] == ERROR:
+                print(f"⚠️ {diagnostic['message']}")
+
+    def priority_calculation(self):
+        """
+        Calculates the priority of each task based on the dependencies,
+        scheduling and the category of the task (see PriorityModel)
+
+        Returns
+        ----------
+        None
+        """
+        self._by_id = {task.id: task for task in self.tasks}
+        self.priority_model.assign(self.tasks, self._by_id, self.stats, self.weights)
+        self.priority_randomization()
+
+    def priority_randomization(self):
+        """
+        In order to have only unique values of priorities, add random float in the range [0;1)
+        & check uniqueness of priority
+
+        Returns
+        ----------
+        None
+        """
+        PriorityModel.randomize(self.tasks)
+        self._by_priority = {task.priority: task for task in self.tasks}
+
+    def create_queue(self):
+        """
+        Create MaxHeap based on the tasks' priority (built bottom-up in O(n))
+
+        Returns
+        ----------
+        None
+        """
+        self.priority_queue = ReadySet((task.priority for task in self.tasks), self.heap_class, self.lazy_removal)
+
+    def find_task(self, priority_value):
+        """
+        Find the instant of the class Task, that has indicated priority
+
+        Parameters
+        ----------
+        priority_value: float
+          the value of the priority of the task
+
+        Returns
+        ----------
+        Task or None
+        """
+        return self._by_priority.get(priority_value)
+
+    def find_priority(self, id):
+        """
+        Find the value of the Task priority based on the given id
+
+        Parameters
+        ----------
+        id: int
+          the id of the task
+
+        Returns
+        ----------
+        float or None
+        """
+        self.stats.count("dependency_lookups")
+        task = self._by_id.get(id)
+        return task.priority if task is not None else None
+
+    def new_time(self, old_time, time_passed):
+        """
+        Calculate new current time
+
+        Parameters
+        ----------
+        old_time: string
+          "hh:mm" that represents when the task has been started
+        time_passed: int
+          how many minutes is duration of the task
+
+        Returns
+        ----------
+        str:  time when the task ends in the format "h:mm"
+        """
+        minutes = to_minutes(old_time) + time_passed
+        return f"{minutes // 60}:{minutes % 60:02d}"
+
+    def time_difference(self, now, ordered):
+        """
+        Find the time difference in minutes between current time and
+        when the next priority task is scheduled
+
+        Parameters
+        ----------
+        now: string
+          "hh:mm" that represents when current time
+        ordered: string
+          "hh:mm" when the next priority task should start
+
+        Returns
+        ----------
+        int:
+          minutes between the two times
+        """
+        return to_minutes(ordered) - to_minutes(now)
+
+    def run_flexible(self, current_time, availability=None):
+        """
+        Do all the tasks one after another in priority order
+
+        Fast path for task sets without fixed-time tasks: there is nothing to wait
+        for and no gap to fill, and the prerequisites of a task always have a higher
+        priority than the task (PriorityModel), so sorting by priority gives the
+        order of the priority queue without building one. Leaves an empty queue.
+
+        Parameters
+        ----------
+        current_time: string
+          "hh:mm" when the first task can start
+        availability: Availability
+          free time of the day; a task waits for the next free time it fits in
+
+        Returns
+        ----------
+        tuple (time after the last task, minutes spent on the tasks)
+        """
+        latest = to_minutes(FLEXIBLE)  # the queue-based loops treat later times as an overlap
+        minutes = to_minutes(current_time)
+        durations_sum = 0
+        for task in sorted(self.tasks, key=lambda task: task.priority, reverse=True):
+            if minutes > latest:
+                print(f"Schedule overlap happened with task {task.description}")
+                continue
+            if availability is not None:
+                start = availability.next_fit(minutes, task.duration)
+                if start is None:
+                    print(f"No free time left for task {task.description}")
+                    continue
+                current_time = self.new_time("00:00", start)
+            durations_sum += task.duration
+            current_time = self.printing(task, current_time)
+            minutes = to_minutes(current_time)
+        self.priority_queue = ReadySet(heap_class=self.heap_class, lazy=self.lazy_removal)
+        return current_time, durations_sum
+
+    def printing(self, current_task, current_time):
+        """
+        Prints the information about current task and updates time afer its completion
+
+        Parameters
+        ----------
+        current_task: Task
+          Task that is currently getting done
+        current_time: string
+          "hh:mm" that represents the time when current task starts
+
+        Returns
+        ----------
+        string :
+          "hh:mm" that represents the time after current task completion
+        """
+        self.schedule.append((current_task, current_time))
+        print(f"🕰t={current_time}")
+        print(f"\tstarted '{current_task.description}' for {current_task.duration} mins...")
+        current_time = self.new_time(current_time, current_task.duration)
+        print(f"\t✅ t={(current_time)}, task completed!")
+        return current_time
+
+    def print_self(self):
+        """
+        Print the all the Tasks added to the Scheduler
+
+        Returns
+        ----------
+        None
+        """
+        print("Tasks added to the simple scheduler:")
+        print("--------------------------------------")
+        for t in self.tasks:
+            print(f"➡️'{t.description}', duration = {t.duration} mins.")
+            if len(t.dependencies) > 0:
+                print(f"\t ⚠️ This task depends on others!")
+
+
+_STRATEGIES = {}
+
+
+def register_strategy(name):
+    """
+    Class decorator that makes a SchedulerCore subclass available under name
+    """
+    def decorator(cls):
+        cls.strategy_name = name
+        _STRATEGIES[name] = cls
+        return cls
+    return decorator
+
+
+def _load_builtin_strategies():
+    # the built-in schedulers register themselves when their modules are imported
+    import TaskSchedulerClass
+    import ImprovedGreedy_Scheduler
+    import DP_Scheduling
+
+
+def strategy_names():
+    """Names of the registered strategies, in registration order"""
+    _load_builtin_strategies()
+    return tuple(_STRATEGIES)
+
+
+def get_strategy(name):
+    """
+    Scheduler class registered under name
+
+    Raises
+    ----------
+    ValueError if no strategy has that name
+    """
+    _load_builtin_strategies()
+    try:
+        return _STRATEGIES[name]
+    except KeyError:
+        raise ValueError(f"Unknown algorithm '{name}', expected one of {', '.join(_STRATEGIES)}") from None
+
+
+def run_strategy(name, tasks, starting_time, end_time=None, availability=None, instrument=False,
+                 category_value=None, heap=None, lazy_removal=None):
+    """
+    Run the strategy registered under name on the tasks, optionally with the
+    user's {category: value} profile, a heap implementation ("maxheapq" or "heapq")
+    and lazy removal from the ready set
+
+    Returns
+    ----------
+    ScheduleResult
+    """
+    scheduler = get_strategy(name)(tasks, instrument=instrument, category_value=category_value, heap=heap,
+                                   lazy_removal=lazy_removal)
+    return scheduler.run(starting_time, end_time, availability)
+
+
+def test_ready_set_lazy_removal():
+    """
+    Tests the lazy (tombstone) removal of ReadySet over both heap classes:
+    removals, tombstones brought back by a push, compaction, and the order
+    the live keys are popped in
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from MaxHeap import HEAP_CLASSES
+
+    print("Running test cases...")
+    keys = list(range(0, 100, 3))
+    for name, heap_class in HEAP_CLASSES.items():
+        print(f"Test {name}: tombstones")
+        ready = ReadySet(keys, heap_class, lazy=True, compact_fraction=10)  # never compacts by itself
+        for key in (99, 60, 3):
+            ready.remove(key)
+        live = sorted(set(keys) - {99, 60, 3}, reverse=True)
+        assert ready.tombstones == {99, 60, 3}, name
+        assert len(ready) == ready.heap_size == len(live), name
+        assert 60 not in ready and 57 in ready, name
+        assert len(ready.heap) == len(keys), name  # the removed keys are still in the heap
+        assert ready.removals == 3, name
+        assert ready.maxk() == 96 and 99 not in ready.tombstones, name  # dropped off the top
+        try:
+            ready.remove(60)
+            raise AssertionError("removed a key twice")
+        except ValueError:
+            pass
+
+        print(f"Test {name}: a push brings a tombstone back")
+        ready.heappush(60)
+        assert 60 in ready and ready.tombstones == {3}, name
+        live = sorted(live + [60], reverse=True)
+        assert ready.pushes == len(keys), name  # still in the heap, not pushed again
+
+        print(f"Test {name}: compact")
+        ready.compact()
+        assert ready.tombstones == set() and ready.compactions == 1, name
+        assert sorted(ready.heap, reverse=True) == live, name
+        assert ready.pushes == len(keys), name  # a rebuild is not a push
+
+        print(f"Test {name}: drain")
+        assert [ready.heappop() for _ in range(len(ready))] == live, name
+        assert ready.pops == len(live), name
+        try:
+            ready.heappop()
+            raise AssertionError("popped an empty ready set")
+        except ValueError:
+            pass
+
+        print(f"Test {name}: compacts once the tombstones pass compact_fraction")
+        ready = ReadySet(keys, heap_class, lazy=True, compact_fraction=0.25)
+        removed = keys[::4]  # 9 of the 34 keys
+        for key in removed:
+            ready.remove(key)
+        assert ready.compactions == 1 and len(ready.heap) < len(keys), name
+        live = sorted(set(keys) - set(removed), reverse=True)
+        assert [ready.heappop() for _ in range(len(ready))] == live, name
+        assert ready.pops == len(live), name
+
+    print("All tests passed!")
+
+
+#test_ready_set_lazy_removal()
+
+
+def test_category_weights():
+    """
+    Tests the validation of category profiles, and that a custom profile
+    changes the order of the schedule
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    print("Test 1: invalid profiles are rejected")
+    for profile in ({"Bogus": 5}, {"Family": -1}, {"Family": "high"}, {"Family": True},
+                    {"Family": float("nan")}, {"Family": float("inf")}):
+        try:
+            category_weights(profile)
+            raise AssertionError(f"accepted {profile}")
+        except ValueError:
+            pass
+    weights = category_weights({"Hobby": 50, "Routine": 0.5})
+    assert weights[CATEGORY_CODES["Hobby"]] == 50 and weights[CATEGORY_CODES["Routine"]] == 0.5
+    assert weights[CATEGORY_CODES["Family"]] == CATEGORY_VALUE["Family"]
+
+    print("Test 2: a custom profile changes the order")
+    def order(name, category_value=None):
+        tasks = [Task(id=1, description="Guitar", duration=30, category="Hobby"),
+                 Task(id=2, description="Laundry", duration=30, category="Routine"),
+                 Task(id=3, description="Call mom", duration=30, category="Family")]
+        result = run_strategy(name, tasks, "09:00", "18:00", category_value=category_value)
+        return [task.id for task, _ in result.schedule]
+
+    for name in strategy_names():
+        assert order(name) == [2, 3, 1], (name, order(name))
+        assert order(name, {"Hobby": 50}) == [1, 2, 3], (name, order(name, {"Hobby": 50}))
+        assert order(name, {"Routine": 0, "Family": 30}) == [3, 1, 2], name
+
+    print("All tests passed!")
+
+
+#test_category_weights()
+
+
+def test_flexible_fast_path():
+    """
+    Tests that the fast path for task sets without fixed-time tasks gives every
+    strategy the same schedule and efficiency as its general loop
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    rng = random.Random(7)
+    days = []
+    for n in (1, 5, 12, 30):
+        tasks = []
+        for i in range(n):
+            dependencies = rng.sample(range(i), min(i, rng.choice((0, 0, 1, 2))))
+            tasks.append((i, f"Task {i}", rng.randint(5, 90), dependencies, rng.choice(CATEGORIES)))
+        days.append(tasks)
+
+    def run(name, tasks, fast, end_time, availability):
+        scheduler = get_strategy(name)([Task(id=i, description=d, duration=m, dependencies=list(deps), category=c)
+                                        for i, d, m, deps, c in tasks])
+        scheduler.flexible_fast_path = fast
+        random.seed(1)  # the same tie-breaks in both runs
+        result = scheduler.run("08:00", end_time, availability)
+        return [(task.id, start) for task, start in result.schedule], result.efficiency
+
+    for name in strategy_names():
+        print(f"Test {name}")
+        for tasks in days:
+            for end_time, availability in ((None, None), ("12:00", None), ("20:00", [("08:00", "10:30"), ("11:00", "20:00")])):
+                fast = run(name, tasks, True, end_time, availability)
+                general = run(name, tasks, False, end_time, availability)
+                assert fast == general, (name, len(tasks), end_time, fast, general)
+
+    print("All tests passed!")
+
+
+#test_flexible_fast_path()
@@ -0,0 +1,384 @@
+import argparse
+import asyncio
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+from TaskClass import Task, CATEGORIES
+from BatchScheduler import ALGORITHMS, DEFAULT_END_TIME, init_worker, schedule_one
+from SchedulerEngine import FLEXIBLE, category_weights
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_CONCURRENCY = 4
+MAX_BODY_BYTES = 8 * 1024 * 1024
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class RequestError(Exception):
+    """A request that cannot be served, carrying the HTTP status to answer with"""
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+def _solve(algorithm, task_dicts, starting_time, end_time, category_value=None):
+    """Executor entry point: build the tasks and run the scheduler (in a worker silenced by init_worker)"""
+    tasks = [Task.from_dict(data) for data in task_dicts]
+    return schedule_one(algorithm, tasks, starting_time, end_time, category_value=category_value, quiet=False)
+
+
+def _is_int(value):
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _is_time(value):
+    """True for a 'hh:mm' string"""
+    return isinstance(value, str) and value.count(":") == 1 and all(p.isdigit() for p in value.split(":"))
+
+
+def _check_task(position, data):
+    """
+    Validate one task dict of a request
+
+    Raises
+    ----------
+    RequestError(400) naming the task and the field at fault
+    """
+    if not isinstance(data, dict) or not {"id", "description", "duration"} <= data.keys():
+        raise RequestError(400, "every task needs at least id, description and duration")
+    name = f"task {data['id']!r}" if _is_int(data["id"]) else f"task #{position + 1}"
+    scheduled = data.get("scheduled", FLEXIBLE)
+    dependencies = data.get("dependencies", [])
+    checks = [
+        (_is_int(data["id"]), "id must be an integer"),
+        (isinstance(data["description"], str), "description must be a string"),
+        (_is_int(data["duration"]) and data["duration"] >= 1, "duration must be a whole number of minutes >= 1"),
+        (isinstance(dependencies, list) and all(_is_int(dep) for dep in dependencies),
+         "dependencies must be a list of task ids"),
+        (scheduled == FLEXIBLE or (_is_time(scheduled) and int(scheduled.split(":")[0]) <= 23
+                                   and int(scheduled.split(":")[1]) <= 59),
+         f"scheduled must be 'hh:mm' or '{FLEXIBLE}'"),
+        (data.get("category", "Other") in CATEGORIES, f"category must be one of {', '.join(CATEGORIES)}"),
+        (isinstance(data.get("status", "N"), str), "status must be a string"),
+    ]
+    for ok, message in checks:
+        if not ok:
+            raise RequestError(400, f"{name}: {message}")
+
+
+def parse_schedule_request(payload):
+    """
+    Validate the body of POST /schedule
+
+    Parameters
+    ----------
+    payload: dict
+      {"algorithm": "DP", "starting_time": "09:00", "end_time": "24:00",
+       "category_value": {"Family": 30, ...}, "tasks": [{...}, ...]}
+      algorithm, end_time and category_value are optional
+
+    Returns
+    ----------
+    tuple (algorithm, task dicts, starting_time, end_time, category_value)
+
+    Raises
+    ----------
+    RequestError(400) for a malformed request: an unknown algorithm or category,
+    a time that is not 'hh:mm', or a task field of the wrong type
+    """
+    if not isinstance(payload, dict):
+        raise RequestError(400, "request body must be a JSON object")
+    algorithm = payload.get("algorithm", "DP")
+    if algorithm not in ALGORITHMS:
+        raise RequestError(400, f"unknown algorithm '{algorithm}', expected one of {', '.join(ALGORITHMS)}")
+    starting_time = payload.get("starting_time")
+    end_time = payload.get("end_time", DEFAULT_END_TIME)
+    for name, value in (("starting_time", starting_time), ("end_time", end_time)):
+        if not _is_time(value):
+            raise RequestError(400, f"{name} must be a time in the format 'hh:mm'")
+    tasks = payload.get("tasks")
+    if not isinstance(tasks, list):
+        raise RequestError(400, "tasks must be a list")
+    for position, data in enumerate(tasks):
+        _check_task(position, data)
+    category_value = payload.get("category_value")
+    if category_value is not None:
+        if not isinstance(category_value, dict):
+            raise RequestError(400, "category_value must be an object {category: value}")
+        try:
+            category_weights(category_value)
+        except ValueError as e:
+            raise RequestError(400, str(e)) from None
+    return algorithm, tasks, starting_time, end_time, category_value
+
+
+class SchedulerService:
+    """
+    Asyncio scheduling service
+
+    CPU-bound solves run in a bounded executor, at most `concurrency` of them at a time.
+    Identical requests arriving while one is being solved are coalesced: they all
+    wait for the same solve instead of starting a new one.
+
+    Attributes
+    ----------
+    concurrency: int
+        Maximum number of solves running at the same time
+    executor: concurrent.futures.ProcessPoolExecutor
+        Where the schedulers run (a process pool with `concurrency` workers by default).
+        It must be process-based: the schedulers print their progress and are silenced
+        once per worker process, which threads sharing one sys.stdout cannot do. Give it
+        initializer=BatchScheduler.init_worker, otherwise the workers' output is not silenced.
+    solves: int
+        Number of solves actually started (coalesced requests are not counted)
+    """
+    def __init__(self, concurrency=DEFAULT_CONCURRENCY, executor=None):
+        if executor is not None and not isinstance(executor, ProcessPoolExecutor):
+            raise TypeError("the executor must be a ProcessPoolExecutor: solves in threads would share sys.stdout")
+        self.concurrency = concurrency
+        self.executor = executor
+        self._owns_executor = executor is None
+        self._semaphore = None
+        self._inflight = {}
+        self.solves = 0
+
+    def _get_executor(self):
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.concurrency, initializer=init_worker)
+        return self.executor
+
+    def close(self):
+        """Shut down the executor if the service created it"""
+        if self._owns_executor and self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    async def _run_solve(self, algorithm, tasks, starting_time, end_time, category_value):
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        async with self._semaphore:
+            self.solves += 1
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), _solve,
+                                              algorithm, tasks, starting_time, end_time, category_value)
+
+    async def schedule(self, payload):
+        """
+        Schedule the tasks of a request, sharing the result with identical in-flight requests
+
+        Parameters
+        ----------
+        payload: dict
+          body of POST /schedule
+
+        Returns
+        ----------
+        dict with the schedule entries and the efficiency
+        """
+        request = parse_schedule_request(payload)
+        key = json.dumps(request, sort_keys=True)
+        future = self._inflight.get(key)
+        if future is None:
+            future = asyncio.ensure_future(self._run_solve(*request))
+            self._inflight[key] = future
+            future.add_done_callback(lambda _: self._inflight.pop(key, None))
+        return await asyncio.shield(future)
+
+    async def handle(self, method, path, body=b""):
+        """
+        Route one request
+
+        Parameters
+        ----------
+        method: str
+          HTTP method
+        path: str
+          request path
+        body: bytes
+          request body
+
+        Returns
+        ----------
+        tuple (status code, JSON-serializable response)
+        """
+        try:
+            if path == "/health":
+                self._expect(method, "GET")
+                return 200, {"status": "ok"}
+            if path == "/algorithms":
+                self._expect(method, "GET")
+                return 200, {"algorithms": list(ALGORITHMS)}
+            if path == "/schedule":
+                self._expect(method, "POST")
+                try:
+                    payload = json.loads(body or b"null")
+                except ValueError:
+                    raise RequestError(400, "request body is not valid JSON")
+                return 200, await self.schedule(payload)
+            raise RequestError(404, f"no route for {path}")
+        except RequestError as e:
+            return e.status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"{type(e).__name__}: {e}"}
+
+    @staticmethod
+    def _expect(method, allowed):
+        if method != allowed:
+            raise RequestError(405, f"use {allowed}")
+
+    async def _serve_connection(self, reader, writer):
+        try:
+            status, response = await self._read_and_handle(reader)
+        except RequestError as e:
+            status, response = e.status, {"error": str(e)}
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+            return
+        data = json.dumps(response).encode("utf-8")
+        head = (f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(data)}\r\n"
+                f"Connection: close\r\n\r\n")
+        writer.write(head.encode("ascii") + data)
+        try:
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def _read_and_handle(self, reader):
+        request_line = (await reader.readline()).decode("latin-1").strip()
+        parts = request_line.split()
+        if len(parts) != 3:
+            raise RequestError(400, "malformed request line")
+        method, target, _ = parts
+        length = 0
+        while True:
+            line = (await reader.readline()).decode("latin-1").strip()
+            if not line:
+                break
+            name, _, value = line.partition(":")
+            if name.strip().lower() == "content-length":
+                if not value.strip().isdigit():
+                    raise RequestError(400, "invalid Content-Length")
+                length = int(value)
+        if length > MAX_BODY_BYTES:
+            raise RequestError(413, "request body too large")
+        body = await reader.readexactly(length) if length else b""
+        return await self.handle(method, target.split("?", 1)[0], body)
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the asyncio server"""
+        return await asyncio.start_server(self._serve_connection, host, port)
+
+
+class LocalClient:
+    """
+    In-process client that calls the service's router directly, without sockets
+    """
+    def __init__(self, service):
+        self.service = service
+
+    async def get(self, path):
+        return await self.service.handle("GET", path)
+
+    async def post(self, path, payload):
+        return await self.service.handle("POST", path, json.dumps(payload).encode("utf-8"))
+
+
+async def _serve(host, port, concurrency):
+    service = SchedulerService(concurrency)
+    server = await service.start(host, port)
+    print(f"Scheduler service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP/JSON scheduling service")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="maximum number of schedules computed at the same time")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve(args.host, args.port, args.concurrency))
+    except KeyboardInterrupt:
+        pass
+
+
+def test_schedule_requests():
+    """
+    Tests the 400 answers to malformed requests and the coalescing of identical ones
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    print("Running test cases...")
+    tasks = [{"id": 1, "description": "Gym", "duration": 60, "category": "Routine"},
+             {"id": 2, "description": "Call", "duration": 15, "dependencies": [1]},
+             {"id": 3, "description": "Meeting", "duration": 30, "scheduled": "11:00"}]
+    request = {"algorithm": "TaskScheduler", "starting_time": "09:00", "end_time": "18:00", "tasks": tasks}
+
+    def with_task(**fields):
+        return dict(request, tasks=tasks[:2] + [dict(tasks[2], **fields)])
+
+    bad_requests = [
+        [1, 2],
+        dict(request, algorithm="Random"),
+        dict(request, starting_time="9am"),
+        dict(request, tasks={"id": 1}),
+        dict(request, tasks=[{"id": 1, "description": "Gym"}]),
+        dict(request, category_value=["Family"]),
+        dict(request, category_value={"Family": -5}),
+        dict(request, category_value={"Bogus": 5}),
+        with_task(id="3"),
+        with_task(id=True),
+        with_task(description=None),
+        with_task(duration="x"),
+        with_task(duration=0),
+        with_task(dependencies=1),
+        with_task(dependencies=["1"]),
+        with_task(scheduled="25:00"),
+        with_task(scheduled=660),
+        with_task(category="Bogus"),
+    ]
+
+    async def run():
+        service = SchedulerService(concurrency=1)
+        client = LocalClient(service)
+        try:
+            print("Test 1: malformed requests are answered with 400")
+            for payload in bad_requests:
+                status, response = await client.post("/schedule", payload)
+                assert status == 400, (payload, status, response)
+            assert service.solves == 0
+
+            print("Test 2: identical requests in flight share one solve")
+            answers = await asyncio.gather(*(client.post("/schedule", request) for _ in range(3)))
+            assert [status for status, _ in answers] == [200, 200, 200], answers
+            assert answers[0][1] == answers[1][1] == answers[2][1]
+            assert service.solves == 1, service.solves
+            status, _ = await client.post("/schedule", dict(request, starting_time="10:00"))
+            assert status == 200 and service.solves == 2
+        finally:
+            service.close()
+
+    asyncio.run(run())
+    print("All tests passed!")
+
+
+#test_schedule_requests()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,9 @@
+# Categories a task can belong to, in the order used for compact category codes
+CATEGORIES = ("Routine", "Family", "Growth", "Friends", "Hobby", "Other")
+CATEGORY_CODES = {name: code for code, name in enumerate(CATEGORIES)}
+# Code of any category that is not in CATEGORIES
+UNKNOWN_CATEGORY = len(CATEGORIES)
+
 class Task:
     """
     - id: int,  Task id (a reference number)   
@@ -11,6 +17,8 @@ class Task:
                     Growth, Friends, Hobby, Other) the task relates to. Before executing 
                     time scheduler they also can indicate the importance of each 
                     of the categories for them personally.
+    - category_code: int, Index of the category in CATEGORIES (UNKNOWN_CATEGORY for
+                    any other category), kept in sync with category
 
    
     """
@@ -25,8 +33,47 @@ class Task:
         self.scheduled = scheduled
         self.priority = 0
         self.category = category
+
+    @property
+    def category(self):
+        return self._category
+
+    @category.setter
+    def category(self, value):
+        self._category = value
+        self.category_code = CATEGORY_CODES.get(value, UNKNOWN_CATEGORY)
+
+    def to_dict(self):
+        """
+        Plain dict with the fields of the task (JSON serializable)
+        """
+        return {
+            "id": self.id,
+            "description": self.description,
+            "duration": self.duration,
+            "dependencies": list(self.dependencies),
+            "status": self.status,
+            "scheduled": self.scheduled,
+            "category": self.category,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Create a Task from a dict such as the one returned by to_dict.
+        Only id, description and duration are required.
+        """
+        return cls(
+            id=data["id"],
+            description=data["description"],
+            duration=data["duration"],
+            dependencies=list(data.get("dependencies", [])),
+            status=data.get("status", "N"),
+            scheduled=data.get("scheduled", "25:25"),
+            category=data.get("category", "Other"),
+        )
     
 '''
     def __lt__(self, other):
         return self.id < other.id
-        '''
\ No newline at end of file
+        '''
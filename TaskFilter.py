@@ -0,0 +1,125 @@
+"""
+Removal of the tasks that cannot be done in the scheduling window
+
+Shared by ImprovedGreedy_Scheduler.filter_tasks and
+DP_Scheduler.filter_unrealistic_tasks.
+"""
+from TaskGraph import DependencyGraph
+from SchedulerEngine import to_minutes
+
+# Why a task was left out
+TOO_SHORT = "too_short"
+OUTSIDE_WINDOW = "outside_window"
+PREREQUISITES = "prerequisites"
+
+DROP_REASONS = {
+    TOO_SHORT: "duration is less than 1 minute",
+    OUTSIDE_WINDOW: "scheduled outside of the time window",
+    PREREQUISITES: "prerequisites cannot be done before the scheduled time",
+}
+
+
+def partition_tasks(tasks, start_minutes, end_minutes, graph=None):
+    """
+    Split the tasks into the ones that can be done between start_minutes and
+    end_minutes and the ones that cannot, in one pass
+
+    A task is dropped if
+    - it has duration less than 1 minute
+    - it is scheduled to start before start_minutes or to end after end_minutes
+    - it is scheduled and its prerequisites cannot be done before it
+
+    Parameters
+    ----------
+    tasks: list
+      Task objects
+    start_minutes: int
+      minutes since midnight when the window starts
+    end_minutes: int
+      minutes since midnight when the window ends
+    graph: DependencyGraph
+      dependency graph of the tasks (built from tasks if not given)
+
+    Returns
+    ----------
+    tuple (kept, dropped)
+      kept - list of Task objects in their original order
+      dropped - list of (Task, reason) tuples, reason is a key of DROP_REASONS
+    """
+    if graph is None:
+        graph = DependencyGraph(tasks)
+    kept = []
+    dropped = []
+    for task in tasks:
+        if task.duration < 1:
+            dropped.append((task, TOO_SHORT))
+            continue
+        if task.scheduled != "25:25":
+            scheduled_minutes = to_minutes(task.scheduled)
+            if scheduled_minutes < start_minutes or scheduled_minutes + task.duration > end_minutes:
+                dropped.append((task, OUTSIDE_WINDOW))
+                continue
+            if not graph.is_feasible(task.id, start_minutes):
+                dropped.append((task, PREREQUISITES))
+                continue
+        kept.append(task)
+    return kept, dropped
+
+
+def test_partition_tasks():
+    """
+    Tests that every task is checked, the last one included, that the kept
+    tasks keep their order, and the reason given for every dropped task
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    start, end = to_minutes("08:00"), to_minutes("20:00")
+    tasks = [
+        Task(id=1, description="Breakfast", duration=20),
+        Task(id=2, description="Nothing", duration=0),
+        Task(id=3, description="Run", duration=30, scheduled="07:30"),          # before the window
+        Task(id=4, description="Prepare", duration=60),
+        Task(id=5, description="Meeting", duration=30, scheduled="08:30", dependencies=[4]),  # 4 takes 60 min
+        Task(id=6, description="Lunch", duration=45, scheduled="12:00", dependencies=[4]),
+        Task(id=7, description="Late show", duration=90, scheduled="19:00"),    # ends after the window
+    ]
+
+    print("Test 1: one reason per dropped task, the last task included")
+    kept, dropped = partition_tasks(tasks, start, end)
+    assert [task.id for task in kept] == [1, 4, 6]
+    assert [(task.id, reason) for task, reason in dropped] == [
+        (2, TOO_SHORT), (3, OUTSIDE_WINDOW), (5, PREREQUISITES), (7, OUTSIDE_WINDOW)]
+
+    print("Test 2: a single infeasible task is dropped too")
+    kept, dropped = partition_tasks(tasks[-1:], start, end)
+    assert kept == [] and [task.id for task, _ in dropped] == [7]
+
+    print("Test 3: a task that ends exactly at the end of the window is kept")
+    kept, _ = partition_tasks([Task(id=8, description="Call", duration=60, scheduled="19:00")], start, end)
+    assert [task.id for task in kept] == [8]
+
+    print("Test 4: both schedulers' filters drop the last task")
+    from ImprovedGreedy_Scheduler import ImprovedGreedy_Scheduler
+    from DP_Scheduling import DP_Scheduler
+
+    improved = ImprovedGreedy_Scheduler(tasks)
+    improved.filter_tasks("08:00", "20:00")
+    dp = DP_Scheduler(tasks)
+    dp.filter_unrealistic_tasks("08:00", "20:00")
+    for scheduler in (improved, dp):
+        assert [task.id for task in scheduler.tasks] == [1, 4, 6]
+        assert [task.id for task, _ in scheduler.dropped_tasks] == [2, 3, 5, 7]
+
+    print("All tests passed!")
+
+
+#test_partition_tasks()
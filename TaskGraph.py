@@ -0,0 +1,204 @@
+"""
+Dependency graph of a task list with precomputed critical-path data
+
+The graph is built once per scheduling run and shared by the filters, so the
+feasibility of every fixed-time task is known after a single pass over the
+tasks in topological order instead of a fresh search per task.
+"""
+from SchedulerEngine import to_minutes
+
+
+class DependencyGraph:
+    """
+    Directed acyclic graph of task dependencies
+
+    Dependency ids that are not in the task list are ignored. The graph must be
+    acyclic (TaskValidation.validate_tasks removes cycles).
+
+    Attributes
+    ----------
+    tasks: dict
+        {task id: Task}
+    order: list
+        Task ids in topological order (every task after all of its prerequisites)
+    """
+    def __init__(self, tasks):
+        self.tasks = {}
+        for task in tasks:
+            self.tasks.setdefault(task.id, task)
+        self.order = self._topological_order()
+        self._loads = {}
+        self._earliest = {}
+
+    def dependencies(self, task_id):
+        """Known dependency ids of a task"""
+        return [dep for dep in self.tasks[task_id].dependencies if dep in self.tasks]
+
+    def _topological_order(self):
+        """Kahn's algorithm over the dependency edges"""
+        remaining = {}
+        dependants = {task_id: [] for task_id in self.tasks}
+        for task_id in self.tasks:
+            deps = self.dependencies(task_id)
+            remaining[task_id] = len(deps)
+            for dep in deps:
+                dependants[dep].append(task_id)
+        ready = [task_id for task_id, count in remaining.items() if count == 0]
+        order = []
+        while ready:
+            task_id = ready.pop()
+            order.append(task_id)
+            for dependant in dependants[task_id]:
+                remaining[dependant] -= 1
+                if remaining[dependant] == 0:
+                    ready.append(dependant)
+        if len(order) != len(self.tasks):
+            raise ValueError("the dependency graph has a cycle")
+        return order
+
+    def prerequisite_load(self, task_id, limit=None):
+        """
+        Total duration of all the tasks that have to be done before a task
+        (every prerequisite counted once, even when several paths lead to it)
+
+        The prerequisites are collected with a depth-first search and a visited set,
+        O(prerequisites + their edges) time and memory per task, and the filter only
+        asks for the fixed-time tasks. With a limit the search stops as soon as the
+        load is above it, so a task is never searched further back than its window.
+
+        Parameters
+        ----------
+        task_id: int
+          id of the task
+        limit: int
+          minutes available for the prerequisites (default: no limit)
+
+        Returns
+        ----------
+        int: minutes (with a limit, any value above it means the load does not fit)
+        """
+        load = self._loads.get(task_id)
+        if load is not None:
+            return load
+        load = 0
+        visited = set()
+        stack = self.dependencies(task_id)
+        while stack:
+            dep = stack.pop()
+            if dep in visited:
+                continue
+            visited.add(dep)
+            load += self.tasks[dep].duration
+            if limit is not None and load > limit:
+                return load  # partial: not cached
+            stack.extend(self.dependencies(dep))
+        self._loads[task_id] = load
+        return load
+
+    def earliest_starts(self, start_minutes):
+        """
+        Earliest minute each task can start when the day begins at start_minutes:
+        the longest path through the prerequisites, where a fixed-time
+        prerequisite cannot finish before its scheduled time plus its duration
+
+        Parameters
+        ----------
+        start_minutes: int
+          minutes since midnight when the first task can start
+
+        Returns
+        ----------
+        dict {task id: minutes since midnight}
+        """
+        earliest = self._earliest.get(start_minutes)
+        if earliest is None:
+            earliest = {}
+            finish = {}
+            for task_id in self.order:
+                task = self.tasks[task_id]
+                begin = start_minutes
+                for dep in self.dependencies(task_id):
+                    begin = max(begin, finish[dep])
+                earliest[task_id] = begin
+                if task.scheduled != "25:25":
+                    begin = max(begin, to_minutes(task.scheduled))
+                finish[task_id] = begin + task.duration
+            self._earliest[start_minutes] = earliest
+        return earliest
+
+    def is_feasible(self, task_id, start_minutes):
+        """
+        Whether the prerequisites of a fixed-time task can be done between
+        start_minutes and its scheduled time (flexible tasks are always feasible)
+
+        Parameters
+        ----------
+        task_id: int
+          id of the task
+        start_minutes: int
+          minutes since midnight when the first task can start
+
+        Returns
+        ----------
+        bool
+        """
+        task = self.tasks[task_id]
+        if task.scheduled == "25:25":
+            return True
+        available = to_minutes(task.scheduled) - start_minutes
+        return (self.prerequisite_load(task_id, available) <= available
+                and self.earliest_starts(start_minutes)[task_id] - start_minutes <= available)
+
+
+def test_dependency_graph():
+    """
+    Tests the prerequisite loads and earliest starts, and which fixed-time
+    tasks is_feasible lets through
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    start = to_minutes("08:00")
+    tasks = [
+        Task(id=1, description="Shop", duration=40),
+        Task(id=2, description="Cook", duration=50, dependencies=[1]),
+        Task(id=3, description="Set table", duration=10, dependencies=[1]),
+        Task(id=4, description="Dinner guests", duration=60, scheduled="09:30", dependencies=[2, 3]),  # 100 min of work
+        Task(id=5, description="Guests arrive", duration=60, scheduled="09:40", dependencies=[2, 3, 9]),  # 9 is unknown
+        Task(id=6, description="Drive", duration=30, scheduled="10:00"),
+        Task(id=7, description="Pick up", duration=15, scheduled="10:20", dependencies=[6]),  # the drive ends 10:30
+        Task(id=8, description="Unpack", duration=20, scheduled="11:00", dependencies=[6]),
+    ]
+    graph = DependencyGraph(tasks)
+
+    print("Test 1: a shared prerequisite is counted once")
+    assert graph.prerequisite_load(4) == 40 + 50 + 10
+    assert graph.prerequisite_load(1) == 0
+    assert graph.prerequisite_load(5, limit=30) > 30  # stops early above the limit
+    assert graph.prerequisite_load(5) == 100
+
+    print("Test 2: earliest starts follow the longest chain and fixed slots")
+    earliest = graph.earliest_starts(start)
+    assert earliest[2] == start + 40 and earliest[3] == start + 40
+    assert earliest[4] == start + 90  # 40 + 50, the longer of the two chains
+    assert earliest[7] == to_minutes("10:30") and earliest[8] == to_minutes("10:30")
+
+    print("Test 3: a chain that cannot finish before the fixed slot")
+    assert not graph.is_feasible(4, start)   # 100 min of prerequisites in 90
+    assert graph.is_feasible(5, start)       # exactly 100 min
+    assert graph.is_feasible(4, start - 10)  # starting at 07:50 the 100 min fit
+    assert not graph.is_feasible(7, start)   # a load of 30 fits, but its fixed prerequisite ends at 10:30
+    assert graph.is_feasible(8, start) and graph.is_feasible(1, start) and graph.is_feasible(6, start)
+
+    print("All tests passed!")
+
+
+#test_dependency_graph()
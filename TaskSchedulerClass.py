@@ -1,239 +1,98 @@
-from MaxHeap import MaxHeapq 
-import random
+import warnings
 
-class TaskScheduler:
+from SchedulerEngine import SchedulerCore, PriorityModel, register_strategy, FLEXIBLE
+from DurationIndex import DurationIndex
+
+@register_strategy("TaskScheduler")
+class TaskScheduler(SchedulerCore):
     """
     A Simple Daily Task Scheduler Using Priority Queues
 
     tasks - the list of the Task() objects, that we want to schedule
-    priority_queue - MaxHeapq() of the priority value for each of the tasks
+    priority_queue - ReadySet() of the priority value for each of the tasks
+    schedule - list of (task, start_time) tuples in the order the tasks were done
+    diagnostics - problems found in the tasks before scheduling (see TaskValidation);
+            tasks in dependency cycles or with duplicate ids are left out
+    stats - dict with per-phase wall time and operation counters, filled only when
+            the scheduler is created with instrument=True
+    gap_index - DurationIndex of the priorities of the flexible tasks that are still to be
+            done and whose dependencies are all done (created by create_gap_index)
+
+    Slot selection: the highest-priority task goes next; before a fixed-time task the
+    free time is filled greedily with the highest-priority flexible tasks that fit.
+    Time, priorities and output are shared with the other schedulers (SchedulerEngine).
     """
-    # Each Task has a category. Each of the categories has a value that 
-    # represents how strongly we should prioritize tasks from this category
-    category_value = {"Routine" : 20, "Family" : 15, "Growth" : 15, "Friends" : 10, "Hobby" : 5, "Other" : 0}
-    
-    def __init__(self, tasks):
-        self.tasks = tasks
-        self.priority_queue = [] 
-
-    def priority_calculation(self):
-        """
-        Calculates the priority of each task based on the dependencies,  
-        scheduling and the category of the task
-
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        for task in self.tasks:
-            #set priority based on the time, the sooner it is scheduled, the higher priority 
-            if task.scheduled != "25:25":
-                task.priority = max(task.priority, 24 * 3600 - int(task.scheduled.split(":")[0]) * 3600 - int(task.scheduled.split(":")[1]) * 60)
-            # increase the priority depending on the importance of the category
-            task.priority += self.category_value[task.category]
-            # updates the priority of all dependencies of the current task
-            self.update_dependencies_priority(task.dependencies, task.priority + 100)
-        self.priority_randomization()
-    
-    def update_dependencies_priority(self, dependencies, value):
-        
-        """
-        Updates the priority of the dependent task, choosing the biggest between its 
-        current priority and the priority of the following task (dependant) increased by 100
-
-        Parameters
-        ----------
-        dependencies: list
-          list of id's of dependencies
-        value: int
-          the increased by 100 priority of the dependant task
-
-        Returns
-        ----------
-        None
-        """
-        if len(dependencies) > 0:
-            for dependency in dependencies:
-                for t in self.tasks:
-                    if t.id == dependency:
-                        t.priority = max(t.priority, value)
-                        self.update_dependencies_priority(t.dependencies, value + 100)
-
-    def priority_randomization(self):
-        
-        """
-        In order to have only unique values of priorities, add random float in the range [0;1) 
-        & check uniqueness of priority
+    # priority of a fixed-time task is measured in seconds until midnight
+    priority_model = PriorityModel(time_unit=60)
 
-        Parameters
-        ----------
-        None
-
-        Returns
-        ----------
-        None
-        """
-        unique_values = []
-        for task in self.tasks:
-            add = random.random()
-            while task.priority + add in unique_values:
-                add = random.random()
-            task.priority += add
-            unique_values.append(task.priority)
+    def __init__(self, tasks, instrument=False, category_value=None, heap=None, lazy_removal=None):
+        super().__init__(tasks, instrument, category_value, heap, lazy_removal)
+        self.gap_index = None # set by create_gap_index
+        self._waiting = {} # id -> number of dependencies still to be done
+        self._dependants = {} # id -> flexible tasks waiting for it
 
-    
-    def create_queue(self):
-        
+    def create_gap_index(self):
         """
-        Create MaxHeap based on the tasks' priority
-
-        Parameters
-        ----------
-        None
+        Index the flexible tasks for the gap fill: the ones whose dependencies are all
+        done go into gap_index by duration, the others wait until task_done releases them
 
         Returns
         ----------
         None
         """
-        self.priority_queue = MaxHeapq()
+        self.gap_index = DurationIndex(task.duration for task in self.tasks if task.scheduled == FLEXIBLE)
+        self._waiting = {}
+        self._dependants = {}
         for task in self.tasks:
-            self.priority_queue.heappush(task.priority)
-    
-    def find_priority(self, id):
-        
-        """
-        Find the value of the Task priority based on the given id
-
-        Parameters
-        ----------
-        id: int
-          the id of the task
+            if task.scheduled != FLEXIBLE:
+                continue
+            waiting = 0
+            for dependency in task.dependencies:
+                if self.find_priority(dependency) in self.priority_queue:
+                    waiting += 1
+                    self._dependants.setdefault(dependency, []).append(task)
+            if waiting:
+                self._waiting[task.id] = waiting
+            else:
+                self.gap_index.add(task.duration, task.priority)
 
-        Returns
-        ----------
-        int
-          the priority the  task
+    def task_done(self, task):
         """
-        for task in self.tasks:
-            if task.id == id:
-                return task.priority
-        return None
-        
-    def print_self(self):
-        
-        """
-        Print the all the Tasks added to the Scheduler 
+        Release the flexible tasks that were only waiting for the given task into gap_index
 
         Parameters
         ----------
-        None
+        task: Task
+          the task that has just left the priority queue
 
         Returns
         ----------
         None
         """
-        print("Tasks added to the simple scheduler:")
-        print("--------------------------------------")
-        for t in self.tasks:
-            print(f"➡️'{t.description}', duration = {t.duration} mins.")   
-            if len(t.dependencies)>0:
-                print(f"\t ⚠️ This task depends on others!")     
+        for dependant in self._dependants.pop(task.id, ()):
+            self._waiting[dependant.id] -= 1
+            if self._waiting[dependant.id] == 0:
+                del self._waiting[dependant.id]
+                if dependant.priority in self.priority_queue:
+                    self.gap_index.add(dependant.duration, dependant.priority)
 
-    
-    def find_task(self, priority_value):
-        
+    def run(self, starting_time, end_time=None, availability=None):
         """
-        Find the instant of the class Task, that has indicated priority 
-
-        Parameters
-        ----------
-        priority_value: int
-          the value of the priority of the task
+        Run the scheduler (end_time and availability are not used by this strategy)
 
         Returns
         ----------
-        Object of the Task():
-            the instant of the class Task, that has indicated priority 
-        """
-        for task in self.tasks:
-            if task.priority == priority_value:
-                return task
-        return None
-
-    def new_time(self, old_time, time_passed):
-        
+        ScheduleResult
         """
-        Calculate new current time
+        return self.result(self.run_task_scheduler(starting_time))
 
-        Parameters
-        ----------
-        old_time: string
-          "hh:mm" that represents when the task has been started
-        time_passed: int
-          how many minutes is duration of the task
-        
-        Returns
-        ----------
-        str:  time when the task ends in the format "hh:mm"
-        """
-        h = int(old_time.split(":")[0])
-        m = int(old_time.split(":")[1])
-        h += time_passed // 60
-        m += time_passed % 60
-        if m >= 60:
-            h += 1
-            m -= 60
-        if m < 10:
-            return str(h)+":0"+str(m)
-        return str(h)+":"+str(m)
-    
     def difference(self, now, ordered):
-        
         """
-        Find the difference in minutus between current time and 
-        when the next priority task is scheduled
-
-        Parameters
-        ----------
-        now: string
-          "hh:mm" that represents when current time
-        ordered: string
-          "hh:mm" when the next priority task should start
-
-        Returns
-        ----------
-        int:
-          minutes between the current time and the beginning of the next in the priority queue
-        """
-        return (int(ordered.split(":")[0]) * 60 + int(ordered.split(":")[1])) - (int(now.split(":")[0]) * 60 + int(now.split(":")[1]))
-        
-    
-    def printing(self, current_task, current_time):
-        
+        Deprecated alias of time_difference, kept for existing callers
         """
-        Prints the information about current task and updates time afer its completion
-
-        Parameters
-        ----------
-        current_task: Task
-          Task that is currently getting done
-        current_time: string
-          "hh:mm" that represents the time when current task starts
-
-        Returns
-        ----------
-        string :
-          "hh:mm" that represents the time after current task completion
-        """
-        print(f"🕰t={current_time}")
-        print(f"\tstarted '{current_task.description}' for {current_task.duration} mins...")
-        current_time = self.new_time(current_time, current_task.duration )
-        print(f"\t✅ t={(current_time)}, task completed!")
-        return current_time
+        warnings.warn("TaskScheduler.difference is deprecated, use time_difference",
+                      DeprecationWarning, stacklevel=2)
+        return self.time_difference(now, ordered)
 
     def run_task_scheduler(self, starting_time):
         
@@ -251,47 +110,58 @@ class TaskScheduler:
         None
         """
         current_time = starting_time
+        self.schedule = []
         durations_sum = 0 # how many minutes were spent in action
+        stats = self.stats
         print("Running a simple scheduler:\n")
-        self.priority_calculation()
-        self.create_queue()
-        while self.priority_queue.heap_size>0:
-            current_task = self.find_task(self.priority_queue.heappop()) #get all the information about the task
-            # Accomodating the case if there is a schedule
-            if self.difference(current_time, current_task.scheduled) < 0:
-                print(f"Schedule overlap happened with task {current_task.description}")
-                continue
-            #if the current task is scheduled for specific time, let's check if we still can do smth before the time comes
-            if current_task.scheduled != "25:25":
-                option = 1 #We have option to do smth in between now and time when current task is scheduled
-                diff = self.difference(current_time, current_task.scheduled) #how many minutes we have btw now and time of the current task
-                #Do as much tasks as possible in time diff, based on the priority
-                while diff > 0 and option:
-                    alternative_queue = MaxHeapq() #heap of the options we have
-                    # create priority queue for tasks that fit within diff time
-                    for task in self.tasks:
-                        if task.scheduled == "25:25" and task.duration <= diff and task.priority in self.priority_queue.heap:
-                            #before adding it to the heap of tasks we can do
-                            #check if all dependencies are done
-                            completed_dependencies = 1
-                            for dependency in task.dependencies:
-                                if self.find_priority(dependency) in self.priority_queue.heap or dependency == current_task.id:
-                                    completed_dependencies = 0
-                            if completed_dependencies:
-                                alternative_queue.heappush(task.priority)
-                    if alternative_queue.heap_size == 0: #if no tasks can be done in time diff
-                        option = 0
-                    else:
-                        #proceed with the top-priority task that fits within schedule
-                        self.priority_queue.remove(alternative_queue.heap[0]) # remove it from the main priority queue
-                        alternative_task = self.find_task(alternative_queue.heappop())
-                        durations_sum += alternative_task.duration
-                        current_time = self.printing(alternative_task, current_time) #Print ant update current time
-                        diff = self.difference(current_time, current_task.scheduled)
-                current_time = current_task.scheduled #after no more tasks can be done in between, we move on the previously scheduled task
-            durations_sum += current_task.duration
-            current_time = self.printing(current_task, current_time)         
-        min_passed = self.difference(starting_time, current_time)           
+        with stats.phase("validate"):
+            self.validate()
+        with stats.phase("priority_calculation"):
+            self.priority_calculation()
+        if self.flexible_fast_path and all(task.scheduled == FLEXIBLE for task in self.tasks):
+            # no fixed-time tasks: priority order is the whole schedule
+            with stats.phase("flexible_fast_path"):
+                current_time, durations_sum = self.run_flexible(current_time)
+        else:
+            with stats.phase("create_queue"):
+                self.create_queue()
+                self.create_gap_index()
+        with stats.phase("scheduling"):
+            while self.priority_queue.heap_size>0:
+                current_task = self.find_task(self.priority_queue.heappop()) #get all the information about the task
+                self.gap_index.discard(current_task.duration, current_task.priority)
+                # Accomodating the case if there is a schedule
+                if self.time_difference(current_time, current_task.scheduled) < 0:
+                    print(f"Schedule overlap happened with task {current_task.description}")
+                    self.task_done(current_task)
+                    continue
+                #if the current task is scheduled for specific time, let's check if we still can do smth before the time comes
+                if current_task.scheduled != FLEXIBLE:
+                    option = 1 #We have option to do smth in between now and time when current task is scheduled
+                    diff = self.time_difference(current_time, current_task.scheduled) #how many minutes we have btw now and time of the current task
+                    #Do as much tasks as possible in time diff, based on the priority
+                    while diff > 0 and option:
+                        with stats.phase("gap_fill"):
+                            # top-priority flexible task that fits within diff time and whose dependencies
+                            # are done (the current task is not done yet, so its dependants are not in the index)
+                            best = self.gap_index.best(diff)
+                            stats.count("gap_lookups")
+                            if best is None: #if no tasks can be done in time diff
+                                option = 0
+                            else:
+                                alternative_task = self.find_task(best)
+                                self.priority_queue.remove(best) # remove it from the main priority queue
+                                self.gap_index.discard(alternative_task.duration, best)
+                                durations_sum += alternative_task.duration
+                                current_time = self.printing(alternative_task, current_time) #Print ant update current time
+                                self.task_done(alternative_task)
+                                diff = self.time_difference(current_time, current_task.scheduled)
+                    current_time = current_task.scheduled #after no more tasks can be done in between, we move on the previously scheduled task
+                durations_sum += current_task.duration
+                current_time = self.printing(current_task, current_time)         
+                self.task_done(current_task)
+        stats.record_heap("main_queue", self.priority_queue)
+        min_passed = self.time_difference(starting_time, current_time)           
         print(f"\n🏁 Completed all planned tasks in period from {starting_time} to {current_time}! It's {min_passed} minutes passed.")
         print(f"Sum of the task durations - {durations_sum} mins")
         if min_passed == 0:
@@ -299,6 +169,4 @@ class TaskScheduler:
         else:
             efficiency = round((durations_sum / min_passed) * 100, 2)
         print("Scheduler efficiency is ", efficiency)
-        return efficiency
-
-    
\ No newline at end of file
+        return efficiency
\ No newline at end of file
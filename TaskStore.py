@@ -0,0 +1,495 @@
+"""
+Bulk import/export of task sets
+
+Two formats are supported:
+- newline-delimited JSON (one Task.to_dict() object per line) for interchange
+- a packed columnar binary file that can be memory-mapped; its columns are read
+  in place, without building a Task object per row
+
+Binary layout (native byte order, recorded in the header):
+    header   magic b"TSKS", version, byte order flag, row count
+    sections (offset, size) of every column, in COLUMNS order
+    columns  each aligned to 8 bytes
+"""
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+
+from TaskClass import Task, CATEGORIES, CATEGORY_CODES
+
+MAGIC = b"TSKS"
+VERSION = 1
+FLEXIBLE = -1  # value of the scheduled column for tasks without a fixed time
+
+# column name -> array typecode ("" for raw utf-8 bytes)
+COLUMNS = (
+    ("ids", "q"),           # task ids
+    ("durations", "i"),     # minutes
+    ("scheduled", "h"),     # minutes since midnight or FLEXIBLE
+    ("categories", "B"),    # index into CATEGORIES
+    ("statuses", "B"),      # one ASCII character per task
+    ("dep_offsets", "Q"),   # dependencies of row i are dep_ids[dep_offsets[i]:dep_offsets[i + 1]]
+    ("dep_ids", "q"),
+    ("desc_offsets", "Q"),  # description of row i is descriptions[desc_offsets[i]:desc_offsets[i + 1]]
+    ("descriptions", ""),
+)
+
+_HEADER = struct.Struct("<4sHBxQ")
+_SECTION = struct.Struct("<QQ")
+
+
+def _scheduled_to_minutes(scheduled):
+    if scheduled == "25:25":
+        return FLEXIBLE
+    h, m = scheduled.split(":")
+    return int(h) * 60 + int(m)
+
+
+def _minutes_to_scheduled(minutes):
+    if minutes == FLEXIBLE:
+        return "25:25"
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+class TaskTable:
+    """
+    Columnar representation of a task set
+
+    Every column is an array (or a memoryview of a memory-mapped file) with one
+    entry per task; dependencies and descriptions are stored as flat arrays with offsets.
+
+    Attributes
+    ----------
+    ids, durations, scheduled, categories, statuses: arrays with one value per task
+    dep_offsets, dep_ids: dependency lists in compressed sparse row form
+    desc_offsets, descriptions: utf-8 descriptions with their offsets
+    """
+    def __init__(self, columns, _mapping=None):
+        for name, _ in COLUMNS:
+            setattr(self, name, columns[name])
+        self._mapping = _mapping
+        self._index = None
+
+    def __len__(self):
+        return len(self.ids)
+
+    @classmethod
+    def _builder(cls):
+        columns = {name: array(code) if code else bytearray() for name, code in COLUMNS}
+        columns["dep_offsets"].append(0)
+        columns["desc_offsets"].append(0)
+        return columns
+
+    @staticmethod
+    def _append(columns, id, description, duration, dependencies, status, scheduled, category):
+        if category not in CATEGORY_CODES:
+            raise ValueError(f"task {id}: unknown category '{category}'")
+        if len(status) != 1 or not status.isascii():
+            raise ValueError(f"task {id}: status must be a single ASCII character")
+        columns["ids"].append(id)
+        columns["durations"].append(duration)
+        columns["scheduled"].append(_scheduled_to_minutes(scheduled))
+        columns["categories"].append(CATEGORY_CODES[category])
+        columns["statuses"].append(ord(status))
+        columns["dep_ids"].extend(dependencies)
+        columns["dep_offsets"].append(len(columns["dep_ids"]))
+        columns["descriptions"] += description.encode("utf-8")
+        columns["desc_offsets"].append(len(columns["descriptions"]))
+
+    @classmethod
+    def from_tasks(cls, tasks):
+        """
+        Build a table from Task objects
+
+        Parameters
+        ----------
+        tasks: list
+          Task objects
+
+        Returns
+        ----------
+        TaskTable
+        """
+        columns = cls._builder()
+        for t in tasks:
+            cls._append(columns, t.id, t.description, t.duration, t.dependencies, t.status, t.scheduled, t.category)
+        return cls(columns)
+
+    @classmethod
+    def from_records(cls, records):
+        """
+        Build a table from dicts in the Task.to_dict() format, without creating Task objects
+
+        Parameters
+        ----------
+        records: iterable
+          dicts with at least id, description and duration
+
+        Returns
+        ----------
+        TaskTable
+        """
+        columns = cls._builder()
+        for r in records:
+            cls._append(columns, r["id"], r["description"], r["duration"], r.get("dependencies", []),
+                        r.get("status", "N"), r.get("scheduled", "25:25"), r.get("category", "Other"))
+        return cls(columns)
+
+    def dependencies(self, i):
+        """Dependency ids of row i"""
+        return list(self.dep_ids[self.dep_offsets[i]:self.dep_offsets[i + 1]])
+
+    def description(self, i):
+        """Description of row i"""
+        return bytes(self.descriptions[self.desc_offsets[i]:self.desc_offsets[i + 1]]).decode("utf-8")
+
+    def row_of(self, id):
+        """Row index of the task with the given id (the index is built on first use)"""
+        if self._index is None:
+            self._index = {task_id: i for i, task_id in enumerate(self.ids)}
+        return self._index[id]
+
+    def flexible_rows(self):
+        """Rows of the tasks without a fixed time"""
+        return [i for i, minutes in enumerate(self.scheduled) if minutes == FLEXIBLE]
+
+    def task(self, i):
+        """Materialize row i as a Task"""
+        return Task(
+            id=self.ids[i],
+            description=self.description(i),
+            duration=self.durations[i],
+            dependencies=self.dependencies(i),
+            status=chr(self.statuses[i]),
+            scheduled=_minutes_to_scheduled(self.scheduled[i]),
+            category=CATEGORIES[self.categories[i]],
+        )
+
+    def to_tasks(self):
+        """Materialize every row as a Task"""
+        return [self.task(i) for i in range(len(self))]
+
+    def records(self):
+        """Yield every row as a dict in the Task.to_dict() format"""
+        for i in range(len(self)):
+            yield {
+                "id": self.ids[i],
+                "description": self.description(i),
+                "duration": self.durations[i],
+                "dependencies": self.dependencies(i),
+                "status": chr(self.statuses[i]),
+                "scheduled": _minutes_to_scheduled(self.scheduled[i]),
+                "category": CATEGORIES[self.categories[i]],
+            }
+
+    def save(self, path):
+        """
+        Write the table in the packed binary format
+
+        Parameters
+        ----------
+        path: str
+          destination file
+        """
+        blobs = []
+        for name, code in COLUMNS:
+            column = getattr(self, name)
+            blobs.append(bytes(column) if not code else (column.tobytes() if isinstance(column, array)
+                                                         else bytes(memoryview(column).cast("B"))))
+        offset = _HEADER.size + _SECTION.size * len(COLUMNS)
+        sections = []
+        for blob in blobs:
+            offset += -offset % 8
+            sections.append((offset, len(blob)))
+            offset += len(blob)
+        with open(path, "wb") as f:
+            f.write(_HEADER.pack(MAGIC, VERSION, sys.byteorder == "little", len(self)))
+            for section in sections:
+                f.write(_SECTION.pack(*section))
+            for (start, _), blob in zip(sections, blobs):
+                f.write(b"\0" * (start - f.tell()))
+                f.write(blob)
+
+    @classmethod
+    def open(cls, path):
+        """
+        Memory-map a file written by save; columns are views into the mapping
+
+        The table keeps the file mapped until close() is called (or the `with` block ends).
+
+        Parameters
+        ----------
+        path: str
+          file written by TaskTable.save
+
+        Returns
+        ----------
+        TaskTable
+        """
+        with open(path, "rb") as f:
+            mapping = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, little, count = _HEADER.unpack_from(mapping, 0)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError(f"{path} is not a task table (version {VERSION})")
+            if little != (sys.byteorder == "little"):
+                raise ValueError(f"{path} was written on a machine with a different byte order")
+            view = memoryview(mapping)
+            columns = {}
+            for i, (name, code) in enumerate(COLUMNS):
+                start, size = _SECTION.unpack_from(mapping, _HEADER.size + i * _SECTION.size)
+                section = view[start:start + size]
+                columns[name] = section.cast(code) if code else section
+        except Exception:
+            mapping.close()
+            raise
+        return cls(columns, _mapping=mapping)
+
+    def close(self):
+        """Release the memory mapping of a table opened with TaskTable.open"""
+        if self._mapping is not None:
+            for name, _ in COLUMNS:
+                column = getattr(self, name)
+                if isinstance(column, memoryview):
+                    column.release()
+                setattr(self, name, None)
+            self._mapping.close()
+            self._mapping = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+
+
+def iter_ndjson(path):
+    """
+    Yield the records of a newline-delimited JSON task file one at a time
+
+    Parameters
+    ----------
+    path: str
+      file with one JSON object per line (blank lines are skipped)
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, 1):
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as e:
+                    raise ValueError(f"{path}:{line_number}: {e}") from None
+
+
+def load_ndjson(path):
+    """Load Task objects from a newline-delimited JSON file"""
+    return [Task.from_dict(record) for record in iter_ndjson(path)]
+
+
+def save_ndjson(tasks, path):
+    """
+    Write tasks as newline-delimited JSON
+
+    Parameters
+    ----------
+    tasks: iterable
+      Task objects (or dicts in the Task.to_dict() format)
+    path: str
+      destination file
+    """
+    with open(path, "w", encoding="utf-8") as f:
+        for task in tasks:
+            record = task if isinstance(task, dict) else task.to_dict()
+            f.write(json.dumps(record, ensure_ascii=False))
+            f.write("\n")
+
+
+def table_from_ndjson(path):
+    """Build a TaskTable straight from a newline-delimited JSON file, without Task objects"""
+    return TaskTable.from_records(iter_ndjson(path))
+
+
+# A dependencies cell: integer ids separated by ";", "," or whitespace (possibly empty)
+_DEPENDENCY_LIST = r"[;,\s]*(?:-?\d+(?:[;,\s]+-?\d+)*)?[;,\s]*"
+
+
+def _dependency_text(value):
+    """Dependencies cell of an uploaded table as text (lists come from JSON, floats from CSV)"""
+    if isinstance(value, list):
+        return " ".join(_dependency_text(v) for v in value)
+    if isinstance(value, float):
+        if value != value:  # NaN
+            return ""
+        return str(int(value)) if value.is_integer() else str(value)
+    return "" if value is None else str(value)
+
+
+def parse_task_frame(frame, existing_ids=()):
+    """
+    Validate and normalize a pandas DataFrame of tasks (e.g. from an uploaded CSV/JSON file)
+
+    All columns are converted and checked at once with vectorized pandas operations.
+    Required columns: id, description, duration. Optional: dependencies (a list or a
+    string of integer ids separated by ";", "," or spaces, such as "3;4"), scheduled ("hh:mm", empty for flexible tasks), category, status.
+
+    Parameters
+    ----------
+    frame: pandas.DataFrame
+      uploaded table
+    existing_ids: iterable
+      ids that are already taken
+
+    Returns
+    ----------
+    tuple (records, errors): dicts in the Task.to_dict() format for the valid rows,
+    and one message per rejected row or missing column
+    """
+    import pandas as pd
+
+    frame = frame.rename(columns=lambda c: str(c).strip().lower())
+    missing = [c for c in ("id", "description", "duration") if c not in frame.columns]
+    if missing:
+        return [], [f"missing column(s): {', '.join(missing)}"]
+    n = len(frame)
+    empty = pd.Series([""] * n, index=frame.index)
+
+    ids = pd.to_numeric(frame["id"], errors="coerce")
+    durations = pd.to_numeric(frame["duration"], errors="coerce")
+    descriptions = frame["description"].fillna("").astype(str).str.strip()
+    scheduled = frame.get("scheduled", empty).fillna("").astype(str).str.strip()
+    scheduled = scheduled.where(scheduled != "", "25:25")
+    categories = frame.get("category", empty).fillna("").astype(str).str.strip().str.capitalize()
+    categories = categories.where(categories != "", "Other")
+    statuses = frame.get("status", empty).fillna("").astype(str).str.strip()
+    statuses = statuses.where(statuses != "", "N")
+    dependency_text = frame.get("dependencies", empty).map(_dependency_text)
+    valid_dependencies = dependency_text.str.fullmatch(_DEPENDENCY_LIST)
+    dependencies = dependency_text.str.findall(r"-?\d+")
+
+    parts = scheduled.str.extract(r"^(\d{1,2}):(\d{2})$").apply(pd.to_numeric, errors="coerce")
+    valid_time = (scheduled == "25:25") | ((parts[0] <= 23) & (parts[1] <= 59))
+    checks = [
+        (ids.isna() | (ids % 1 != 0), "id must be an integer"),
+        (None, "duplicate id"),  # filled in below, from the rows that pass every other check
+        (descriptions == "", "description is empty"),
+        (durations.isna() | (durations % 1 != 0) | (durations < 1), "duration must be a whole number of minutes >= 1"),
+        (~valid_dependencies, "dependencies must be integer task ids separated by ';', ',' or spaces"),
+        (~valid_time, "scheduled must be 'hh:mm' or empty"),
+        (~categories.isin(CATEGORIES), f"category must be one of {', '.join(CATEGORIES)}"),
+        (statuses.str.len() != 1, "status must be a single character"),
+    ]
+    # an id is only taken by a row that is accepted: a rejected row does not make a later one a duplicate
+    rejected = pd.Series(False, index=frame.index)
+    for mask, _ in checks:
+        if mask is not None:
+            rejected |= mask.fillna(True)
+    candidates = ids[~rejected]
+    duplicate = pd.Series(False, index=frame.index)
+    duplicate[~rejected] = candidates.duplicated(keep="first") | candidates.isin(list(existing_ids))
+    checks[1] = (duplicate, "duplicate id")
+
+    bad = pd.Series(False, index=frame.index)
+    errors = []
+    for mask, message in checks:
+        mask = mask.fillna(True) & ~bad
+        errors.extend((position, message) for position in mask.to_numpy().nonzero()[0])
+        bad |= mask
+    errors = [f"row {position + 1}: {message}" for position, message in sorted(errors)]
+
+    keep = ~bad
+    scheduled = scheduled[keep].where(scheduled[keep] == "25:25",
+                                      parts[0][keep].astype("Int64").astype(str).str.zfill(2) + ":" +
+                                      parts[1][keep].astype("Int64").astype(str).str.zfill(2))
+    records = pd.DataFrame({
+        "id": ids[keep].astype(int),
+        "description": descriptions[keep],
+        "duration": durations[keep].astype(int),
+        "dependencies": dependencies[keep].map(lambda found: [int(v) for v in found]),
+        "status": statuses[keep],
+        "scheduled": scheduled,
+        "category": categories[keep],
+    }).to_dict("records")
+    return records, errors
+
+
+def test_task_store():
+    """
+    Tests the NDJSON and memory-mapped table round trips and the rejected
+    cells of uploaded tables
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    import os
+    import tempfile
+    import pandas as pd
+
+    print("Running test cases...")
+    tasks = [
+        Task(id=1, description="Café ☕", duration=15, category="Friends"),
+        Task(id=2, description="Report", duration=90, dependencies=[1], status="D", category="Growth"),
+        Task(id=3, description="Dentist", duration=45, dependencies=[1, 2], scheduled="08:05", category="Routine"),
+        Task(id=2 ** 40, description="", duration=1),
+    ]
+    expected = [task.to_dict() for task in tasks]
+
+    with tempfile.TemporaryDirectory() as directory:
+        print("Test 1: NDJSON round trip")
+        path = os.path.join(directory, "tasks.ndjson")
+        save_ndjson(tasks, path)
+        assert [task.to_dict() for task in load_ndjson(path)] == expected
+        assert list(table_from_ndjson(path).records()) == expected
+
+        print("Test 2: memory-mapped table round trip")
+        path = os.path.join(directory, "tasks.tsks")
+        TaskTable.from_tasks(tasks).save(path)
+        with TaskTable.open(path) as table:
+            assert len(table) == len(tasks)
+            assert list(table.records()) == expected
+            assert [task.to_dict() for task in table.to_tasks()] == expected
+            assert table.flexible_rows() == [0, 1, 3]
+            assert table.row_of(3) == 2 and table.dependencies(2) == [1, 2]
+        assert table.ids is None  # closed with the block
+
+    print("Test 3: rejected cells of an uploaded table")
+    frame = pd.DataFrame({
+        "id": [1, "x", 3, 3, 5, 6, 7, 8, 9, 10, 10, 12, 12, 14],
+        "description": ["Gym", "a", "  ", "Dup of a rejected row", "b", "c", "d", "e", "f", "g", "Dup of a rejected row", "h",
+                        "Dup of an accepted row", "Taken"],
+        "duration": [30, 10, 10, 20, "x", 0, 10, 10, 10, 10, 10, 10, 10, 10],
+        "dependencies": ["", "", "", "1", "", "", "1;x", "", "", "", "", "", "", ""],
+        "scheduled": ["", "", "", "", "", "", "", "25:00", "", "", "", "", "", ""],
+        "category": ["routine", "", "", "", "", "", "", "", "Bogus", "", "", "", "", ""],
+        "status": ["", "", "", "", "", "", "", "", "", "NN", "", "", "", ""],
+    })
+    records, errors = parse_task_frame(frame, existing_ids=[14])
+    assert [record["id"] for record in records] == [1, 3, 10, 12], records
+    assert records[0]["category"] == "Routine" and records[1]["dependencies"] == [1]
+    assert errors == [
+        "row 2: id must be an integer",
+        "row 3: description is empty",
+        "row 5: duration must be a whole number of minutes >= 1",
+        "row 6: duration must be a whole number of minutes >= 1",
+        "row 7: dependencies must be integer task ids separated by ';', ',' or spaces",
+        "row 8: scheduled must be 'hh:mm' or empty",
+        f"row 9: category must be one of {', '.join(CATEGORIES)}",
+        "row 10: status must be a single character",  # so row 11 keeps id 10
+        "row 13: duplicate id",
+        "row 14: duplicate id",
+    ], errors
+    assert parse_task_frame(frame.drop(columns=["duration"])) == ([], ["missing column(s): duration"])
+
+    print("All tests passed!")
+
+
+#test_task_store()
@@ -0,0 +1,237 @@
+"""
+Validation of a task list before it is scheduled
+
+One linear pass over the tasks and their dependency edges finds the inputs
+the schedulers cannot handle:
+    duplicate_id        - several tasks share an id (the first one is kept)
+    missing_dependency  - a dependency id that is not in the task list
+    cycle               - tasks that (transitively) depend on each other
+    blocked_by_cycle    - tasks that depend on a cycle and can never start
+    overlap             - fixed-time tasks whose time slots overlap
+
+Every problem is reported as a diagnostic dict:
+    {"kind": ..., "severity": "error" | "warning", "task_ids": [...], "message": ...}
+"""
+import copy
+
+from SchedulerEngine import to_minutes
+
+ERROR = "error"
+WARNING = "warning"
+
+
+def _diagnostic(kind, severity, task_ids, message):
+    return {"kind": kind, "severity": severity, "task_ids": list(task_ids), "message": message}
+
+
+def find_cycles(graph):
+    """
+    Strongly connected components of a dependency graph that form cycles
+    (Tarjan's algorithm, iterative so deep chains do not hit the recursion limit)
+
+    Parameters
+    ----------
+    graph: dict
+      {task id: list of dependency ids}, every dependency id must be a key
+
+    Returns
+    ----------
+    list of lists of task ids, one list per cycle, in the order they were found
+    """
+    index = {}
+    lowlink = {}
+    on_stack = set()
+    stack = []
+    cycles = []
+    counter = 0
+    for root in graph:
+        if root in index:
+            continue
+        index[root] = lowlink[root] = counter
+        counter += 1
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(graph[root]))]
+        while work:
+            node, edges = work[-1]
+            for dep in edges:
+                if dep not in index:
+                    index[dep] = lowlink[dep] = counter
+                    counter += 1
+                    stack.append(dep)
+                    on_stack.add(dep)
+                    work.append((dep, iter(graph[dep])))
+                    break
+                if dep in on_stack:
+                    lowlink[node] = min(lowlink[node], index[dep])
+            else:
+                # all edges of node are explored
+                work.pop()
+                if work:
+                    parent = work[-1][0]
+                    lowlink[parent] = min(lowlink[parent], lowlink[node])
+                if lowlink[node] == index[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack.discard(member)
+                        component.append(member)
+                        if member == node:
+                            break
+                    if len(component) > 1 or node in graph[node]:
+                        cycles.append(component[::-1])
+    return cycles
+
+
+def validate_tasks(tasks, prune=False):
+    """
+    Check a task list for duplicate ids, missing dependencies, dependency cycles
+    and overlapping fixed-time tasks
+
+    Parameters
+    ----------
+    tasks: list
+      Task objects
+    prune: bool
+      drop the tasks that cannot be scheduled (duplicates, cycles and the tasks
+      blocked by them) and strip missing ids from the dependency lists,
+      so the result is safe to hand to a scheduler. Overlaps are only reported.
+      The given tasks are not changed: a task whose dependencies are stripped
+      is replaced by a copy in the result.
+
+    Returns
+    ----------
+    tuple (tasks, diagnostics)
+      the pruned task list (the original list when prune is False) and the
+      list of diagnostic dicts
+    """
+    diagnostics = []
+
+    # duplicate ids: the first task with an id wins
+    by_id = {}
+    duplicates = []
+    for task in tasks:
+        if task.id in by_id:
+            duplicates.append(task)
+        else:
+            by_id[task.id] = task
+    for task in duplicates:
+        diagnostics.append(_diagnostic("duplicate_id", ERROR, [task.id],
+                                       f"task '{task.description}' reuses id {task.id}"))
+
+    # dangling dependency ids
+    graph = {}
+    for task_id, task in by_id.items():
+        known = []
+        for dep in task.dependencies:
+            if dep in by_id:
+                known.append(dep)
+            else:
+                diagnostics.append(_diagnostic("missing_dependency", ERROR, [task_id, dep],
+                                               f"task {task_id} depends on unknown task {dep}"))
+        graph[task_id] = known
+
+    # cycles, and every task that transitively depends on one
+    cycles = find_cycles(graph)
+    blocked = set()
+    if cycles:
+        dependants = {task_id: [] for task_id in graph}
+        for task_id, deps in graph.items():
+            for dep in deps:
+                dependants[dep].append(task_id)
+        frontier = []
+        for cycle in cycles:
+            diagnostics.append(_diagnostic("cycle", ERROR, cycle,
+                                           "dependency cycle " + " -> ".join(map(str, cycle + cycle[:1]))))
+            blocked.update(cycle)
+            frontier.extend(cycle)
+        in_cycle = set(blocked)
+        while frontier:
+            for dependant in dependants[frontier.pop()]:
+                if dependant not in blocked:
+                    blocked.add(dependant)
+                    frontier.append(dependant)
+        for task_id in by_id:
+            if task_id in blocked and task_id not in in_cycle:
+                diagnostics.append(_diagnostic("blocked_by_cycle", ERROR, [task_id],
+                                               f"task {task_id} depends on a dependency cycle"))
+
+    # overlapping fixed-time tasks (sweep over the anchors sorted by start)
+    anchors = sorted(((to_minutes(task.scheduled), task) for task in by_id.values() if task.scheduled != "25:25"),
+                     key=lambda anchor: anchor[0])
+    latest = None  # the anchor that ends last so far
+    for start, task in anchors:
+        if latest is not None and start < latest[0] + latest[1].duration:
+            other = latest[1]
+            diagnostics.append(_diagnostic("overlap", WARNING, [other.id, task.id],
+                                           f"task {task.id} at {task.scheduled} overlaps task {other.id} "
+                                           f"at {other.scheduled} ({other.duration} min)"))
+        if latest is None or start + task.duration > latest[0] + latest[1].duration:
+            latest = (start, task)
+
+    if not prune:
+        return tasks, diagnostics
+    valid = []
+    for task_id, task in by_id.items():
+        if task_id in blocked:
+            continue
+        if len(graph[task_id]) != len(task.dependencies):
+            task = copy.copy(task)
+            task.dependencies = graph[task_id]
+        valid.append(task)
+    return valid, diagnostics
+
+
+def has_errors(diagnostics):
+    """True if any diagnostic is an error (and not just a warning)"""
+    return any(d["severity"] == ERROR for d in diagnostics)
+
+
+def test_validate_tasks():
+    """
+    Tests every kind of diagnostic, and that pruning leaves the given tasks unchanged
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+
+    print("Running test cases...")
+    tasks = [
+        Task(id=1, description="Call", duration=10, dependencies=[9]),        # 9 does not exist
+        Task(id=2, description="Plan", duration=20, dependencies=[3]),
+        Task(id=3, description="Budget", duration=20, dependencies=[2]),      # 2 <-> 3
+        Task(id=4, description="Book", duration=30, dependencies=[3, 1]),     # behind the cycle
+        Task(id=1, description="Again", duration=15),                         # reuses id 1
+        Task(id=5, description="Meeting", duration=60, scheduled="09:00"),
+        Task(id=6, description="Lunch", duration=30, scheduled="09:30"),      # during the meeting
+        Task(id=7, description="Walk", duration=30, scheduled="10:00", dependencies=[1]),
+    ]
+    before = [(task.id, list(task.dependencies)) for task in tasks]
+
+    print("Test 1: one diagnostic per problem")
+    _, diagnostics = validate_tasks(tasks)
+    found = sorted((d["kind"], tuple(d["task_ids"])) for d in diagnostics)
+    assert found == [("blocked_by_cycle", (4,)), ("cycle", (2, 3)), ("duplicate_id", (1,)),
+                     ("missing_dependency", (1, 9)), ("overlap", (5, 6))], found
+    assert has_errors(diagnostics)
+    assert not has_errors([d for d in diagnostics if d["kind"] == "overlap"])
+
+    print("Test 2: pruning drops cycles, blocked tasks and duplicates")
+    valid, _ = validate_tasks(tasks, prune=True)
+    assert [task.id for task in valid] == [1, 5, 6, 7]
+    assert valid[0].dependencies == [] and valid[0] is not tasks[0]  # a copy without the missing id
+    assert valid[3] is tasks[7]                                      # nothing to strip: the same task
+
+    print("Test 3: the given tasks are unchanged")
+    assert [(task.id, list(task.dependencies)) for task in tasks] == before
+
+    print("All tests passed!")
+
+
+#test_validate_tasks()
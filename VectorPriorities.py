@@ -0,0 +1,244 @@
+"""
+NumPy priority computation over a columnar task set
+
+Computes the staged priority rules of PriorityModel (the DP scheduler's) as
+array operations: the time and category terms are one expression over the
+columns, and the dependency boost is pushed from dependants to prerequisites
+one topological level at a time, each level being a single scatter-max.
+
+Only imported when vectorized priorities are asked for, so the schedulers
+themselves do not need NumPy.
+"""
+import numpy as np
+
+from TaskClass import CATEGORIES
+from TaskStore import FLEXIBLE as FLEXIBLE_MINUTES
+from SchedulerEngine import to_minutes
+
+
+def _dependency_edges(ids, dep_offsets, dep_ids):
+    """
+    Dependency edges as row indexes, sorted by dependant
+
+    Returns
+    ----------
+    tuple (dependant rows, prerequisite rows); dependency ids that are not in ids are ignored
+    """
+    n = len(ids)
+    dependants = np.repeat(np.arange(n), np.diff(dep_offsets))
+    if not n or not dep_ids.size:
+        return dependants[:0], dependants[:0]
+    low, high = ids.min(), ids.max()
+    if low >= 0 and high < 4 * n:
+        # dense ids (the usual 0..n-1 or 1..n): a direct id -> row table
+        row_of = np.full(high + 1, -1, dtype=np.int64)
+        row_of[ids[::-1]] = np.arange(n - 1, -1, -1)  # the first row wins for a repeated id
+        inside = (dep_ids >= 0) & (dep_ids <= high)
+        rows = np.where(inside, row_of[np.where(inside, dep_ids, 0)], -1)
+        known = rows >= 0
+        return dependants[known], rows[known]
+    order = np.argsort(ids, kind="stable")
+    sorted_ids = ids[order]
+    positions = np.searchsorted(sorted_ids, dep_ids)
+    positions[positions == n] = 0
+    known = sorted_ids[positions] == dep_ids
+    return dependants[known], order[positions[known]]
+
+
+def topological_levels(ids, dep_offsets, dep_ids):
+    """
+    Rows grouped by height in the dependency graph: level 0 holds the tasks nobody
+    depends on, level k the tasks whose dependants are all in the levels before it
+
+    Parameters
+    ----------
+    ids: array
+      task id per row
+    dep_offsets, dep_ids: arrays
+      dependency ids in compressed sparse row form (see TaskStore.TaskTable)
+
+    Returns
+    ----------
+    tuple (levels, dependants, prerequisites, level_offsets)
+      levels - list of row arrays
+      dependants, prerequisites - edge arrays, sorted by the level of the dependant
+      level_offsets - the edges leaving level k are level_offsets[k]:level_offsets[k + 1]
+
+    Raises
+    ----------
+    ValueError if the dependency graph has a cycle
+    """
+    ids = np.asarray(ids, dtype=np.int64)
+    n = len(ids)
+    dependants, prerequisites = _dependency_edges(ids, np.asarray(dep_offsets, dtype=np.int64),
+                                                  np.asarray(dep_ids, dtype=np.int64))
+    edge_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.bincount(dependants, minlength=n), out=edge_offsets[1:])
+    remaining = np.bincount(prerequisites, minlength=n)  # dependants not placed yet
+    levels = []
+    frontier = np.flatnonzero(remaining == 0)
+    placed = 0
+    while frontier.size:
+        levels.append(frontier)
+        placed += frontier.size
+        edges = _edges_of(frontier, edge_offsets)
+        if not edges.size:
+            break
+        targets = prerequisites[edges]
+        np.subtract.at(remaining, targets, 1)
+        frontier = np.unique(targets[remaining[targets] == 0])
+    if placed != n:
+        raise ValueError("the dependency graph has a cycle")
+    height = np.empty(n, dtype=np.int64)
+    for k, level in enumerate(levels):
+        height[level] = k
+    edge_levels = height[dependants]
+    order = np.argsort(edge_levels, kind="stable")
+    level_offsets = np.searchsorted(edge_levels[order], np.arange(len(levels) + 1))
+    return levels, dependants[order], prerequisites[order], level_offsets
+
+
+def _edges_of(rows, edge_offsets):
+    """Indexes of all the edges of the given rows"""
+    starts = edge_offsets[rows]
+    lengths = edge_offsets[rows + 1] - starts
+    total = int(lengths.sum())
+    if not total:
+        return np.zeros(0, dtype=np.int64)
+    # start of every row's run, repeated over the run, plus the position inside the run
+    return np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(total)
+
+
+def staged_priorities(ids, scheduled, categories, dep_offsets, dep_ids, weights,
+                      time_unit=1, prerequisite_bonus=100, step=100):
+    """
+    Priorities of the staged PriorityModel rules, without the random tie-break
+
+    priority = time term + category weight + prerequisite bonus, then raised to at
+    least (priority of every dependant) + step, level by level from the tasks nobody
+    depends on down to the ones everything depends on
+
+    Parameters
+    ----------
+    ids, scheduled, categories: arrays
+      task id, scheduled minutes (FLEXIBLE_MINUTES for flexible tasks) and category code per row
+    dep_offsets, dep_ids: arrays
+      dependency ids in compressed sparse row form
+    weights: sequence
+      category weight vector (see SchedulerEngine.category_weights)
+    time_unit, prerequisite_bonus, step: int
+      as in PriorityModel
+
+    Returns
+    ----------
+    numpy array of the priorities, one per row
+    """
+    scheduled = np.asarray(scheduled, dtype=np.int64)
+    weights = np.asarray(weights)
+    categories = np.asarray(categories, dtype=np.int64)
+    categories = np.where((categories >= 0) & (categories < len(weights)), categories, len(CATEGORIES))
+    levels, dependants, prerequisites, level_offsets = topological_levels(ids, dep_offsets, dep_ids)
+
+    priorities = np.where(scheduled != FLEXIBLE_MINUTES, (24 * 60 - scheduled) * time_unit, 0)
+    priorities = priorities + weights[categories]
+    if prerequisite_bonus:
+        has_dependants = np.zeros(len(scheduled), dtype=bool)
+        has_dependants[prerequisites] = True
+        priorities = priorities + has_dependants * prerequisite_bonus
+    # every level only receives from the levels before it, so its priorities are final when it pushes
+    for start, end in zip(level_offsets[:-1].tolist(), level_offsets[1:].tolist()):
+        if start < end:
+            np.maximum.at(priorities, prerequisites[start:end], priorities[dependants[start:end]] + step)
+    return priorities
+
+
+def table_priorities(table, weights, time_unit=1, prerequisite_bonus=100, step=100):
+    """
+    staged_priorities over the columns of a TaskStore.TaskTable (read in place)
+
+    Returns
+    ----------
+    numpy array of the priorities, one per row
+    """
+    return staged_priorities(
+        np.asarray(table.ids), np.asarray(table.scheduled), np.asarray(table.categories),
+        np.asarray(table.dep_offsets), np.asarray(table.dep_ids), weights,
+        time_unit, prerequisite_bonus, step)
+
+
+def task_priorities(tasks, weights, time_unit=1, prerequisite_bonus=100, step=100):
+    """
+    staged_priorities of Task objects
+
+    Returns
+    ----------
+    numpy array of the priorities, in the order of tasks
+    """
+    n = len(tasks)
+    ids = np.fromiter((task.id for task in tasks), dtype=np.int64, count=n)
+    scheduled = np.fromiter((FLEXIBLE_MINUTES if task.scheduled == "25:25" else to_minutes(task.scheduled)
+                             for task in tasks), dtype=np.int64, count=n)
+    categories = np.fromiter((task.category_code for task in tasks), dtype=np.int64, count=n)
+    dep_offsets = np.zeros(n + 1, dtype=np.int64)
+    np.cumsum(np.fromiter((len(task.dependencies) for task in tasks), dtype=np.int64, count=n),
+              out=dep_offsets[1:])
+    dep_ids = np.fromiter((dep for task in tasks for dep in task.dependencies), dtype=np.int64,
+                          count=int(dep_offsets[-1]))
+    return staged_priorities(ids, scheduled, categories, dep_offsets, dep_ids, weights,
+                             time_unit, prerequisite_bonus, step)
+
+
+def test_task_priorities():
+    """
+    Tests that the NumPy priorities equal the ones PriorityModel.assign computes
+    in Python, on a small DAG with float weights and an unknown category
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    from TaskClass import Task
+    from Instrumentation import make_stats
+    from SchedulerEngine import PriorityModel, category_weights
+
+    print("Running test cases...")
+    weights = category_weights({"Family": 12.5, "Hobby": 0.25, "Growth": 7.75})
+
+    def make_tasks():
+        return [
+            Task(id=1, description="Pack", duration=30, category="Family"),
+            Task(id=2, description="Tickets", duration=15, dependencies=[1], category="Hobby"),
+            Task(id=3, description="Passport", duration=20, dependencies=[1], category="Growth"),
+            Task(id=4, description="Train", duration=60, dependencies=[2, 3], scheduled="14:30"),
+            Task(id=5, description="Call", duration=10, dependencies=[4, 99], category="Chores"),  # 99 is unknown
+            Task(id=6, description="Read", duration=45, scheduled="08:15", category="Chores"),
+            Task(id=7, description="Water plants", duration=5, dependencies=[6, 1]),
+        ]
+
+    print("Test 1: the same priorities as in Python")
+    for time_unit, bonus, step in ((1, 100, 100), (60, 0, 100), (1, 100, 0.5)):
+        model = PriorityModel(time_unit=time_unit, staged=True, prerequisite_bonus=bonus, step=step,
+                              vector_min_tasks=None)
+        tasks = make_tasks()
+        model.assign(tasks, {task.id: task for task in tasks}, make_stats(False), weights)
+        expected = [task.priority for task in tasks]
+        got = task_priorities(make_tasks(), weights, time_unit, bonus, step).tolist()
+        assert got == expected, (time_unit, bonus, step, got, expected)
+
+    print("Test 2: a cycle is rejected")
+    tasks = make_tasks()
+    tasks[0].dependencies = [7]
+    try:
+        task_priorities(tasks, weights)
+        raise AssertionError("accepted a dependency cycle")
+    except ValueError:
+        pass
+
+    print("All tests passed!")
+
+
+#test_task_priorities()
@@ -1,9 +1,12 @@
 import streamlit as st
 import pandas as pd
-from TaskClass import Task
+from TaskClass import Task, CATEGORIES
 from TaskSchedulerClass import TaskScheduler
 from ImprovedGreedy_Scheduler import ImprovedGreedy_Scheduler
 from DP_Scheduling import DP_Scheduler
+from TaskStore import parse_task_frame
+from SchedulerEngine import CATEGORY_VALUE, add_minutes, schedule_entries
+from ScheduleExport import schedule_to_csv, schedule_to_json, schedule_to_ical
 from datetime import datetime
 import io
 import sys
@@ -65,6 +68,8 @@ if 'form_key' not in st.session_state:
     st.session_state.form_key = 0
 if 'task_description_value' not in st.session_state:
     st.session_state.task_description_value = ""
+if 'upload_key' not in st.session_state:
+    st.session_state.upload_key = 0
 
 def create_task(id, description, duration, dependencies, scheduled, category):
     """Create a Task object"""
@@ -211,6 +216,41 @@ with st.sidebar:
     
     st.divider()
     
+    # Bulk upload of tasks from a file
+    with st.expander("📤 Bulk Upload"):
+        uploaded_file = st.file_uploader(
+            "Upload tasks (CSV or JSON)",
+            type=["csv", "json", "jsonl", "ndjson"],
+            help="Columns: id, description, duration, dependencies (e.g. 1;2), scheduled (HH:MM or empty), category",
+            key=f"upload_{st.session_state.upload_key}"
+        )
+        if uploaded_file is not None:
+            name = uploaded_file.name.lower()
+            try:
+                if name.endswith(".csv"):
+                    frame = pd.read_csv(uploaded_file, dtype=str)
+                else:
+                    frame = pd.read_json(uploaded_file, lines=not name.endswith(".json"), dtype=False)
+                records, errors = parse_task_frame(frame, existing_ids=[t['id'] for t in st.session_state.tasks])
+            except ValueError as e:
+                records, errors = [], [f"Could not read the file: {e}"]
+            
+            if errors:
+                st.warning(f"{len(errors)} problem(s) found, these rows will be skipped:\n\n" + "\n\n".join(errors[:20]))
+            if records and st.button(f"Import {len(records)} task(s)", key=f"import_{st.session_state.upload_key}"):
+                for record in records:
+                    record.pop('status', None)
+                st.session_state.tasks.extend(records)
+                st.session_state.task_message = {
+                    "type": "success",
+                    "text": f"Imported {len(records)} task(s) from {uploaded_file.name}"
+                }
+                # Increment uploader key to clear the uploaded file
+                st.session_state.upload_key += 1
+                st.rerun()
+    
+    st.divider()
+    
     # Clear all tasks
     if st.button("🗑️ Clear All Tasks", type="secondary"):
         st.session_state.tasks = []
@@ -281,6 +321,15 @@ with col2:
         if starting_time:
             st.error("Invalid time format. Use HH:MM (24-hour format)")
     
+    # Personal importance of the categories, used for the priorities of all three schedulers
+    with st.expander("⚖️ Category Importance"):
+        category_value = {
+            category: st.number_input(category, min_value=0, max_value=100,
+                                      value=CATEGORY_VALUE[category], step=5,
+                                      key=f"category_value_{category}")
+            for category in CATEGORIES
+        }
+    
     st.divider()
     
     # Generate schedule button
@@ -306,14 +355,15 @@ with col2:
                     try:
                         old_stdout = sys.stdout
                         sys.stdout = captured_output = io.StringIO()
-                        scheduler1 = TaskScheduler(task_objects.copy())
+                        scheduler1 = TaskScheduler(task_objects.copy(), category_value=category_value)
                         efficiency1 = scheduler1.run_task_scheduler(starting_time)
                         sys.stdout = old_stdout
                         output1 = captured_output.getvalue()
                         st.session_state.schedules['simple'] = {
                             'output': output1,
                             'efficiency': efficiency1,
-                            'name': 'Simple Priority Scheduler'
+                            'name': 'Simple Priority Scheduler',
+                            'entries': schedule_entries(scheduler1.schedule)
                         }
                     except Exception as e:
                         st.session_state.schedules['simple'] = {
@@ -326,14 +376,15 @@ with col2:
                     try:
                         old_stdout = sys.stdout
                         sys.stdout = captured_output = io.StringIO()
-                        scheduler2 = ImprovedGreedy_Scheduler(task_objects.copy())
+                        scheduler2 = ImprovedGreedy_Scheduler(task_objects.copy(), category_value=category_value)
                         efficiency2 = scheduler2.run_task_scheduler(starting_time)
                         sys.stdout = old_stdout
                         output2 = captured_output.getvalue()
                         st.session_state.schedules['improved'] = {
                             'output': output2,
                             'efficiency': efficiency2,
-                            'name': 'Improved Greedy Scheduler'
+                            'name': 'Improved Greedy Scheduler',
+                            'entries': schedule_entries(scheduler2.schedule)
                         }
                     except Exception as e:
                         st.session_state.schedules['improved'] = {
@@ -346,7 +397,7 @@ with col2:
                     try:
                         old_stdout = sys.stdout
                         sys.stdout = captured_output = io.StringIO()
-                        scheduler3 = DP_Scheduler(task_objects.copy())
+                        scheduler3 = DP_Scheduler(task_objects.copy(), category_value=category_value)
                         schedule_list = scheduler3.schedule_tasks(starting_time)
                         scheduler3.print_schedule()
                         sys.stdout = old_stdout
@@ -356,7 +407,7 @@ with col2:
                         if schedule_list:
                             total_duration = sum(task.duration for task, _ in schedule_list)
                             first_start = schedule_list[0][1]
-                            last_end_time = scheduler3._add_minutes(
+                            last_end_time = add_minutes(
                                 schedule_list[-1][1],
                                 schedule_list[-1][0].duration
                             )
@@ -369,7 +420,8 @@ with col2:
                             'output': output3,
                             'efficiency': efficiency3,
                             'name': 'DP-Based Scheduler',
-                            'schedule_list': schedule_list
+                            'schedule_list': schedule_list,
+                            'entries': schedule_entries(scheduler3.schedule)
                         }
                     except Exception as e:
                         st.session_state.schedules['dp'] = {
@@ -523,13 +575,43 @@ if any(st.session_state.schedules[key]['output'] for key in st.session_state.sch
                 else:
                     st.text(line)
         
-        # Download button for selected schedule
-        st.download_button(
-            label="📥 Download Selected Schedule as Text",
-            data=st.session_state.schedules[selected]['output'],
-            file_name=f"schedule_{selected}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.txt",
-            mime="text/plain"
-        )
+        # Download buttons for selected schedule
+        file_stem = f"schedule_{selected}_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        entries = st.session_state.schedules[selected].get('entries', [])
+        col_txt, col_csv, col_json, col_ics = st.columns(4)
+        with col_txt:
+            st.download_button(
+                label="📥 Text",
+                data=st.session_state.schedules[selected]['output'],
+                file_name=f"{file_stem}.txt",
+                mime="text/plain"
+            )
+        with col_csv:
+            st.download_button(
+                label="📥 CSV",
+                data=schedule_to_csv(entries),
+                file_name=f"{file_stem}.csv",
+                mime="text/csv"
+            )
+        with col_json:
+            st.download_button(
+                label="📥 JSON",
+                data=schedule_to_json(
+                    entries,
+                    algorithm=st.session_state.schedules[selected]['name'],
+                    efficiency=st.session_state.schedules[selected]['efficiency'],
+                    starting_time=starting_time
+                ),
+                file_name=f"{file_stem}.json",
+                mime="application/json"
+            )
+        with col_ics:
+            st.download_button(
+                label="📅 Calendar",
+                data=schedule_to_ical(entries),
+                file_name=f"{file_stem}.ics",
+                mime="text/calendar"
+            )
     else:
         st.info("👆 Select a schedule from the tabs above to see it displayed here and download it.")
 
@@ -0,0 +1,1480 @@
+import argparse
+import copy
+import cProfile
+import gc
+import json
+import math
+import multiprocessing
+import os
+import platform
+import pstats
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+from figures import generate_tasks, STARTING_TIME, END_TIME, MAX_AVAILABLE_MINUTES, MAX_TASK_DURATION
+from TaskSchedulerClass import TaskScheduler
+from ImprovedGreedy_Scheduler import ImprovedGreedy_Scheduler
+from DP_Scheduling import DP_Scheduler
+from KnapSack import knapsack_01
+from TaskClass import Task
+
+# Algorithms covered by the suite. The scheduler names match the ones used in figures.py
+ALGORITHMS = ['TaskScheduler', 'ImprovedGreedy', 'DP', 'Knapsack']
+
+DEFAULT_SIZES = [25, 50, 100, 200]
+DEFAULT_WARMUP = 1
+DEFAULT_REPETITIONS = 7
+DEFAULT_SEED = 2024
+DEFAULT_THRESHOLD = 0.25
+DEFAULT_MIN_DELTA_MS = 0.1
+# Cheap configuration used by the regression gate when no baseline settings are available
+GATE_SIZES = [25, 50, 100]
+GATE_MIXES = [(0, 0), (0.5, 0.1), (0.5, 0.5)]
+RESULTS_VERSION = 1
+DEFAULT_TOP_HOTSPOTS = 15
+# Cold start of `python -m SchedulerCLI`: allowed milliseconds on top of a bare interpreter,
+# and modules that a single-day scheduling command must not import
+STARTUP_BUDGET_MS = 150
+STARTUP_TASKS = 50
+HEAVY_MODULES = ('numpy', 'pandas', 'matplotlib', 'streamlit')
+# Task counts of the priority setup comparison
+PRIORITY_SIZES = [1000, 10000, 100000]
+# Heap sizes of the `heaps` throughput benchmark
+HEAP_SIZES = [1000, 10000, 100000]
+# Keys removed from the ready set per size (at most half of them) in the `heaps` benchmark
+HEAP_REMOVALS = 2000
+# Fitted exponents above 2 + SUPER_QUADRATIC_TOLERANCE are flagged as super-quadratic
+SUPER_QUADRATIC_TOLERANCE = 0.25
+
+# Knapsack cases draw their capacity from [KNAPSACK_MIN_CAPACITY, MAX_AVAILABLE_MINUTES],
+# so that O(n·C) can be told apart from O(n)
+KNAPSACK_MIN_CAPACITY = MAX_AVAILABLE_MINUTES // 4
+
+# Reference complexity models: name -> f(n, capacity)
+COMPLEXITY_MODELS = {
+    'O(n)': lambda n, c: n,
+    'O(n log n)': lambda n, c: n * math.log2(n) if n > 1 else 0.0,
+    'O(n²)': lambda n, c: n ** 2,
+    'O(n³)': lambda n, c: n ** 3,
+    'O(n·C)': lambda n, c: n * c,
+}
+
+# Two-sided 95% Student t critical values by degrees of freedom (normal approximation above 30)
+T_CRITICAL_95 = {
+    1: 12.706, 2: 4.303, 3: 3.182, 4: 2.776, 5: 2.571, 6: 2.447, 7: 2.365, 8: 2.306,
+    9: 2.262, 10: 2.228, 11: 2.201, 12: 2.179, 13: 2.160, 14: 2.145, 15: 2.131,
+    16: 2.120, 17: 2.110, 18: 2.101, 19: 2.093, 20: 2.086, 21: 2.080, 22: 2.074,
+    23: 2.069, 24: 2.064, 25: 2.060, 26: 2.056, 27: 2.052, 28: 2.048, 29: 2.045, 30: 2.042,
+}
+
+
+class _NullWriter:
+    """File-like sink used to silence the schedulers' progress output"""
+    def write(self, text):
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def case_seed(seed, algorithm, size, scheduled_percentage, dependency_percentage):
+    """
+    Derive a stable per-case seed so that every commit benchmarks identical workloads
+
+    Parameters:
+    -----------
+    seed: int
+        Base seed of the benchmark run
+    algorithm: str
+        Algorithm name
+    size: int
+        Number of tasks (or knapsack items)
+    scheduled_percentage: float
+        Percentage of scheduled tasks (0-1)
+    dependency_percentage: float
+        Percentage of tasks with dependencies (0-1)
+
+    Returns:
+    --------
+    int: Seed for the case
+    """
+    key = f"{seed}:{algorithm}:{size}:{scheduled_percentage}:{dependency_percentage}"
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def make_workload(algorithm, size, scheduled_percentage=0, dependency_percentage=0, seed=DEFAULT_SEED):
+    """
+    Build the input of one benchmark case
+
+    Scheduler cases use figures.generate_tasks and always have the full day as
+    capacity; knapsack cases use random items with the same durations as generated
+    tasks and a capacity drawn per case (see KNAPSACK_MIN_CAPACITY).
+
+    Parameters:
+    -----------
+    algorithm: str
+        One of ALGORITHMS
+    size: int
+        Number of tasks (or knapsack items)
+    scheduled_percentage: float
+        Percentage of scheduled tasks (0-1)
+    dependency_percentage: float
+        Percentage of tasks with dependencies (0-1)
+    seed: int
+        Base seed of the benchmark run
+
+    Returns:
+    --------
+    dict: Workload description with the generated input
+    """
+    capacity = MAX_AVAILABLE_MINUTES
+    state = random.getstate()
+    random.seed(case_seed(seed, algorithm, size, scheduled_percentage, dependency_percentage))
+    try:
+        if algorithm == 'Knapsack':
+            weights = [random.randint(1, MAX_TASK_DURATION) for _ in range(size)]
+            values = [random.randint(0, 200) + random.random() for _ in range(size)]
+            capacity = random.randint(KNAPSACK_MIN_CAPACITY, MAX_AVAILABLE_MINUTES)
+            data = (weights, values, capacity)
+        else:
+            data = generate_tasks(size, scheduled_percentage, dependency_percentage)
+    finally:
+        random.setstate(state)
+    return {
+        'algorithm': algorithm,
+        'size': size,
+        'scheduled_percentage': scheduled_percentage,
+        'dependency_percentage': dependency_percentage,
+        'capacity': capacity,
+        'data': data,
+    }
+
+
+def _prepare(workload):
+    """Return a fresh callable for one run of the workload (copying happens outside the timed region)"""
+    algorithm = workload['algorithm']
+    if algorithm == 'Knapsack':
+        weights, values, capacity = workload['data']
+        return lambda: knapsack_01(weights, values, capacity)
+    tasks = copy.deepcopy(workload['data'])
+    if algorithm == 'TaskScheduler':
+        scheduler = TaskScheduler(tasks)
+        return lambda: scheduler.run_task_scheduler(STARTING_TIME)
+    if algorithm == 'ImprovedGreedy':
+        scheduler = ImprovedGreedy_Scheduler(tasks)
+        return lambda: scheduler.run_task_scheduler(STARTING_TIME)
+    if algorithm == 'DP':
+        scheduler = DP_Scheduler(tasks)
+        return lambda: scheduler.schedule_tasks(STARTING_TIME, END_TIME)
+    raise ValueError(f"Unknown algorithm '{algorithm}'")
+
+
+def time_once(workload):
+    """
+    Time a single run of the workload with the scheduler output silenced
+
+    Parameters:
+    -----------
+    workload: dict
+        Workload built by make_workload
+
+    Returns:
+    --------
+    float: Execution time in seconds
+    """
+    run = _prepare(workload)
+    old_stdout = sys.stdout
+    sys.stdout = _NullWriter()
+    try:
+        gc.collect()
+        start = time.perf_counter()
+        run()
+        return time.perf_counter() - start
+    finally:
+        sys.stdout = old_stdout
+
+
+class StackCollector:
+    """
+    Deterministic call-stack recorder producing collapsed stacks for flamegraph tools
+
+    Every profiler event attributes the time elapsed since the previous event to the
+    stack that was active, so each line of the output is "frame;frame;frame <microseconds>"
+    of self time, the format read by flamegraph.pl, speedscope and inferno.
+    """
+    def __init__(self):
+        self.stack = []
+        self.totals = {}
+        self.last = 0.0
+
+    @staticmethod
+    def frame_name(frame):
+        """Module and qualified name of the function running in the frame"""
+        code = frame.f_code
+        module = os.path.splitext(os.path.basename(code.co_filename))[0]
+        return f"{module}:{getattr(code, 'co_qualname', code.co_name)}"
+
+    def _event(self, frame, event, arg):
+        now = time.perf_counter()
+        if self.stack:
+            key = tuple(self.stack)
+            self.totals[key] = self.totals.get(key, 0.0) + (now - self.last)
+        if event == 'call':
+            self.stack.append(self.frame_name(frame))
+        elif event == 'c_call':
+            self.stack.append(f"builtins:{getattr(arg, '__qualname__', repr(arg))}")
+        elif event in ('return', 'c_return', 'c_exception') and self.stack:
+            self.stack.pop()
+        self.last = time.perf_counter()
+
+    def run(self, function):
+        """Call function() while recording its stacks"""
+        self.last = time.perf_counter()
+        sys.setprofile(self._event)
+        try:
+            return function()
+        finally:
+            sys.setprofile(None)
+
+    def save(self, path):
+        """Write the collapsed stacks, one line per distinct stack"""
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, seconds in sorted(self.totals.items()):
+                microseconds = int(round(seconds * 1e6))
+                if microseconds > 0:
+                    f.write(f"{';'.join(stack)} {microseconds}\n")
+
+
+def profile_name(workload):
+    """File name stem of the profile of one case"""
+    return (f"{workload['algorithm']}_n{workload['size']}"
+            f"_s{workload['scheduled_percentage']:g}_d{workload['dependency_percentage']:g}")
+
+
+def hotspots(stats, top=DEFAULT_TOP_HOTSPOTS):
+    """
+    Functions with the highest own time in a cProfile run
+
+    Parameters:
+    -----------
+    stats: pstats.Stats
+        Loaded profile
+    top: int
+        Number of functions to return
+
+    Returns:
+    --------
+    list: Dicts with function name, call count, own time and cumulative time in seconds
+    """
+    rows = []
+    for (filename, line, name), (_, calls, tottime, cumtime, _) in stats.stats.items():
+        module = os.path.splitext(os.path.basename(filename))[0]
+        function = f"{module}:{name}" if filename != '~' else name
+        rows.append({'function': function, 'line': line, 'calls': calls, 'tottime': tottime, 'cumtime': cumtime})
+    rows.sort(key=lambda row: row['tottime'], reverse=True)
+    return rows[:top]
+
+
+def profile_once(workload, directory, collapsed=False, top=DEFAULT_TOP_HOTSPOTS):
+    """
+    Run the workload once under cProfile (and optionally the stack collector)
+    and save the profile files in the directory
+
+    Parameters:
+    -----------
+    workload: dict
+        Workload built by make_workload
+    directory: str
+        Where the .prof (and .collapsed) files are written
+    collapsed: bool
+        Also record collapsed stacks for flamegraphs (a separate, slower run)
+    top: int
+        Number of hotspots kept in the results
+
+    Returns:
+    --------
+    dict: Paths of the saved files and the top hotspots
+    """
+    os.makedirs(directory, exist_ok=True)
+    stem = os.path.join(directory, profile_name(workload))
+    old_stdout = sys.stdout
+    try:
+        run = _prepare(workload)
+        sys.stdout = _NullWriter()
+        profiler = cProfile.Profile()
+        profiler.runcall(run)
+        sys.stdout = old_stdout
+        profiler.dump_stats(stem + '.prof')
+        profile = {'file': stem + '.prof',
+                   'hotspots': hotspots(pstats.Stats(profiler), top)}
+        if collapsed:
+            run = _prepare(workload)
+            sys.stdout = _NullWriter()
+            collector = StackCollector()
+            collector.run(run)
+            sys.stdout = old_stdout
+            collector.save(stem + '.collapsed')
+            profile['collapsed'] = stem + '.collapsed'
+    finally:
+        sys.stdout = old_stdout
+    return profile
+
+
+def peak_rss_bytes():
+    """High-water mark of the resident set size of this process, or None if unknown"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure_memory(workload):
+    """Memory of one run, executed in a fresh worker process (see memory_once)"""
+    run = _prepare(workload)
+    old_stdout = sys.stdout
+    sys.stdout = _NullWriter()
+    try:
+        gc.collect()
+        rss_before = peak_rss_bytes()
+        tracemalloc.start()
+        try:
+            run()
+            current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        rss_after = peak_rss_bytes()
+    finally:
+        sys.stdout = old_stdout
+    return {
+        'tracemalloc_peak': peak,
+        'tracemalloc_retained': current,
+        'rss_peak': rss_after,
+        'rss_growth': rss_after - rss_before if rss_after is not None else None,
+    }
+
+
+def memory_once(workload):
+    """
+    Measure the memory of one run of the workload
+
+    The run happens in a fresh spawned process so that the peak RSS belongs to this case
+    only (the RSS high-water mark of a long-lived process never goes down).
+    tracemalloc_peak is the peak of Python allocations made during the run,
+    rss_growth how much the run raised the worker's RSS high-water mark.
+
+    Parameters:
+    -----------
+    workload: dict
+        Workload built by make_workload
+
+    Returns:
+    --------
+    dict: tracemalloc_peak, tracemalloc_retained, rss_peak and rss_growth in bytes
+    """
+    with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as executor:
+        return executor.submit(_measure_memory, workload).result()
+
+
+def storage_costs(size=1000, capacity=MAX_AVAILABLE_MINUTES):
+    """
+    Memory used per stored Task and per cell of the knapsack DP table
+
+    Parameters:
+    -----------
+    size: int
+        Number of tasks (and knapsack items) to average over
+    capacity: int
+        Knapsack capacity in minutes
+
+    Returns:
+    --------
+    dict: task_bytes (per Task with its description and dependency list),
+          knapsack_cell_bytes (per cell of the (n + 1) x (capacity + 1) table)
+          and knapsack_table_bytes for the measured table
+    """
+    # generate_tasks draws from the module random state: seed it and put it back afterwards
+    state = random.getstate()
+    random.seed(DEFAULT_SEED)
+    try:
+        tasks = generate_tasks(size, 0.5, 0.5)
+    finally:
+        random.setstate(state)
+    fields = [(t.id, t.description, t.duration, list(t.dependencies), t.scheduled, t.category) for t in tasks]
+    items = 100
+    rng = random.Random(DEFAULT_SEED)
+    weights = [rng.randint(1, MAX_TASK_DURATION) for _ in range(items)]
+    values = [rng.randint(0, 200) + rng.random() for _ in range(items)]
+    del tasks
+    gc.collect()
+
+    tracemalloc.start()
+    try:
+        # the field values are shared copies, so only the Task objects and their dicts are counted
+        before = tracemalloc.get_traced_memory()[0]
+        built = [Task(id=i, description=d, duration=m, dependencies=deps, scheduled=sch, category=c)
+                 for i, d, m, deps, sch, c in fields]
+        task_bytes = (tracemalloc.get_traced_memory()[0] - before) / size
+        del built
+        gc.collect()
+        tracemalloc.reset_peak()
+        before = tracemalloc.get_traced_memory()[0]
+        knapsack_01(weights, values, capacity)
+        table_bytes = tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    # bytes of the description strings and dependency lists referenced by each task
+    payload = sum(sys.getsizeof(d) + sys.getsizeof(deps) for _, d, _, deps, _, _ in fields) / size
+    return {
+        'task_bytes': task_bytes + payload,
+        'task_object_bytes': task_bytes,
+        'knapsack_table_bytes': table_bytes,
+        'knapsack_cell_bytes': table_bytes / ((items + 1) * (capacity + 1)),
+    }
+
+
+def percentile(samples, fraction):
+    """
+    Percentile with linear interpolation between the closest ranks
+
+    Parameters:
+    -----------
+    samples: list
+        Measured values
+    fraction: float
+        Percentile as a fraction (0-1)
+
+    Returns:
+    --------
+    float: The percentile value
+    """
+    ordered = sorted(samples)
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * fraction
+    lower = math.floor(position)
+    upper = math.ceil(position)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def summarize(samples):
+    """
+    Summary statistics of the timing samples
+
+    Parameters:
+    -----------
+    samples: list
+        Execution times in seconds
+
+    Returns:
+    --------
+    dict: min, max, mean, median, p95, stddev and the 95% confidence interval of the mean,
+          or None if there are no samples
+    """
+    if not samples:
+        return None
+    mean = statistics.fmean(samples)
+    stddev = statistics.stdev(samples) if len(samples) > 1 else 0.0
+    degrees = len(samples) - 1
+    t_value = T_CRITICAL_95.get(degrees, 1.96) if degrees > 0 else 0.0
+    half_width = t_value * stddev / math.sqrt(len(samples))
+    return {
+        'n': len(samples),
+        'min': min(samples),
+        'max': max(samples),
+        'mean': mean,
+        'median': statistics.median(samples),
+        'p95': percentile(samples, 0.95),
+        'stddev': stddev,
+        'ci95': [mean - half_width, mean + half_width],
+    }
+
+
+def benchmark_case(workload, warmup=DEFAULT_WARMUP, repetitions=DEFAULT_REPETITIONS):
+    """
+    Benchmark one algorithm on one workload
+
+    Warmup runs are discarded. Every failed run is recorded with its error
+    instead of being silently skipped.
+
+    Parameters:
+    -----------
+    workload: dict
+        Workload built by make_workload
+    warmup: int
+        Number of untimed runs before measuring
+    repetitions: int
+        Number of measured runs
+
+    Returns:
+    --------
+    dict: Case description with the raw samples, statistics and failures
+    """
+    failures = []
+    samples = []
+    for i in range(warmup + repetitions):
+        phase = 'warmup' if i < warmup else 'measure'
+        try:
+            elapsed = time_once(workload)
+        except Exception as e:
+            failures.append({'phase': phase, 'run': i, 'error': type(e).__name__, 'message': str(e)})
+            continue
+        if phase == 'measure':
+            samples.append(elapsed)
+    if not samples:
+        status = 'failed'
+    elif failures:
+        status = 'partial'
+    else:
+        status = 'ok'
+    return {
+        'algorithm': workload['algorithm'],
+        'size': workload['size'],
+        'scheduled_percentage': workload['scheduled_percentage'],
+        'dependency_percentage': workload['dependency_percentage'],
+        'capacity': workload['capacity'],
+        'status': status,
+        'samples': samples,
+        'stats': summarize(samples),
+        'failures': failures,
+    }
+
+
+def git_revision():
+    """Return the current git commit hash, or None outside of a git checkout"""
+    try:
+        output = subprocess.run(['git', 'rev-parse', 'HEAD'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+def run_suite(task_sizes=DEFAULT_SIZES, mixes=((0, 0),), algorithms=ALGORITHMS,
+              warmup=DEFAULT_WARMUP, repetitions=DEFAULT_REPETITIONS, seed=DEFAULT_SEED, verbose=True,
+              profile_dir=None, collapsed=False, memory=False):
+    """
+    Run the benchmark suite over every algorithm, workload mix and size
+
+    Parameters:
+    -----------
+    task_sizes: list
+        List of task counts to test
+    mixes: list
+        List of (scheduled_percentage, dependency_percentage) pairs
+    algorithms: list
+        Algorithms to benchmark
+    warmup: int
+        Number of untimed runs per case
+    repetitions: int
+        Number of measured runs per case
+    seed: int
+        Base seed for the generated workloads
+    verbose: bool
+        Print progress
+    profile_dir: str
+        If given, every case is also run once under cProfile and the profiles are saved here
+    collapsed: bool
+        With profile_dir, also save collapsed stacks for flamegraphs
+    memory: bool
+        Also measure the peak memory of every case and the per-task / per-cell storage costs
+
+    Returns:
+    --------
+    dict: Results with run metadata and one entry per case
+    """
+    cases = []
+    for scheduled_percentage, dependency_percentage in mixes:
+        for size in task_sizes:
+            for algorithm in algorithms:
+                if algorithm == 'Knapsack' and (scheduled_percentage, dependency_percentage) != tuple(mixes[0]):
+                    continue  # knapsack input does not depend on the mix
+                if verbose:
+                    print(f"Benchmarking {algorithm} with {size} tasks "
+                          f"(scheduled: {scheduled_percentage*100}%, dependencies: {dependency_percentage*100}%)...")
+                workload = make_workload(algorithm, size, scheduled_percentage, dependency_percentage, seed)
+                case = benchmark_case(workload, warmup, repetitions)
+                if profile_dir is not None and case['status'] != 'failed':
+                    case['profile'] = profile_once(workload, profile_dir, collapsed)
+                if memory and case['status'] != 'failed':
+                    case['memory'] = memory_once(workload)
+                cases.append(case)
+    results = {
+        'version': RESULTS_VERSION,
+        'metadata': {
+            'created': datetime.now(timezone.utc).isoformat(),
+            'commit': git_revision(),
+            'python': platform.python_version(),
+            'implementation': platform.python_implementation(),
+            'platform': platform.platform(),
+            'seed': seed,
+            'warmup': warmup,
+            'repetitions': repetitions,
+            'sizes': list(task_sizes),
+            'mixes': [list(mix) for mix in mixes],
+            'algorithms': list(algorithms),
+        },
+        'cases': cases,
+    }
+    if memory:
+        results['storage'] = storage_costs()
+    results['fits'] = fit_complexity(results)
+    return results
+
+
+def save_results(results, path):
+    """Store benchmark results as JSON"""
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2)
+
+
+def load_results(path):
+    """Load benchmark results stored by save_results"""
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def case_label(case):
+    """Human readable name of a case"""
+    return (f"{case['algorithm']} n={case['size']} "
+            f"sched={case['scheduled_percentage']:g} deps={case['dependency_percentage']:g}")
+
+
+def print_report(results):
+    """Print a table with the statistics of every case"""
+    print(f"{'case':<48} {'median ms':>10} {'p95 ms':>10} {'stddev ms':>10} {'95% CI of mean (ms)':>22}  status")
+    for case in results['cases']:
+        stats = case['stats']
+        if stats is None:
+            print(f"{case_label(case):<48} {'-':>10} {'-':>10} {'-':>10} {'-':>22}  {case['status']}")
+        else:
+            ci = f"[{stats['ci95'][0]*1000:.3f}, {stats['ci95'][1]*1000:.3f}]"
+            print(f"{case_label(case):<48} {stats['median']*1000:>10.3f} {stats['p95']*1000:>10.3f} "
+                  f"{stats['stddev']*1000:>10.3f} {ci:>22}  {case['status']}")
+        for failure in case['failures']:
+            print(f"    {failure['phase']} run {failure['run']} failed: {failure['error']}: {failure['message']}")
+
+
+def least_squares(xs, ys):
+    """
+    Ordinary least squares fit of y = slope * x + intercept
+
+    Parameters:
+    -----------
+    xs: list
+        Explanatory values
+    ys: list
+        Measured values
+
+    Returns:
+    --------
+    tuple: (slope, intercept, residual sum of squares)
+    """
+    mean_x = statistics.fmean(xs)
+    mean_y = statistics.fmean(ys)
+    sxx = sum((x - mean_x) ** 2 for x in xs)
+    if sxx == 0:
+        slope = 0.0
+    else:
+        slope = sum((x - mean_x) * (y - mean_y) for x, y in zip(xs, ys)) / sxx
+    intercept = mean_y - slope * mean_x
+    residual = sum((y - (slope * x + intercept)) ** 2 for x, y in zip(xs, ys))
+    return slope, intercept, residual
+
+
+def fit_complexity(results, tolerance=SUPER_QUADRATIC_TOLERANCE):
+    """
+    Fit the measured medians of every algorithm and workload mix against the complexity models
+
+    Each model is fitted as t = a * f(n) + b (b absorbs constant overhead) and the one
+    with the smallest residual wins; models with a negative growth term are discarded.
+    O(n·C) is only fitted when the capacity varies between the cases (knapsack): with a
+    constant capacity it is O(n) rescaled and could never be told apart from it.
+    The empirical exponent is the slope of log(t) against log(n).
+
+    Parameters:
+    -----------
+    results: dict
+        Benchmark results
+    tolerance: float
+        How far above 2 the exponent may go before the curve is flagged as super-quadratic
+
+    Returns:
+    --------
+    list: One dict per (algorithm, mix) with the best model, exponent, R² per model and a flag
+    """
+    groups = {}
+    for case in results['cases']:
+        if case['stats'] is None or case['stats']['median'] <= 0:
+            continue
+        key = (case['algorithm'], case['scheduled_percentage'], case['dependency_percentage'])
+        groups.setdefault(key, []).append(case)
+    fits = []
+    for (algorithm, scheduled_percentage, dependency_percentage), cases in groups.items():
+        cases.sort(key=lambda c: c['size'])
+        if len({c['size'] for c in cases}) < 3:
+            continue  # two points fit every model perfectly
+        sizes = [c['size'] for c in cases]
+        times = [c['stats']['median'] for c in cases]
+        total = sum((t - statistics.fmean(times)) ** 2 for t in times)
+        models = {}
+        constant_capacity = len({c['capacity'] for c in cases}) == 1
+        for name, model in COMPLEXITY_MODELS.items():
+            if name == 'O(n·C)' and constant_capacity:
+                continue
+            xs = [model(c['size'], c['capacity']) for c in cases]
+            slope, intercept, residual = least_squares(xs, times)
+            if slope < 0:
+                continue
+            models[name] = {'a': slope, 'b': intercept, 'r2': 1 - residual / total if total > 0 else 1.0,
+                            'residual': residual}
+        exponent = least_squares([math.log(n) for n in sizes], [math.log(t) for t in times])[0]
+        best = min(models, key=lambda name: models[name]['residual']) if models else None
+        fits.append({
+            'algorithm': algorithm,
+            'scheduled_percentage': scheduled_percentage,
+            'dependency_percentage': dependency_percentage,
+            'sizes': sizes,
+            'best_model': best,
+            'exponent': exponent,
+            'super_quadratic': exponent > 2 + tolerance,
+            'models': models,
+        })
+    return fits
+
+
+def print_fits(fits):
+    """Print the best-fit complexity of every algorithm and workload mix"""
+    if not fits:
+        print("Not enough sizes to fit complexity models (need at least 3)")
+        return
+    print(f"{'algorithm / mix':<40} {'best fit':>10} {'R²':>7} {'exponent':>9}")
+    for fit in fits:
+        label = (f"{fit['algorithm']} sched={fit['scheduled_percentage']:g} "
+                 f"deps={fit['dependency_percentage']:g}")
+        r2 = fit['models'][fit['best_model']]['r2'] if fit['best_model'] else float('nan')
+        flag = "  ⚠️ super-quadratic" if fit['super_quadratic'] else ""
+        print(f"{label:<40} {str(fit['best_model']):>10} {r2:>7.3f} {fit['exponent']:>9.2f}{flag}")
+
+
+def print_memory(results):
+    """Print the memory of every measured case and the storage costs"""
+    print(f"{'case':<48} {'tracemalloc peak KiB':>21} {'RSS growth KiB':>15} {'peak RSS MiB':>13}")
+    for case in results['cases']:
+        memory = case.get('memory')
+        if memory is None:
+            continue
+        growth = f"{memory['rss_growth']/1024:.1f}" if memory['rss_growth'] is not None else '-'
+        peak = f"{memory['rss_peak']/1024/1024:.1f}" if memory['rss_peak'] is not None else '-'
+        print(f"{case_label(case):<48} {memory['tracemalloc_peak']/1024:>21.1f} {growth:>15} {peak:>13}")
+    storage = results.get('storage')
+    if storage:
+        print(f"\nStorage: {storage['task_bytes']:.0f} bytes per Task "
+              f"({storage['task_object_bytes']:.0f} for the object itself), "
+              f"{storage['knapsack_cell_bytes']:.1f} bytes per knapsack DP cell")
+
+
+def plot_results(results, directory='.'):
+    """
+    Draw the time and memory curves of stored results, one pair of figures per workload mix
+
+    Parameters:
+    -----------
+    results: dict
+        Benchmark results
+    directory: str
+        Where the PNG files are written
+    """
+    from figures import create_figure, create_memory_figure
+    mixes = {}
+    for case in results['cases']:
+        mixes.setdefault((case['scheduled_percentage'], case['dependency_percentage']), []).append(case)
+    os.makedirs(directory, exist_ok=True)
+    for (scheduled_percentage, dependency_percentage), cases in mixes.items():
+        sizes = sorted({case['size'] for case in cases})
+        by_case = {(case['algorithm'], case['size']): case for case in cases}
+        suffix = f"{int(scheduled_percentage*100)}pct_scheduled_{int(dependency_percentage*100)}pct_dependencies"
+        title = f"{scheduled_percentage*100:g}% Scheduled Tasks, {dependency_percentage*100:g}% Tasks with Dependencies"
+        times = {}
+        peaks = {}
+        for algorithm in ALGORITHMS:
+            measured = [by_case.get((algorithm, size)) for size in sizes]
+            if any(case is None for case in measured):
+                continue
+            times[algorithm] = [case['stats']['median'] if case['stats'] else 0 for case in measured]
+            if all('memory' in case for case in measured):
+                peaks[algorithm] = [case['memory']['tracemalloc_peak'] for case in measured]
+        if all(algorithm in times for algorithm in ('TaskScheduler', 'ImprovedGreedy', 'DP')):
+            create_figure(sizes, times, f"Time Complexity: {title}",
+                          os.path.join(directory, f"bench_time_{suffix}.png"))
+        if peaks:
+            create_memory_figure(sizes, peaks, f"Peak Memory: {title}",
+                                 os.path.join(directory, f"bench_memory_{suffix}.png"))
+
+
+def print_hotspots(results, other=None, top=10):
+    """
+    Print the top hotspots of every profiled case, with the own-time change
+    against another run when one is given
+
+    Parameters:
+    -----------
+    results: dict
+        Benchmark results recorded with profiling
+    other: dict
+        Optional newer results to compare with
+    top: int
+        Number of functions shown per case
+    """
+    other_cases = {case_key(case): case for case in other['cases']} if other else {}
+    for case in results['cases']:
+        if 'profile' not in case:
+            continue
+        print(f"\n{case_label(case)}")
+        newer = other_cases.get(case_key(case), {}).get('profile')
+        newer_times = {row['function']: row['tottime'] for row in newer['hotspots']} if newer else {}
+        for row in case['profile']['hotspots'][:top]:
+            line = f"    {row['tottime']*1000:>10.3f} ms {row['calls']:>9} calls  {row['function']}"
+            if newer:
+                if row['function'] in newer_times:
+                    line += f"  -> {newer_times[row['function']]*1000:.3f} ms"
+                else:
+                    line += "  -> not in top"
+            print(line)
+
+
+def case_key(case):
+    """Key identifying the same case across benchmark runs"""
+    return (case['algorithm'], case['size'], case['scheduled_percentage'], case['dependency_percentage'])
+
+
+def compare_results(baseline, current, threshold=DEFAULT_THRESHOLD, min_delta_ms=DEFAULT_MIN_DELTA_MS):
+    """
+    Compare the medians of two benchmark runs case by case
+
+    A case regresses when its median grows by more than `threshold` (relative)
+    and by more than `min_delta_ms` (absolute, to ignore timer noise on tiny cases),
+    or when it fails in the current run but succeeded in the baseline.
+
+    Parameters:
+    -----------
+    baseline: dict
+        Results loaded from the baseline JSON
+    current: dict
+        Results of the run being checked
+    threshold: float
+        Allowed relative slowdown of the median, e.g. 0.25 for 25%
+    min_delta_ms: float
+        Slowdowns smaller than this many milliseconds are never reported
+
+    Returns:
+    --------
+    list: One dict per baseline case with the medians, relative change and verdict
+          ('ok', 'improved', 'regressed', 'failed', 'missing', 'new')
+    """
+    current_cases = {case_key(case): case for case in current['cases']}
+    rows = []
+    for base in baseline['cases']:
+        key = case_key(base)
+        row = {'case': case_label(base), 'algorithm': base['algorithm'], 'size': base['size'],
+               'baseline': None, 'current': None, 'change': None}
+        if base['stats'] is not None:
+            row['baseline'] = base['stats']['median']
+        case = current_cases.pop(key, None)
+        if case is None:
+            row['verdict'] = 'missing'
+        elif case['stats'] is None:
+            row['verdict'] = 'failed' if base['stats'] is not None else 'ok'
+        else:
+            row['current'] = case['stats']['median']
+            if row['baseline'] is None:
+                row['verdict'] = 'new'
+            else:
+                row['change'] = row['current'] / row['baseline'] - 1 if row['baseline'] > 0 else 0.0
+                delta_ms = (row['current'] - row['baseline']) * 1000
+                if row['change'] > threshold and delta_ms > min_delta_ms:
+                    row['verdict'] = 'regressed'
+                elif row['change'] < -threshold and -delta_ms > min_delta_ms:
+                    row['verdict'] = 'improved'
+                else:
+                    row['verdict'] = 'ok'
+        rows.append(row)
+    for case in current_cases.values():
+        rows.append({'case': case_label(case), 'algorithm': case['algorithm'], 'size': case['size'],
+                     'baseline': None, 'current': case['stats']['median'] if case['stats'] else None,
+                     'change': None, 'verdict': 'new'})
+    return rows
+
+
+def print_comparison(rows, threshold=DEFAULT_THRESHOLD):
+    """Print the per-algorithm/per-size comparison table and return True if nothing regressed"""
+    print(f"{'case':<48} {'baseline ms':>12} {'current ms':>12} {'change':>9}  verdict")
+    for row in rows:
+        baseline = f"{row['baseline']*1000:.3f}" if row['baseline'] is not None else '-'
+        current = f"{row['current']*1000:.3f}" if row['current'] is not None else '-'
+        change = f"{row['change']*100:+.1f}%" if row['change'] is not None else '-'
+        print(f"{row['case']:<48} {baseline:>12} {current:>12} {change:>9}  {row['verdict']}")
+    bad = [row for row in rows if row['verdict'] in ('regressed', 'failed', 'missing')]
+    if bad:
+        print(f"\n❌ {len(bad)} case(s) regressed beyond {threshold*100:g}% or failed:")
+        for row in bad:
+            print(f"   {row['case']}: {row['verdict']}")
+        return False
+    print(f"\n✅ No median regressed beyond {threshold*100:g}%")
+    return True
+
+
+def _wall_ms(command, repetitions):
+    """Wall time in milliseconds of every run of a command in a fresh interpreter"""
+    here = os.path.dirname(os.path.abspath(__file__))
+    samples = []
+    for _ in range(repetitions):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=here, check=True, stdout=subprocess.DEVNULL)
+        samples.append((time.perf_counter() - start) * 1000)
+    return samples
+
+
+def import_times(command):
+    """
+    Import cost of every module a command loads (python -X importtime)
+
+    Returns:
+    --------
+    list of (module, self microseconds, cumulative microseconds, nesting depth)
+    """
+    here = os.path.dirname(os.path.abspath(__file__))
+    output = subprocess.run([command[0], '-X', 'importtime'] + command[1:], cwd=here, check=True,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        own, cumulative, name = line[len('import time:'):].split('|')
+        depth = (len(name) - len(name.lstrip())) // 2
+        modules.append((name.strip(), int(own), int(cumulative), depth))
+    return modules
+
+
+def measure_startup(repetitions=DEFAULT_REPETITIONS, size=STARTUP_TASKS, algorithm='DP'):
+    """
+    Cold-start cost of scheduling one day with `python -m SchedulerCLI`
+
+    Parameters:
+    -----------
+    repetitions: int
+        Fresh interpreters started per measurement
+    size: int
+        Number of tasks in the scheduled day
+    algorithm: str
+        Scheduler used by the command
+
+    Returns:
+    --------
+    dict with the median wall times (ms) of the command and of a bare interpreter,
+    the overhead between them, the heaviest top-level imports and the heavy modules loaded
+    """
+    from TaskStore import save_ndjson
+    workload = make_workload(algorithm, size, 0.5, 0.1)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'tasks.ndjson')
+        save_ndjson(workload['data'], path)
+        command = [sys.executable, '-m', 'SchedulerCLI', path, '--algorithm', algorithm,
+                   '--start', STARTING_TIME, '--end', END_TIME]
+        bare = statistics.median(_wall_ms([sys.executable, '-c', 'pass'], repetitions))
+        wall = statistics.median(_wall_ms(command, repetitions))
+        modules = import_times(command)
+    top_level = sorted((m for m in modules if m[3] == 0), key=lambda m: -m[2])
+    loaded = {name.split('.')[0] for name, _, _, _ in modules}
+    return {
+        'bare_ms': bare,
+        'wall_ms': wall,
+        'overhead_ms': wall - bare,
+        'import_ms': sum(m[2] for m in modules if m[3] == 0) / 1000,
+        'heaviest_imports': [(name, cumulative / 1000) for name, _, cumulative, _ in top_level[:8]],
+        'heavy_modules': sorted(loaded.intersection(HEAVY_MODULES)),
+    }
+
+
+def print_startup(startup, budget_ms=STARTUP_BUDGET_MS):
+    """Print a startup measurement; returns True when it is within the budget"""
+    print(f"python -m SchedulerCLI: {startup['wall_ms']:.1f} ms "
+          f"(bare interpreter {startup['bare_ms']:.1f} ms, overhead {startup['overhead_ms']:.1f} ms, "
+          f"imports {startup['import_ms']:.1f} ms)")
+    for name, ms in startup['heaviest_imports']:
+        print(f"  {name:30s} {ms:8.2f} ms")
+    ok = True
+    if startup['heavy_modules']:
+        print(f"❌ heavy modules imported: {', '.join(startup['heavy_modules'])}")
+        ok = False
+    if startup['overhead_ms'] > budget_ms:
+        print(f"❌ start-up overhead {startup['overhead_ms']:.1f} ms is over the {budget_ms:g} ms budget")
+        ok = False
+    if ok:
+        print(f"✅ within the {budget_ms:g} ms start-up budget")
+    return ok
+
+
+def measure_priorities(sizes=PRIORITY_SIZES, repetitions=3, seed=DEFAULT_SEED):
+    """
+    Priority setup time of the staged (DP) rules: the Python model over Task objects,
+    NumPy over Task objects and NumPy over the columns of a TaskTable
+
+    Parameters:
+    -----------
+    sizes: list
+        Task counts (half of the tasks scheduled, half with dependencies)
+    repetitions: int
+        Runs per method, the median is reported
+    seed: int
+        Seed of the generated tasks
+
+    Returns:
+    --------
+    list of dicts with the size and the median milliseconds of every method
+    """
+    from SchedulerEngine import PriorityModel, category_weights
+    from Instrumentation import make_stats
+    from TaskStore import TaskTable
+    from VectorPriorities import task_priorities, table_priorities
+
+    model = DP_Scheduler.priority_model
+    python_model = PriorityModel(model.time_unit, model.staged, model.prerequisite_bonus, model.step,
+                                 vector_min_tasks=None)
+    weights = category_weights()
+    rows = []
+    for size in sizes:
+        state = random.getstate()
+        random.seed(case_seed(seed, 'priorities', size, 0.5, 0.5))
+        try:
+            tasks = generate_tasks(size, 0.5, 0.5)
+        finally:
+            random.setstate(state)
+        table = TaskTable.from_tasks(tasks)
+        by_id = {task.id: task for task in tasks}
+
+        methods = {
+            'python': lambda: python_model.assign(tasks, by_id, make_stats(False), weights),
+            'numpy_tasks': lambda: task_priorities(tasks, weights, model.time_unit, model.prerequisite_bonus, model.step),
+            'numpy_table': lambda: table_priorities(table, weights, model.time_unit, model.prerequisite_bonus, model.step),
+        }
+        row = {'size': size}
+        for name, run in methods.items():
+            samples = []
+            for _ in range(repetitions):
+                start = time.perf_counter()
+                run()
+                samples.append((time.perf_counter() - start) * 1000)
+            row[name] = statistics.median(samples)
+        rows.append(row)
+    return rows
+
+
+def print_priorities(rows):
+    """Print the priority setup comparison"""
+    print(f"{'tasks':>8s} {'python':>12s} {'numpy tasks':>12s} {'numpy table':>12s}")
+    for row in rows:
+        print(f"{row['size']:8d} {row['python']:10.1f}ms {row['numpy_tasks']:10.1f}ms {row['numpy_table']:10.1f}ms")
+
+
+def measure_heaps(sizes=HEAP_SIZES, repetitions=3, seed=DEFAULT_SEED):
+    """
+    Push, pop and build throughput of the heap implementations a scheduler can use
+    (MaxHeap.HEAP_CLASSES): n random keys are pushed, then popped again, and a
+    heap of the same keys is built at once with from_iterable. Removal throughput
+    is measured on a ReadySet of the keys, removing HEAP_REMOVALS random keys
+    (at most half of them) in place and with lazy (tombstone) removal
+
+    Parameters:
+    -----------
+    sizes: list
+        Numbers of keys
+    repetitions: int
+        Runs per heap and size, the fastest is reported
+    seed: int
+        Seed of the keys
+
+    Returns:
+    --------
+    list of dicts with the heap name, size and pushes/pops/built keys/removals per second
+    """
+    from MaxHeap import HEAP_CLASSES
+    from SchedulerEngine import ReadySet
+
+    rows = []
+    for size in sizes:
+        keys = random.Random(case_seed(seed, 'heaps', size, 0, 0)).sample(range(size * 10), size)
+        removed = keys[:min(size // 2, HEAP_REMOVALS)]
+        for name, heap_class in HEAP_CLASSES.items():
+            push_times, pop_times, build_times = [], [], []
+            remove_times = {False: [], True: []}
+            for _ in range(repetitions):
+                heap = heap_class()
+                start = time.perf_counter()
+                for key in keys:
+                    heap.heappush(key)
+                push_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                while heap.heap_size:
+                    heap.heappop()
+                pop_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                heap_class.from_iterable(keys)
+                build_times.append(time.perf_counter() - start)
+                for lazy, samples in remove_times.items():
+                    ready = ReadySet(keys, heap_class, lazy)
+                    start = time.perf_counter()
+                    for key in removed:
+                        ready.remove(key)
+                    samples.append(time.perf_counter() - start)
+            rows.append({'heap': name, 'size': size,
+                         'push_per_s': size / min(push_times), 'pop_per_s': size / min(pop_times),
+                         'build_per_s': size / min(build_times),
+                         'remove_per_s': len(removed) / min(remove_times[False]),
+                         'lazy_remove_per_s': len(removed) / min(remove_times[True])})
+    return rows
+
+
+def print_heaps(rows):
+    """Print the heap throughput comparison"""
+    print(f"{'heap':>10s} {'keys':>8s} {'push/s':>12s} {'pop/s':>12s} {'build/s':>12s} "
+          f"{'remove/s':>12s} {'lazy rm/s':>12s}")
+    for row in rows:
+        print(f"{row['heap']:>10s} {row['size']:8d} {row['push_per_s']:12,.0f} {row['pop_per_s']:12,.0f} "
+              f"{row['build_per_s']:12,.0f} {row['remove_per_s']:12,.0f} {row['lazy_remove_per_s']:12,.0f}")
+
+
+def parse_mix(text):
+    """Parse a 'scheduled:dependencies' workload mix, e.g. '0.5:0.1'"""
+    try:
+        scheduled, dependencies = text.split(":")
+        return float(scheduled), float(dependencies)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"invalid mix '{text}', expected 'scheduled:dependencies' such as '0.5:0.1'")
+
+
+def build_parser():
+    """Command line interface of the benchmark runner"""
+    parser = argparse.ArgumentParser(description="Statistical benchmarks for the task schedulers")
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    run = commands.add_parser('run', help="run the benchmark suite")
+    run.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help="task counts to benchmark")
+    run.add_argument('--mix', type=parse_mix, action='append', dest='mixes',
+                     help="workload mix 'scheduled:dependencies' (repeatable, default 0:0)")
+    run.add_argument('--algorithms', nargs='+', choices=ALGORITHMS, default=ALGORITHMS)
+    run.add_argument('--warmup', type=int, default=DEFAULT_WARMUP)
+    run.add_argument('--repetitions', type=int, default=DEFAULT_REPETITIONS)
+    run.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    run.add_argument('--output', default='bench_results.json', help="where to store the JSON results")
+    run.add_argument('--profile', action='store_true',
+                     help="also capture a cProfile run per case next to the results (<output>_profiles/)")
+    run.add_argument('--collapsed', action='store_true',
+                     help="with --profile, also write collapsed stacks for flamegraph tools")
+    run.add_argument('--memory', action='store_true',
+                     help="also record peak memory (tracemalloc and RSS) per case")
+
+    plot = commands.add_parser('plot', help="draw time and memory figures from stored results")
+    plot.add_argument('results', help="results JSON")
+    plot.add_argument('--directory', default='.', help="where the figures are written")
+
+    hot = commands.add_parser('hotspots', help="show the profiled hotspots of stored results")
+    hot.add_argument('results', help="results JSON recorded with --profile")
+    hot.add_argument('other', nargs='?', help="newer results JSON to compare the hotspots with")
+    hot.add_argument('--top', type=int, default=10)
+
+    fit = commands.add_parser('fit', help="fit complexity models to stored results")
+    fit.add_argument('results', help="results JSON")
+    fit.add_argument('--tolerance', type=float, default=SUPER_QUADRATIC_TOLERANCE,
+                     help="flag exponents above 2 + tolerance (default %(default)s)")
+
+    compare = commands.add_parser('compare', help="compare two stored benchmark runs")
+    compare.add_argument('baseline', help="baseline results JSON")
+    compare.add_argument('current', help="results JSON to check")
+    compare.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                         help="allowed relative slowdown of a median (default %(default)s)")
+    compare.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                         help="ignore slowdowns smaller than this many milliseconds")
+
+    gate = commands.add_parser('gate', help="run the suite and fail if it is slower than the baseline")
+    gate.add_argument('--baseline', default='bench_baseline.json', help="baseline results JSON")
+    gate.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                      help="allowed relative slowdown of a median (default %(default)s)")
+    gate.add_argument('--min-delta-ms', type=float, default=DEFAULT_MIN_DELTA_MS,
+                      help="ignore slowdowns smaller than this many milliseconds")
+    gate.add_argument('--repetitions', type=int, default=None,
+                      help="measured runs per case (default: same as the baseline)")
+    gate.add_argument('--output', default=None, help="also store the new results as JSON")
+    gate.add_argument('--update-baseline', action='store_true',
+                      help="record the new run as the baseline instead of comparing")
+
+    startup = commands.add_parser('startup', help="check the cold start of `python -m SchedulerCLI` against a budget")
+    startup.add_argument('--budget-ms', type=float, default=STARTUP_BUDGET_MS,
+                         help="allowed milliseconds on top of a bare interpreter (default %(default)s)")
+    startup.add_argument('--repetitions', type=int, default=DEFAULT_REPETITIONS)
+    startup.add_argument('--size', type=int, default=STARTUP_TASKS, help="tasks in the scheduled day")
+
+    priorities = commands.add_parser('priorities', help="compare Python and NumPy priority setup")
+    priorities.add_argument('--sizes', type=int, nargs='+', default=PRIORITY_SIZES)
+    priorities.add_argument('--repetitions', type=int, default=3)
+
+    heaps = commands.add_parser('heaps', help="compare push/pop/build/remove throughput of the heap implementations")
+    heaps.add_argument('--sizes', type=int, nargs='+', default=HEAP_SIZES)
+    heaps.add_argument('--repetitions', type=int, default=3)
+    return parser
+
+
+def run_gate(args):
+    """Run the suite with the baseline's settings and compare; returns the process exit code"""
+    try:
+        baseline = load_results(args.baseline)
+    except FileNotFoundError:
+        baseline = None
+        if not args.update_baseline:
+            print(f"Baseline '{args.baseline}' not found, run with --update-baseline to create it")
+            return 2
+    settings = baseline['metadata'] if baseline else {}
+    results = run_suite(settings.get('sizes', GATE_SIZES),
+                        [tuple(mix) for mix in settings.get('mixes', GATE_MIXES)],
+                        settings.get('algorithms', ALGORITHMS),
+                        settings.get('warmup', DEFAULT_WARMUP),
+                        args.repetitions or settings.get('repetitions', 5),
+                        settings.get('seed', DEFAULT_SEED),
+                        verbose=False)
+    if args.output:
+        save_results(results, args.output)
+    if args.update_baseline:
+        save_results(results, args.baseline)
+        print_report(results)
+        print(f"Saved baseline: {args.baseline}")
+        return 0
+    rows = compare_results(baseline, results, args.threshold, args.min_delta_ms)
+    return 0 if print_comparison(rows, args.threshold) else 1
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    if args.command == 'run':
+        profile_dir = os.path.splitext(args.output)[0] + '_profiles' if args.profile else None
+        results = run_suite(args.sizes, args.mixes or [(0, 0)], args.algorithms,
+                            args.warmup, args.repetitions, args.seed,
+                            profile_dir=profile_dir, collapsed=args.collapsed, memory=args.memory)
+        save_results(results, args.output)
+        print_report(results)
+        print()
+        print_fits(results['fits'])
+        print(f"Saved results: {args.output}")
+        if args.memory:
+            print()
+            print_memory(results)
+        if profile_dir:
+            print_hotspots(results)
+            print(f"Saved profiles: {profile_dir}")
+    elif args.command == 'plot':
+        plot_results(load_results(args.results), args.directory)
+    elif args.command == 'hotspots':
+        other = load_results(args.other) if args.other else None
+        print_hotspots(load_results(args.results), other, args.top)
+    elif args.command == 'fit':
+        print_fits(fit_complexity(load_results(args.results), args.tolerance))
+    elif args.command == 'compare':
+        rows = compare_results(load_results(args.baseline), load_results(args.current),
+                               args.threshold, args.min_delta_ms)
+        return 0 if print_comparison(rows, args.threshold) else 1
+    elif args.command == 'gate':
+        return run_gate(args)
+    elif args.command == 'priorities':
+        print_priorities(measure_priorities(args.sizes, args.repetitions))
+    elif args.command == 'heaps':
+        print_heaps(measure_heaps(args.sizes, args.repetitions))
+    elif args.command == 'startup':
+        startup = measure_startup(args.repetitions, args.size)
+        return 0 if print_startup(startup, args.budget_ms) else 1
+    return 0
+
+
+def test_summarize():
+    """
+    Tests the timing statistics and the recording of failed runs
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    print("Running test cases...")
+
+    print("Test 1: percentiles interpolate between the closest ranks")
+    assert percentile([3.0], 0.95) == 3.0
+    assert percentile([4.0, 1.0, 3.0, 2.0], 0.5) == 2.5
+    assert abs(percentile([1.0, 2.0, 3.0, 4.0, 5.0], 0.95) - 4.8) < 1e-12
+
+    print("Test 2: summary statistics and the 95% confidence interval of the mean")
+    stats = summarize([1.0, 2.0, 3.0, 4.0, 5.0])
+    assert stats['n'] == 5 and stats['mean'] == 3.0 and stats['median'] == 3.0
+    half_width = T_CRITICAL_95[4] * statistics.stdev([1.0, 2.0, 3.0, 4.0, 5.0]) / math.sqrt(5)
+    assert abs(stats['ci95'][0] - (3.0 - half_width)) < 1e-12 and abs(stats['ci95'][1] - (3.0 + half_width)) < 1e-12
+    assert summarize([2.0])['ci95'] == [2.0, 2.0]
+    assert summarize([]) is None
+
+    print("Test 3: failed runs are recorded, not skipped")
+    workload = make_workload('Knapsack', 5)
+    assert benchmark_case(workload, warmup=1, repetitions=3)['status'] == 'ok'
+    workload['data'] = (workload['data'][0], workload['data'][1][:2], workload['data'][2])
+    case = benchmark_case(workload, warmup=1, repetitions=3)
+    assert case['status'] == 'failed' and case['stats'] is None
+    assert [(failure['phase'], failure['run']) for failure in case['failures']] == \
+        [('warmup', 0), ('measure', 1), ('measure', 2), ('measure', 3)]
+
+    print("All tests passed!")
+
+
+#test_summarize()
+
+
+def _synthetic_results(cases, sizes, algorithms):
+    """Results in the stored format from (algorithm, size, capacity, median seconds) tuples"""
+    return {
+        'version': RESULTS_VERSION,
+        'metadata': {'seed': DEFAULT_SEED, 'warmup': 0, 'repetitions': 1, 'sizes': list(sizes),
+                     'mixes': [[0, 0]], 'algorithms': list(algorithms)},
+        'cases': [{'algorithm': algorithm, 'size': size, 'scheduled_percentage': 0, 'dependency_percentage': 0,
+                   'capacity': capacity, 'status': 'ok', 'samples': [median], 'stats': summarize([median]),
+                   'failures': []}
+                  for algorithm, size, capacity, median in cases],
+    }
+
+
+def test_gate():
+    """
+    Tests the regression gate against synthetic baselines: one far slower than any
+    real run (passes), one far faster (fails), and a baseline case the run no longer has
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    import contextlib
+
+    print("Running test cases...")
+    sizes = [5, 10]
+    algorithms = ['Knapsack']
+
+    print("Test 1: the medians are compared case by case")
+    baseline = _synthetic_results([('DP', 10, 0, 0.010), ('DP', 20, 0, 0.010), ('DP', 40, 0, 0.010)],
+                                  [10, 20, 40], ['DP'])
+    current = _synthetic_results([('DP', 10, 0, 0.011), ('DP', 20, 0, 0.020), ('DP', 40, 0, 0.005),
+                                  ('DP', 80, 0, 0.010)], [10, 20, 40, 80], ['DP'])
+    rows = compare_results(baseline, current, threshold=0.25, min_delta_ms=0.1)
+    assert [row['verdict'] for row in rows] == ['ok', 'regressed', 'improved', 'new']
+    # a slowdown under min_delta_ms is timer noise
+    assert compare_results(baseline, current, threshold=0.25, min_delta_ms=50)[1]['verdict'] == 'ok'
+    current['cases'][1]['stats'] = None
+    assert compare_results(baseline, current)[1]['verdict'] == 'failed'
+
+    def gate(arguments):
+        with contextlib.redirect_stdout(_NullWriter()):
+            return run_gate(arguments)
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'baseline.json')
+        arguments = argparse.Namespace(baseline=path, threshold=DEFAULT_THRESHOLD, min_delta_ms=0,
+                                       repetitions=1, output=None, update_baseline=False)
+
+        print("Test 2: the gate fails without a baseline")
+        assert gate(arguments) == 2
+
+        print("Test 3: the gate passes against a slower baseline")
+        save_results(_synthetic_results([('Knapsack', size, 0, 10.0) for size in sizes], sizes, algorithms), path)
+        assert gate(arguments) == 0
+
+        print("Test 4: the gate fails against a faster baseline")
+        save_results(_synthetic_results([('Knapsack', size, 0, 1e-9) for size in sizes], sizes, algorithms), path)
+        assert gate(arguments) == 1
+
+        print("Test 5: the gate fails when a baseline case is missing from the run")
+        missing = _synthetic_results([('Knapsack', size, 0, 10.0) for size in sizes], sizes, algorithms)
+        missing['cases'].append(dict(missing['cases'][0], size=7))
+        save_results(missing, path)
+        assert gate(arguments) == 1
+
+        print("Test 6: --update-baseline records a run with the baseline's settings")
+        arguments.update_baseline = True
+        assert gate(arguments) == 0
+        recorded = load_results(path)
+        assert [case_key(case) for case in recorded['cases']] == [case_key(case) for case in missing['cases'][:2]]
+        assert all(case['stats']['median'] < 10.0 for case in recorded['cases'])
+
+    print("All tests passed!")
+
+
+#test_gate()
+
+
+def test_fit_complexity():
+    """
+    Tests that the complexity fit tells O(n) from O(n·C) on synthetic timings and
+    flags super-quadratic curves
+
+    Parameters
+    ----------
+    None
+
+    Returns
+    ----------
+    None
+    """
+    print("Running test cases...")
+    sizes = [25, 50, 100, 200]
+    capacities = [900, 300, 1200, 500]  # not growing with n, as drawn for the knapsack cases
+    cases = [('Linear', n, c, 1e-4 + 2e-6 * n) for n, c in zip(sizes, capacities)]
+    cases += [('Table', n, c, 1e-4 + 1e-8 * n * c) for n, c in zip(sizes, capacities)]
+    cases += [('Cubic', n, MAX_AVAILABLE_MINUTES, 1e-9 * n ** 3) for n in sizes]
+    cases += [('Short', n, MAX_AVAILABLE_MINUTES, 1e-3) for n in sizes[:2]]
+    fits = {fit['algorithm']: fit for fit in fit_complexity(_synthetic_results(cases, sizes, []))}
+
+    print("Test 1: O(n) wins when the time does not follow the capacity")
+    assert fits['Linear']['best_model'] == 'O(n)'
+    assert abs(fits['Linear']['models']['O(n)']['a'] - 2e-6) < 1e-12
+    assert fits['Linear']['models']['O(n)']['r2'] > fits['Linear']['models']['O(n·C)']['r2']
+
+    print("Test 2: O(n·C) wins when it does")
+    assert fits['Table']['best_model'] == 'O(n·C)'
+    assert fits['Table']['models']['O(n·C)']['r2'] > 0.999 > fits['Table']['models']['O(n)']['r2']
+
+    print("Test 3: O(n·C) is not fitted with a constant capacity")
+    assert 'O(n·C)' not in fits['Cubic']['models']
+    assert fits['Cubic']['best_model'] == 'O(n³)'
+    assert abs(fits['Cubic']['exponent'] - 3) < 1e-9 and fits['Cubic']['super_quadratic']
+    assert not fits['Linear']['super_quadratic']
+
+    print("Test 4: fewer than three sizes are not fitted")
+    assert 'Short' not in fits
+
+    print("All tests passed!")
+
+
+#test_fit_complexity()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,7 +1,5 @@
 import time
 import random
-import matplotlib.pyplot as plt
-import numpy as np
 from TaskClass import Task
 from TaskSchedulerClass import TaskScheduler
 from ImprovedGreedy_Scheduler import ImprovedGreedy_Scheduler
@@ -97,7 +95,7 @@ def generate_tasks(num_tasks, scheduled_percentage=0, dependency_percentage=0):
         if i in dependency_indices:
             # Create dependency on tasks with lower index (to avoid cycles)
             # Only depend on tasks that come before in the list
-            possible_deps = [j for j in range(i)]
+            possible_deps = range(i)  # sampled in place, the same draws as from a list
             if possible_deps:
                 # Allow multiple dependencies (1 to up to 5, or all available if less than 5)
                 max_deps = min(5, len(possible_deps))
@@ -239,6 +237,11 @@ def create_figure(task_sizes, results, title, filename):
     filename: str
         Filename to save the figure
     """
+    # plotting backends are only loaded when a figure is drawn, so that
+    # generate_tasks and the timing helpers stay cheap to import (benchmark.py)
+    import matplotlib.pyplot as plt
+    import numpy as np
+
     plt.figure(figsize=(12, 5))
     
     # Find the maximum and minimum values across all algorithm results (not complexity lines)
@@ -342,6 +345,45 @@ def create_figure(task_sizes, results, title, filename):
     print(f"Saved figure: {filename}")
     plt.close()
 
+def create_memory_figure(task_sizes, results, title, filename):
+    """
+    Create and save a figure with the peak memory of every algorithm
+    
+    Parameters:
+    -----------
+    task_sizes: list
+        List of task counts
+    results: dict
+        Dictionary with algorithm names as keys and lists of peak memory in bytes as values
+    title: str
+        Figure title
+    filename: str
+        Filename to save the figure
+    """
+    labels = {
+        'TaskScheduler': ('o-', 'Greedy Approach Part I'),
+        'ImprovedGreedy': ('s-', 'Greedy Approach Part II'),
+        'DP': ('^-', 'DP Approach'),
+        'Knapsack': ('d--', 'Knapsack table'),
+    }
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(12, 5))
+    for algo, values in results.items():
+        style, label = labels.get(algo, ('o-', algo))
+        plt.plot(task_sizes, [v / 1024 for v in values], style, label=label, linewidth=2, markersize=6)
+    
+    plt.xlabel('Number of Tasks', fontsize=12)
+    plt.ylabel('Peak Memory (KiB)', fontsize=12)
+    plt.title(title, fontsize=14, fontweight='bold')
+    plt.legend(fontsize=9, loc='best')
+    plt.grid(True, alpha=0.3)
+    plt.tight_layout()
+    
+    plt.savefig(filename, dpi=300, bbox_inches='tight')
+    print(f"Saved figure: {filename}")
+    plt.close()
+
 def main():
     """Main function to run all simulations and create figures"""
     # Task sizes: points every 25 tasks, starting from 25